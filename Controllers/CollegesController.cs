@@ -10,6 +10,24 @@ namespace MentalHealthDatabase.Controllers
     {
         private readonly IDataService _dataService;
 
+        private const int DefaultPageSize = 100;
+        private const int MaxPageSize = 500;
+
+        // Fields selectable through ?fields= on the paged listing
+        private static readonly Dictionary<string, Func<College, object?>> CollegeFields =
+            new Dictionary<string, Func<College, object?>>(StringComparer.OrdinalIgnoreCase)
+            {
+                ["id"] = c => c.Id,
+                ["name"] = c => c.Name,
+                ["location"] = c => c.Location,
+                ["latitude"] = c => c.Latitude,
+                ["longitude"] = c => c.Longitude,
+                ["website"] = c => c.Website,
+                ["createdAt"] = c => c.CreatedAt,
+                ["updatedAt"] = c => c.UpdatedAt,
+                ["resources"] = c => c.Resources
+            };
+
         public CollegesController(IDataService dataService)
         {
             _dataService = dataService;
@@ -31,6 +49,57 @@ namespace MentalHealthDatabase.Controllers
             }
         }
 
+        [HttpGet("page")]
+        public async Task<ActionResult> GetCollegesPage(int page = 1, int pageSize = DefaultPageSize,
+            string? fields = null, string? location = null)
+        {
+            if (page < 1 || pageSize < 1 || pageSize > MaxPageSize)
+                return BadRequest(new { message = $"page must be at least 1 and pageSize between 1 and {MaxPageSize}." });
+
+            List<string>? selected = null;
+            if (!string.IsNullOrWhiteSpace(fields))
+            {
+                var requested = fields.Split(',', StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries);
+                var unknown = requested.Where(f => !CollegeFields.ContainsKey(f)).ToList();
+                if (unknown.Count > 0)
+                    return BadRequest(new { message = $"Unknown field(s): {string.Join(", ", unknown)}" });
+                // Canonical names, in declaration order
+                selected = CollegeFields.Keys.Where(k => requested.Contains(k, StringComparer.OrdinalIgnoreCase)).ToList();
+            }
+
+            try
+            {
+                // Resources are only loaded when they will be returned
+                var includeResources = selected == null || selected.Contains("resources");
+                var result = await _dataService.GetCollegesPageAsync(page, pageSize, includeResources, location);
+                if (selected == null)
+                    return Ok(result);
+
+                var items = result.Items
+                    .Select(c => selected.ToDictionary(f => f, f => CollegeFields[f](c)))
+                    .ToList();
+                return Ok(new { items, result.Page, result.PageSize, result.Total });
+            }
+            catch (Exception ex)
+            {
+                Console.WriteLine($"Error in GetCollegesPage: {ex}");
+                return StatusCode(500, new { message = ex.Message, detail = ex.InnerException?.Message });
+            }
+        }
+
+        [HttpGet("count")]
+        public async Task<ActionResult<CollegeCounts>> GetCounts(string? location = null)
+        {
+            try
+            {
+                return Ok(await _dataService.GetCountsAsync(location));
+            }
+            catch (Exception ex)
+            {
+                return StatusCode(500, new { message = ex.Message });
+            }
+        }
+
         [HttpGet("{id}")]
         public async Task<ActionResult<College>> GetCollege(int id)
         {
@@ -1,5 +1,6 @@
 using Microsoft.AspNetCore.Mvc;
 using Microsoft.AspNetCore.Hosting;
+using Microsoft.Net.Http.Headers;
 using System.IO;
 using System.Text.Json;
 using MentalHealthDatabase.Models;
@@ -32,6 +33,17 @@ namespace MentalHealthDatabase.Controllers
         private static DateTime _cachedAt = DateTime.MinValue;
         private static readonly TimeSpan CacheTtl = TimeSpan.FromSeconds(30);
 
+        // Manifest written by Scripts/prepare_ui_payload.py, cached until the file changes.
+        private sealed record UiManifest(string ETag, bool Validated, Dictionary<string, (string Path, long Bytes)> Files, DateTime Stamp);
+        private static UiManifest? _cachedManifest = null;
+
+        // Map shard set (Scripts/ui_shards/manifest.json): "pins" and each shard key -> ETag + files
+        private sealed record UiShardManifest(bool Validated, Dictionary<string, (string ETag, Dictionary<string, (string Path, long Bytes)> Files)> Entries, DateTime Stamp);
+        private static UiShardManifest? _cachedShardManifest = null;
+
+        // Preferred order when the client accepts several precompressed variants.
+        private static readonly (string Key, string Token)[] PrecompressedEncodings = { ("br", "br"), ("gzip", "gzip") };
+
         [HttpPost]
         public async Task<ActionResult<MentalHealthResource>> CreateResource(MentalHealthResource resource)
         {
@@ -52,10 +64,20 @@ namespace MentalHealthDatabase.Controllers
             try
             {
                 var contentRoot = _env?.ContentRootPath ?? Directory.GetCurrentDirectory();
-                var path = Path.Combine(contentRoot, "Scripts", "ui_payload.json");
+                var scriptsDir = Path.Combine(contentRoot, "Scripts");
+                var path = Path.Combine(scriptsDir, "ui_payload.json");
                 if (!System.IO.File.Exists(path))
                     return NotFound(new { message = "UI payload not generated" });
 
+                // Fast path: payload was validated at build time, serve bytes straight from disk
+                var manifest = LoadUiManifest(Path.Combine(scriptsDir, "ui_payload.manifest.json"));
+                if (manifest is not null && manifest.Validated)
+                {
+                    var served = ServePrecompressed(scriptsDir, manifest.ETag, manifest.Files);
+                    if (served is not null)
+                        return served;
+                }
+
                 // Use cached payload when fresh
                 if (_cachedJson is null || DateTime.UtcNow - _cachedAt > CacheTtl)
                 {
@@ -85,6 +107,169 @@ namespace MentalHealthDatabase.Controllers
             }
         }
 
+        // Pins (name + lat/lon per college) for first paint of the map; cards come from shards.
+        [HttpGet("ui/pins")]
+        public ActionResult GetUiPins() => ServeShardEntry("pins");
+
+        [HttpGet("ui/shards/{key}")]
+        public ActionResult GetUiShard(string key) => ServeShardEntry(key);
+
+        private ActionResult ServeShardEntry(string key)
+        {
+            try
+            {
+                var contentRoot = _env?.ContentRootPath ?? Directory.GetCurrentDirectory();
+                var shardDir = Path.Combine(contentRoot, "Scripts", "ui_shards");
+                var manifest = LoadShardManifest(Path.Combine(shardDir, "manifest.json"));
+                if (manifest is null || !manifest.Validated)
+                    return NotFound(new { message = "UI shards not generated" });
+
+                // Only keys listed in the manifest are served, so paths never come from the request
+                if (!manifest.Entries.TryGetValue(key, out var entry))
+                    return NotFound(new { message = $"Unknown shard '{key}'" });
+
+                return ServePrecompressed(shardDir, entry.ETag, entry.Files)
+                    ?? StatusCode(503, new { message = "UI shards are being rebuilt" });
+            }
+            catch (Exception ex)
+            {
+                return StatusCode(500, new { message = ex.Message });
+            }
+        }
+
+        private static UiShardManifest? LoadShardManifest(string manifestPath)
+        {
+            if (!System.IO.File.Exists(manifestPath))
+                return null;
+
+            var stamp = System.IO.File.GetLastWriteTimeUtc(manifestPath);
+            var cached = _cachedShardManifest;
+            if (cached is not null && cached.Stamp == stamp)
+                return cached;
+
+            using var doc = JsonDocument.Parse(System.IO.File.ReadAllText(manifestPath));
+            var root = doc.RootElement;
+            var entries = new Dictionary<string, (string ETag, Dictionary<string, (string Path, long Bytes)> Files)>();
+
+            if (root.TryGetProperty("pins", out var pinsEl))
+                entries["pins"] = (pinsEl.GetProperty("etag").GetString() ?? string.Empty, ParseFiles(pinsEl));
+            if (root.TryGetProperty("shards", out var shardsEl))
+            {
+                foreach (var shard in shardsEl.EnumerateObject())
+                {
+                    if (shard.Name == "pins")
+                        continue;
+                    entries[shard.Name] = (shard.Value.GetProperty("etag").GetString() ?? string.Empty, ParseFiles(shard.Value));
+                }
+            }
+
+            var manifest = new UiShardManifest(
+                root.TryGetProperty("validated", out var validEl) && validEl.ValueKind == JsonValueKind.True,
+                entries,
+                stamp);
+            _cachedShardManifest = manifest;
+            return manifest;
+        }
+
+        private static Dictionary<string, (string Path, long Bytes)> ParseFiles(JsonElement owner)
+        {
+            var files = new Dictionary<string, (string Path, long Bytes)>();
+            if (owner.TryGetProperty("files", out var filesEl))
+            {
+                foreach (var entry in filesEl.EnumerateObject())
+                {
+                    var name = entry.Value.GetProperty("path").GetString();
+                    if (!string.IsNullOrEmpty(name))
+                        files[entry.Name] = (name, entry.Value.GetProperty("bytes").GetInt64());
+                }
+            }
+            return files;
+        }
+
+        private static UiManifest? LoadUiManifest(string manifestPath)
+        {
+            if (!System.IO.File.Exists(manifestPath))
+                return null;
+
+            var stamp = System.IO.File.GetLastWriteTimeUtc(manifestPath);
+            var cached = _cachedManifest;
+            if (cached is not null && cached.Stamp == stamp)
+                return cached;
+
+            using var doc = JsonDocument.Parse(System.IO.File.ReadAllText(manifestPath));
+            var root = doc.RootElement;
+            var manifest = new UiManifest(
+                root.TryGetProperty("etag", out var etagEl) ? etagEl.GetString() ?? string.Empty : string.Empty,
+                root.TryGetProperty("validated", out var validEl) && validEl.ValueKind == JsonValueKind.True,
+                ParseFiles(root),
+                stamp);
+            _cachedManifest = manifest;
+            return manifest;
+        }
+
+        // Returns null when the files on disk do not match the manifest (e.g. mid-rebuild)
+        private ActionResult? ServePrecompressed(string scriptsDir, string baseETag, Dictionary<string, (string Path, long Bytes)> files)
+        {
+            if (string.IsNullOrEmpty(baseETag) || !files.TryGetValue("identity", out var identity))
+                return null;
+
+            var acceptEncoding = Request?.Headers[HeaderNames.AcceptEncoding].ToString() ?? string.Empty;
+            var chosen = ("identity", string.Empty, identity);
+            foreach (var (key, token) in PrecompressedEncodings)
+            {
+                if (AcceptsEncoding(acceptEncoding, token) && files.TryGetValue(key, out var variant)
+                    && MatchesOnDisk(scriptsDir, variant))
+                {
+                    chosen = (key, token, variant);
+                    break;
+                }
+            }
+
+            var (_, contentEncoding, file) = chosen;
+            if (!MatchesOnDisk(scriptsDir, file))
+                return null;
+
+            // Strong validators must differ per content-coding
+            var etag = contentEncoding.Length == 0
+                ? baseETag
+                : baseETag.TrimEnd('"') + "-" + contentEncoding + "\"";
+
+            if (Response is not null)
+            {
+                Response.Headers[HeaderNames.Vary] = HeaderNames.AcceptEncoding;
+                Response.Headers[HeaderNames.CacheControl] = "no-cache";
+                if (contentEncoding.Length > 0)
+                    Response.Headers[HeaderNames.ContentEncoding] = contentEncoding;
+            }
+
+            // PhysicalFileResult answers If-None-Match with 304 and sets the ETag header
+            return PhysicalFile(
+                Path.GetFullPath(Path.Combine(scriptsDir, file.Path)),
+                "application/json",
+                lastModified: null,
+                entityTag: new EntityTagHeaderValue(etag));
+        }
+
+        private static bool MatchesOnDisk(string scriptsDir, (string Path, long Bytes) file)
+        {
+            var info = new FileInfo(Path.Combine(scriptsDir, file.Path));
+            return info.Exists && info.Length == file.Bytes;
+        }
+
+        private static bool AcceptsEncoding(string acceptEncoding, string token)
+        {
+            foreach (var part in acceptEncoding.Split(',', StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries))
+            {
+                var pieces = part.Split(';', StringSplitOptions.TrimEntries);
+                if (!string.Equals(pieces[0], token, StringComparison.OrdinalIgnoreCase))
+                    continue;
+                var q = pieces.Skip(1).FirstOrDefault(p => p.StartsWith("q=", StringComparison.OrdinalIgnoreCase));
+                return q is null || !double.TryParse(q[2..], System.Globalization.NumberStyles.Float,
+                    System.Globalization.CultureInfo.InvariantCulture, out var weight) || weight > 0;
+            }
+            return false;
+        }
+
         [HttpPost("bulk")]
         public async Task<ActionResult> BulkImport([FromBody] JsonElement payload, [FromHeader(Name = "X-Api-Token")] string? token)
         {
@@ -147,53 +332,17 @@ namespace MentalHealthDatabase.Controllers
             }
         }
 
-        [HttpPost("bulk")]
-        public async Task<ActionResult> ImportBulk([FromBody] JsonElement payload)
+        [HttpPost("bulk/delete")]
+        public async Task<ActionResult> BulkDelete([FromBody] List<string> names, [FromHeader(Name = "X-Api-Token")] string? token)
         {
             try
             {
-                // Map incoming payload (array of colleges with cards) to domain models
-                var colleges = new List<MentalHealthDatabase.Models.College>();
-                foreach (var collegeEl in payload.EnumerateArray())
-                {
-                    var college = new MentalHealthDatabase.Models.College
-                    {
-                        Name = collegeEl.GetProperty("name").GetString() ?? string.Empty,
-                        Location = collegeEl.GetProperty("location").GetString() ?? string.Empty,
-                        Website = collegeEl.GetProperty("website").GetString() ?? string.Empty,
-                        Latitude = collegeEl.TryGetProperty("latitude", out var latEl) ? latEl.GetDouble() : 0,
-                        Longitude = collegeEl.TryGetProperty("longitude", out var lonEl) ? lonEl.GetDouble() : 0,
-                        CreatedAt = DateTime.UtcNow,
-                        UpdatedAt = DateTime.UtcNow
-                    };
-
-                    if (collegeEl.TryGetProperty("cards", out var cardsEl))
-                    {
-                        foreach (var card in cardsEl.EnumerateArray())
-                        {
-                            var resource = new MentalHealthDatabase.Models.MentalHealthResource
-                            {
-                                ServiceName = card.GetProperty("title").GetString() ?? string.Empty,
-                                Description = card.GetProperty("description").GetString() ?? string.Empty,
-                                ContactWebsite = card.GetProperty("contact").GetProperty("website").GetString() ?? string.Empty,
-                                ContactEmail = card.GetProperty("contact").GetProperty("email").GetString() ?? string.Empty,
-                                ContactPhone = card.GetProperty("contact").GetProperty("phone").GetString() ?? string.Empty,
-                                Department = card.GetProperty("subtitle").GetString() ?? string.Empty,
-                                Location = card.GetProperty("meta").GetProperty("location").GetString() ?? string.Empty,
-                                OfficeHours = card.GetProperty("meta").GetProperty("office_hours").GetString() ?? string.Empty,
-                                FreshmanNotes = card.GetProperty("meta").GetProperty("freshman_notes").GetString() ?? string.Empty,
-                                CreatedAt = DateTime.UtcNow,
-                                UpdatedAt = DateTime.UtcNow
-                            };
-                            college.Resources.Add(resource);
-                        }
-                    }
-
-                    colleges.Add(college);
-                }
+                var expected = Environment.GetEnvironmentVariable("BULK_API_TOKEN");
+                if (!string.IsNullOrEmpty(expected) && expected != token)
+                    return Unauthorized(new { message = "Invalid API token" });
 
-                await _dataService.BulkImportAsync(colleges);
-                return Ok(new { imported = colleges.Count });
+                var deleted = await _dataService.DeleteCollegesByNameAsync(names);
+                return Ok(new { deleted });
             }
             catch (Exception ex)
             {
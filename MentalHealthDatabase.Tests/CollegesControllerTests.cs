@@ -57,6 +57,67 @@ public class CollegesControllerTests : IDisposable
         Assert.Equal(2, colleges.Count);
     }
 
+    // ── GetCollegesPage / GetCounts ───────────────────────
+
+    private async Task SeedCollegesAsync(int count)
+    {
+        using var ctx = _dbHelper.CreateContext();
+        for (var i = 0; i < count; i++)
+        {
+            var c = MakeCollege($"Univ {i:D2}");
+            c.Resources.Add(new MentalHealthResource { ServiceName = "Counseling" });
+            ctx.Colleges.Add(c);
+        }
+        await ctx.SaveChangesAsync();
+    }
+
+    [Fact]
+    public async Task GetCollegesPage_ReturnsRequestedPageAndTotal()
+    {
+        await SeedCollegesAsync(5);
+
+        var controller = CreateController();
+        var result = await controller.GetCollegesPage(page: 2, pageSize: 2);
+
+        var okResult = Assert.IsType<OkObjectResult>(result);
+        var paged = Assert.IsType<PagedResult<College>>(okResult.Value);
+        Assert.Equal(5, paged.Total);
+        Assert.Equal(new[] { "Univ 02", "Univ 03" }, paged.Items.Select(c => c.Name));
+        Assert.All(paged.Items, c => Assert.Single(c.Resources));
+    }
+
+    [Fact]
+    public async Task GetCollegesPage_UnknownField_Returns400()
+    {
+        var controller = CreateController();
+        var result = await controller.GetCollegesPage(fields: "name,password");
+
+        Assert.IsType<BadRequestObjectResult>(result);
+    }
+
+    [Fact]
+    public async Task GetCollegesPage_PageSizeTooLarge_Returns400()
+    {
+        var controller = CreateController();
+        var result = await controller.GetCollegesPage(pageSize: 100000);
+
+        Assert.IsType<BadRequestObjectResult>(result);
+    }
+
+    [Fact]
+    public async Task GetCounts_ReturnsCollegeAndResourceTotals()
+    {
+        await SeedCollegesAsync(3);
+
+        var controller = CreateController();
+        var result = await controller.GetCounts();
+
+        var okResult = Assert.IsType<OkObjectResult>(result.Result);
+        var counts = Assert.IsType<CollegeCounts>(okResult.Value);
+        Assert.Equal(3, counts.Colleges);
+        Assert.Equal(3, counts.Resources);
+    }
+
     // ── GetCollege(id) ────────────────────────────────────
 
     [Fact]
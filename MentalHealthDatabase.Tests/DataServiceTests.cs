@@ -289,6 +289,72 @@ public class DataServiceTests : IDisposable
         Assert.Single(all);
     }
 
+    [Fact]
+    public async Task BulkImportAsync_RepeatedNameInOneImport_LastOneWins()
+    {
+        var first = MakeCollege("Delta College", "First City");
+        var second = MakeCollege("Delta College", "Second City");
+
+        var service = CreateService();
+        await service.BulkImportAsync(new List<College> { first, second });
+
+        var verifyService = CreateService();
+        var all = await verifyService.GetAllCollegesWithResourcesAsync();
+        Assert.Single(all);
+        Assert.Equal("Second City", all[0].Location);
+    }
+
+    [Fact]
+    public async Task BulkImportAsync_SpansMultipleBatches_UpsertsAcrossBatches()
+    {
+        var count = DataService.BulkBatchSize + 10;
+        using (var ctx = _dbHelper.CreateContext())
+        {
+            // One existing college that lands in the second batch
+            ctx.Colleges.Add(MakeCollege($"College {count - 1}", "Old City"));
+            await ctx.SaveChangesAsync();
+        }
+
+        var colleges = Enumerable.Range(0, count)
+            .Select(i => MakeCollege($"College {i}", "New City"))
+            .ToList();
+        foreach (var c in colleges)
+            c.Resources.Add(new MentalHealthResource { ServiceName = "Svc" });
+
+        var service = CreateService();
+        await service.BulkImportAsync(colleges);
+
+        var verifyService = CreateService();
+        var all = await verifyService.GetAllCollegesWithResourcesAsync();
+        Assert.Equal(count, all.Count);
+        Assert.All(all, c => Assert.Equal("New City", c.Location));
+        Assert.All(all, c => Assert.Single(c.Resources));
+    }
+
+    // ── DeleteCollegesByNameAsync ────────────────────────
+
+    [Fact]
+    public async Task DeleteCollegesByNameAsync_RemovesOnlyNamedColleges()
+    {
+        using (var ctx = _dbHelper.CreateContext())
+        {
+            var gone = MakeCollege("Old College");
+            gone.Resources.Add(new MentalHealthResource { ServiceName = "Svc" });
+            ctx.Colleges.Add(gone);
+            ctx.Colleges.Add(MakeCollege("Kept University"));
+            await ctx.SaveChangesAsync();
+        }
+
+        var service = CreateService();
+        var deleted = await service.DeleteCollegesByNameAsync(new[] { "Old College", "Never Existed" });
+
+        Assert.Equal(1, deleted);
+        var verifyService = CreateService();
+        var all = await verifyService.GetAllCollegesWithResourcesAsync();
+        Assert.Single(all);
+        Assert.Equal("Kept University", all[0].Name);
+    }
+
     // ── AddResourceAsync ─────────────────────────────────
 
     [Fact]
@@ -0,0 +1,16 @@
+namespace MentalHealthDatabase.Models
+{
+    public class PagedResult<T>
+    {
+        public List<T> Items { get; set; } = new List<T>();
+        public int Page { get; set; }
+        public int PageSize { get; set; }
+        public int Total { get; set; }
+    }
+
+    public class CollegeCounts
+    {
+        public int Colleges { get; set; }
+        public int Resources { get; set; }
+    }
+}
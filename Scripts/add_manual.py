@@ -1,5 +1,12 @@
-"""One-time: add University of Cincinnati with manual CAPS data."""
-import json, os
+"""One-time: add University of Cincinnati with manual CAPS data.
+
+Writes the starter and scraped JSON data files, or with --db DB the
+colleges table of a staging database (see staging_store.py).
+"""
+import argparse, json, os, sys
+
+from name_matcher import NameMatcher
+from staging_store import StagingStore
 
 UC_ENTRY = {
     "name": "University of Cincinnati",
@@ -45,13 +52,18 @@ UC_ENTRY = {
     "scraped_at": "2026-03-03T00:00:00.000000"
 }
 
-base = os.path.dirname(__file__)
-for fname in ["starter_colleges_data.json", "scraped_colleges_data.json"]:
-    path = os.path.join(base, fname)
-    data = json.load(open(path, "r", encoding="utf-8"))
+# Any existing UC entry (thin scraped version), however it was spelled
+uc_match = NameMatcher()
+uc_match.add("uc", UC_ENTRY["name"], UC_ENTRY["website"])
+
 
-    # Remove any existing UC entry (thin scraped version)
-    data = [c for c in data if c["name"] != "University of Cincinnati"]
+def is_uc(college):
+    return uc_match.match(college["name"], college.get("website")) is not None
+
+
+def add_to_file(path):
+    data = json.load(open(path, "r", encoding="utf-8"))
+    data = [c for c in data if not is_uc(c)]
 
     # Add the manual entry
     data.append(UC_ENTRY)
@@ -63,6 +75,34 @@ for fname in ["starter_colleges_data.json", "scraped_colleges_data.json"]:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
     uc = [c for c in data if c["name"] == "University of Cincinnati"][0]
-    print(f"{fname}: {len(data)} colleges, UC has {len(uc['resources'])} resources")
+    print(f"{os.path.basename(path)}: {len(data)} colleges, UC has {len(uc['resources'])} resources")
+
+
+def add_to_store(path):
+    with StagingStore(path) as store, store.transaction():
+        for college in list(store.colleges()):
+            if is_uc(college):
+                store.delete_college(college["name"])
+        store.upsert_college(UC_ENTRY)
+        uc = store.get_college(UC_ENTRY["name"])
+        print(f"{path}: {store.count('colleges')} colleges, UC has {len(uc['resources'])} resources")
+
+
+def main(argv=None):
+    base = os.path.dirname(__file__)
+    parser = argparse.ArgumentParser(description="Add University of Cincinnati with manual CAPS data.")
+    parser.add_argument("--db", help="Write to this staging database instead of the JSON data files")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        add_to_store(args.db)
+    else:
+        for fname in ["starter_colleges_data.json", "scraped_colleges_data.json"]:
+            add_to_file(os.path.join(base, fname))
+
+    print("Done.")
+    return 0
+
 
-print("Done.")
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Dataset analytics for scraped (or imported) college data.
+
+Loads a dataset once into column arrays (one per field, colleges and
+resources side by side) and computes every aggregate the old report scripts
+printed in one pass over those columns:
+    - totals, unique names and per-state college/resource counts
+    - field completeness rates for colleges and resources
+    - resources per college (distribution, colleges with none)
+    - quality score distribution (scorer.Scorer over each resource's text)
+    - the validator's common issues (no contact info, short descriptions)
+
+Records may use the scraper's snake_case fields or the API's camelCase
+ones, so the same summary works on a file and on GET /api/colleges/page.
+
+Usage:
+    python analytics.py                              # scraped_colleges_data.json
+    python analytics.py --file starter_colleges_data.json --state Ohio
+    python analytics.py --list                       # also list every college
+    python analytics.py --json > report.json
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import re
+import statistics
+import sys
+from array import array
+
+from scorer import Scorer
+from validate_data import MIN_DESCRIPTION_LENGTH, SCRAPED_FILE
+
+COLLEGE_FIELDS = ('name', 'location', 'latitude', 'longitude', 'website')
+RESOURCE_FIELDS = ('service_name', 'description', 'contact_email', 'contact_phone', 'contact_website',
+                   'department', 'office_hours', 'location', 'freshman_notes')
+CONTACT_FIELDS = ('contact_email', 'contact_phone', 'contact_website')
+# Upper bounds of the resources-per-college buckets; the last bucket is open
+RESOURCE_BUCKETS = (0, 1, 3, 7)
+SCORE_BUCKET = 10
+
+_CAMEL_RE = re.compile(r'(?<!^)(?=[A-Z])')
+
+
+@functools.lru_cache(maxsize=None)
+def snake_case(key):
+    """'serviceName' -> 'service_name' (snake_case keys pass through)."""
+    return _CAMEL_RE.sub('_', key).lower()
+
+
+def _snake_record(record):
+    """record with snake_case keys (the record itself when it already has them)."""
+    if all(k == k.lower() for k in record):
+        return record
+    return {snake_case(k): v for k, v in record.items()}
+
+
+@functools.lru_cache(maxsize=4096)
+def state_of(location):
+    """State part of 'City, State' ('Unknown' when there is none)."""
+    state = (location or '').rsplit(',', 1)[-1].strip() if ',' in (location or '') else ''
+    return state or 'Unknown'
+
+
+def _bucket_label(upper, previous):
+    if upper == previous + 1:
+        return str(upper)
+    return f'{previous + 1}-{upper}'
+
+
+class Dataset:
+    """Column arrays for a list of college records."""
+
+    def __init__(self, colleges, scorer=None):
+        scorer = scorer or Scorer()
+        self.names, self.locations, self.states = [], [], []
+        self.latitude, self.longitude = array('d'), array('d')
+        self.college_fields = {f: bytearray() for f in COLLEGE_FIELDS}
+        self.resource_counts = array('I')
+        self.resource_college = array('I')   # row -> college row
+        self.service_names = []
+        self.description_length = array('I')
+        self.scores = array('B')
+        self.resource_fields = {f: bytearray() for f in RESOURCE_FIELDS}
+
+        # Scraped data repeats boilerplate resource text across campuses; score each text once
+        scored = {}
+        college_columns = list(self.college_fields.items())
+        resource_columns = list(self.resource_fields.items())
+        for row, raw in enumerate(colleges):
+            college = _snake_record(raw)
+            location = college.get('location') or ''
+            self.names.append(college.get('name') or '')
+            self.locations.append(location)
+            self.states.append(state_of(location))
+            self.latitude.append(_float(college.get('latitude')))
+            self.longitude.append(_float(college.get('longitude')))
+            for field, column in college_columns:
+                value = college.get(field)
+                column.append(bool(value.strip()) if isinstance(value, str) else value is not None)
+            resources = college.get('resources') or []
+            self.resource_counts.append(len(resources))
+            for raw_resource in resources:
+                resource = _snake_record(raw_resource)
+                self.resource_college.append(row)
+                service_name = resource.get('service_name') or ''
+                description = resource.get('description') or ''
+                self.service_names.append(service_name)
+                self.description_length.append(len(description))
+                text = f'{service_name} {description}'
+                score = scored.get(text)
+                if score is None:
+                    score = scored[text] = scorer.score_text(text)
+                self.scores.append(score)
+                for field, column in resource_columns:
+                    value = resource.get(field)
+                    column.append(bool(value.strip()) if isinstance(value, str) else value is not None)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows(self, state=None):
+        """College rows, optionally only those in state (case-insensitive)."""
+        if state is None:
+            return range(len(self.names))
+        wanted = state.strip().lower()
+        return [i for i, s in enumerate(self.states) if s.lower() == wanted]
+
+    def summary(self, state=None):
+        """Every aggregate, computed in one pass over the selected rows."""
+        rows = self.rows(state)
+        selected = bytearray(len(self.names))
+        for i in rows:
+            selected[i] = 1
+
+        per_state = {}
+        college_filled = dict.fromkeys(COLLEGE_FIELDS, 0)
+        counts, empty, names = [], [], set()
+        for i in rows:
+            n = self.resource_counts[i]
+            counts.append(n)
+            names.add(self.names[i])
+            if n == 0:
+                empty.append(self.names[i])
+            entry = per_state.setdefault(self.states[i], {'colleges': 0, 'resources': 0})
+            entry['colleges'] += 1
+            entry['resources'] += n
+            for field, column in self.college_fields.items():
+                college_filled[field] += column[i]
+
+        resource_filled = dict.fromkeys(RESOURCE_FIELDS, 0)
+        scores, no_contact, short = [], 0, 0
+        contact_columns = [self.resource_fields[f] for f in CONTACT_FIELDS]
+        for j, college in enumerate(self.resource_college):
+            if not selected[college]:
+                continue
+            scores.append(self.scores[j])
+            for field, column in self.resource_fields.items():
+                resource_filled[field] += column[j]
+            if not any(column[j] for column in contact_columns):
+                no_contact += 1
+            if 0 < self.description_length[j] < MIN_DESCRIPTION_LENGTH:
+                short += 1
+
+        colleges, resources = len(counts), len(scores)
+        return {
+            'state': state,
+            'colleges': colleges,
+            'unique_names': len(names),
+            'resources': resources,
+            'per_state': dict(sorted(per_state.items())),
+            'college_completeness': _rates(college_filled, colleges),
+            'resource_completeness': _rates(resource_filled, resources),
+            'resources_per_college': _distribution(counts, _resource_histogram(counts)),
+            'colleges_without_resources': sorted(empty),
+            'scores': _distribution(scores, _score_histogram(scores)),
+            'issues': {'no_contact': no_contact, 'short_description': short},
+        }
+
+    def colleges(self, state=None):
+        """(name, location, resource count) per selected college, sorted by name."""
+        return sorted((self.names[i], self.locations[i], self.resource_counts[i]) for i in self.rows(state))
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _rates(filled, total):
+    return {field: round(n / total, 4) if total else 0.0 for field, n in filled.items()}
+
+
+def _distribution(values, histogram):
+    if not values:
+        return {'min': None, 'max': None, 'mean': None, 'median': None, 'histogram': histogram}
+    return {
+        'min': min(values),
+        'max': max(values),
+        'mean': round(sum(values) / len(values), 2),
+        'median': statistics.median(values),
+        'histogram': histogram,
+    }
+
+
+def _resource_histogram(counts):
+    labels, previous = [], -1
+    for upper in RESOURCE_BUCKETS:
+        labels.append(_bucket_label(upper, previous))
+        previous = upper
+    labels.append(f'{previous + 1}+')
+    histogram = dict.fromkeys(labels, 0)
+    for n in counts:
+        for label, upper in zip(labels, RESOURCE_BUCKETS):
+            if n <= upper:
+                histogram[label] += 1
+                break
+        else:
+            histogram[labels[-1]] += 1
+    return histogram
+
+
+def _score_histogram(scores):
+    histogram = {f'{lo}-{lo + SCORE_BUCKET - 1}': 0 for lo in range(0, 100, SCORE_BUCKET)}
+    histogram['100'] = 0
+    for score in scores:
+        if score >= 100:
+            histogram['100'] += 1
+        else:
+            lo = score // SCORE_BUCKET * SCORE_BUCKET
+            histogram[f'{lo}-{lo + SCORE_BUCKET - 1}'] += 1
+    return histogram
+
+
+def print_summary(summary, colleges=None):
+    title = f"DATASET REPORT ({summary['state']})" if summary['state'] else 'DATASET REPORT'
+    print('=' * 70)
+    print(title)
+    print('=' * 70)
+    print(f"Colleges: {summary['colleges']} ({summary['unique_names']} unique names)"
+          f"   Resources: {summary['resources']}")
+
+    print('\n-- PER STATE:')
+    for state, entry in summary['per_state'].items():
+        print(f"   {state:24} {entry['colleges']:5} colleges {entry['resources']:6} resources")
+
+    rpc = summary['resources_per_college']
+    print('\n-- RESOURCES PER COLLEGE:')
+    if rpc['mean'] is not None:
+        print(f"   min {rpc['min']}  median {rpc['median']}  mean {rpc['mean']}  max {rpc['max']}")
+    print('   ' + '  '.join(f'{label}: {n}' for label, n in rpc['histogram'].items()))
+    if summary['colleges_without_resources']:
+        print(f"   Without resources ({len(summary['colleges_without_resources'])}): "
+              + ', '.join(summary['colleges_without_resources'][:10])
+              + (' ...' if len(summary['colleges_without_resources']) > 10 else ''))
+
+    print('\n-- FIELD COMPLETENESS:')
+    for label, rates in (('college', summary['college_completeness']),
+                         ('resource', summary['resource_completeness'])):
+        for field, rate in rates.items():
+            print(f"   {label:8} {field:16} {rate:7.1%}")
+
+    scores = summary['scores']
+    print('\n-- QUALITY SCORES:')
+    if scores['mean'] is not None:
+        print(f"   min {scores['min']}  median {scores['median']}  mean {scores['mean']}  max {scores['max']}")
+    print('   ' + '  '.join(f'{label}: {n}' for label, n in scores['histogram'].items() if n))
+
+    print('\n-- COMMON ISSUES:')
+    print(f"   No contact info:    {summary['issues']['no_contact']}")
+    print(f"   Short descriptions: {summary['issues']['short_description']}")
+
+    if colleges is not None:
+        print('\n-- COLLEGES:')
+        for name, location, n in colleges:
+            print(f"   {n:3} | {name} ({location})")
+    print('=' * 70)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Aggregate statistics for a college dataset.')
+    parser.add_argument('--file', default=SCRAPED_FILE, help='Dataset JSON (default: scraped_colleges_data.json)')
+    parser.add_argument('--state', help="Only colleges in this state (e.g. 'Ohio')")
+    parser.add_argument('--list', action='store_true', help='Also list every college with its resource count')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file):
+        print(f"[FAIL] File not found: {args.file}")
+        return 1
+    dataset = Dataset.load(args.file)
+    summary = dataset.summary(args.state)
+    if args.json:
+        if args.list:
+            summary['college_list'] = [{'name': n, 'location': loc, 'resources': r}
+                                       for n, loc, r in dataset.colleges(args.state)]
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+    else:
+        print_summary(summary, dataset.colleges(args.state) if args.list else None)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
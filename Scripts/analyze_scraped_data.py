@@ -1,37 +1,30 @@
-import json
+from analytics import Dataset
 
-# Read the scraped data
-with open('scraped_colleges_data.json', 'r', encoding='utf-8') as f:
-    data = json.load(f)
+# Read the scraped data once into columns
+data = Dataset.load('scraped_colleges_data.json')
+summary = data.summary()
 
-# Get unique schools
+# Merge repeated entries for the same school
 unique_schools = {}
-for college in data:
-    name = college['name']
-    if name not in unique_schools:
-        unique_schools[name] = {
-            'location': college['location'],
-            'resources': college.get('resources', [])
-        }
-    else:
-        # Merge resources
-        unique_schools[name]['resources'].extend(college.get('resources', []))
+for name, location, resource_count in data.colleges():
+    entry = unique_schools.setdefault(name, {'location': location, 'resources': 0})
+    entry['resources'] += resource_count
 
 # Print summary
-print(f"Total entries: {len(data)}")
-print(f"Unique schools: {len(unique_schools)}")
+print(f"Total entries: {summary['colleges']}")
+print(f"Unique schools: {summary['unique_names']}")
 print("\n" + "="*70)
 print("SCHOOLS SCRAPED:")
 print("="*70)
 
+ohio_names = {name for name, _, _ in data.colleges(state='Ohio')}
 ohio_schools = []
 other_schools = []
 
 for name, info in sorted(unique_schools.items()):
-    resource_count = len(info['resources'])
-    school_info = f"{name} ({info['location']}) - {resource_count} resources"
-    
-    if 'Ohio' in info['location']:
+    school_info = f"{name} ({info['location']}) - {info['resources']} resources"
+
+    if name in ohio_names:
         ohio_schools.append(school_info)
     else:
         other_schools.append(school_info)
@@ -47,3 +40,4 @@ for school in other_schools:
 print(f"\n{'='*70}")
 print(f"SUMMARY: {len(ohio_schools)} Ohio schools + {len(other_schools)} other schools = {len(unique_schools)} total")
 print("="*70)
+print("For per-state totals, field completeness and score distributions: python analytics.py")
@@ -0,0 +1,114 @@
+"""
+Load test for the bulk import endpoint.
+
+Generates synthetic colleges, imports them through importer.APIClient and
+reports rows/sec for a fresh insert and for a re-import of the same names
+(the upsert/replace path). The synthetic colleges are deleted afterwards
+unless --keep is given, so point it at a scratch database anyway.
+
+Usage:
+    python bench_bulk_import.py                           # 100, 1000, 10000 colleges
+    python bench_bulk_import.py --sizes 100 1000          # custom sizes
+    python bench_bulk_import.py --base-url http://host:port/api --json bench.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from importer import DEFAULT_API_BASE, APIClient, build_college_payload
+
+DEFAULT_SIZES = (100, 1000, 10000)
+DEFAULT_RESOURCES_PER_COLLEGE = 3
+NAME_PREFIX = "Load Test College"
+
+
+def make_colleges(count, resources_per_college=DEFAULT_RESOURCES_PER_COLLEGE, run_id=""):
+    """Synthetic colleges in the scraped-data format, with unique names."""
+    colleges = []
+    for i in range(count):
+        name = f"{NAME_PREFIX} {run_id}{i:05d}"
+        colleges.append({
+            "name": name,
+            "location": "Columbus, Ohio",
+            "latitude": 39.0 + (i % 1000) / 1000,
+            "longitude": -83.0 - (i // 1000) / 100,
+            "website": f"https://loadtest{i}.example.edu",
+            "resources": [
+                {
+                    "service_name": f"Counseling Service {r}",
+                    "description": "Individual and group counseling for enrolled students.",
+                    "contact_email": f"caps{r}@loadtest{i}.example.edu",
+                    "contact_phone": "614-555-0100",
+                    "contact_website": f"https://loadtest{i}.example.edu/caps",
+                    "office_hours": "Mon-Fri 8am-5pm",
+                }
+                for r in range(resources_per_college)
+            ],
+        })
+    return colleges
+
+
+def timed_import(client, payloads):
+    started = time.perf_counter()
+    client.bulk_import(payloads)
+    return time.perf_counter() - started
+
+
+def run_size(client, count, resources_per_college, keep=False):
+    """Insert then re-import count colleges; return a result dict."""
+    payloads = [build_college_payload(c) for c in
+                make_colleges(count, resources_per_college, run_id=f"{int(time.time())}-")]
+    rows = count * (1 + resources_per_college)
+    result = {"colleges": count, "rows": rows}
+    try:
+        for phase in ("insert", "upsert"):
+            seconds = timed_import(client, payloads)
+            result[phase] = {
+                "seconds": round(seconds, 3),
+                "colleges_per_sec": round(count / seconds, 1),
+                "rows_per_sec": round(rows / seconds, 1),
+            }
+            print(f"   {phase:<6} {count:>6} colleges  {seconds:8.2f}s  "
+                  f"{result[phase]['rows_per_sec']:>10,.0f} rows/s")
+    finally:
+        if not keep:
+            client.delete_colleges(p["name"] for p in payloads)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bulk import throughput.")
+    parser.add_argument("--base-url", default=DEFAULT_API_BASE,
+                        help=f"API base URL (default: {DEFAULT_API_BASE})")
+    parser.add_argument("--api-key", default="", help="API key for authenticated write access")
+    parser.add_argument("--api-token", default="", help="X-Api-Token for the bulk delete endpoint")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="College counts to test (default: 100 1000 10000)")
+    parser.add_argument("--resources-per-college", type=int, default=DEFAULT_RESOURCES_PER_COLLEGE)
+    parser.add_argument("--keep", action="store_true", help="Leave the synthetic colleges in the database")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    client = APIClient(base_url=args.base_url, api_key=args.api_key)
+    if args.api_token:
+        client.session.headers["X-Api-Token"] = args.api_token
+    if not client.health_check():
+        print(f"[FAIL] API is not reachable: {args.base_url}")
+        return 1
+
+    print(f"[NET] Bulk import load test against {args.base_url}")
+    results = []
+    for count in args.sizes:
+        results.append(run_size(client, count, args.resources_per_college, args.keep))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"[OK] Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Startup-time benchmark for the Scripts entry points.
+
+Each entry point is timed in a fresh interpreter, so nothing is cached
+between runs: once for "import <module>" and, for the argparse CLIs, once
+for "<module>.py --help". The time of a bare "python -c pass" is
+subtracted, so the numbers are what the module itself costs. Each
+measurement also lists which heavy third-party packages (requests, urllib3,
+bs4) the import pulled in. Those should load only when a command actually
+fetches, parses or posts.
+
+Usage:
+    python bench_startup.py                          # every entry point, 5 runs each
+    python bench_startup.py --runs 10 simple_scraper importer
+    python bench_startup.py --json startup.json --max-ms 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RUNS = 5
+HEAVY_MODULES = ("requests", "urllib3", "bs4")
+
+# module -> whether "python <module>.py --help" is safe (argparse, no side effects)
+ENTRY_POINTS = {
+    "simple_scraper": True,
+    "distributed_scrape": True,
+    "importer": False,
+    "validate_data": False,
+    "prepare_ui_payload": True,
+    "publish_to_api": True,
+    "staging_store": True,
+    "analytics": True,
+    "search_index": True,
+    "spatial_index": True,
+    "snapshot_diff": True,
+    "mhdb": True,
+}
+
+
+def run_once(args):
+    """Wall-clock seconds for one fresh interpreter running args."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=HERE, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def median_ms(args, runs):
+    return statistics.median(run_once(args) for _ in range(runs)) * 1000
+
+
+def heavy_imports(module):
+    """Which HEAVY_MODULES are loaded after importing module."""
+    code = (f"import sys, {module}; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=HERE, check=True,
+                         capture_output=True, text=True).stdout
+    return out.split()
+
+
+def bench(modules, runs=DEFAULT_RUNS):
+    """One result dict per module: import/--help time in ms and heavy imports."""
+    baseline = median_ms(["-c", "pass"], runs)
+    results = []
+    for module in modules:
+        result = {
+            "module": module,
+            "import_ms": round(max(0.0, median_ms(["-c", f"import {module}"], runs) - baseline), 1),
+            "help_ms": None,
+            "heavy_imports": heavy_imports(module),
+        }
+        if ENTRY_POINTS.get(module):
+            help_ms = median_ms([f"{module}.py", "--help"], runs) - baseline
+            result["help_ms"] = round(max(0.0, help_ms), 1)
+        results.append(result)
+    return {"python": sys.version.split()[0], "runs": runs, "baseline_ms": round(baseline, 1),
+            "results": results}
+
+
+def print_report(report):
+    print(f"Python {report['python']}, median of {report['runs']} run(s), "
+          f"interpreter baseline {report['baseline_ms']:.1f} ms (subtracted)")
+    print(f"   {'module':<22} {'import':>9} {'--help':>9}  heavy imports")
+    for r in report["results"]:
+        help_ms = f"{r['help_ms']:7.1f}ms" if r["help_ms"] is not None else f"{'-':>9}"
+        print(f"   {r['module']:<22} {r['import_ms']:7.1f}ms {help_ms}  {', '.join(r['heavy_imports']) or '-'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure start-up time of the Scripts entry points.")
+    parser.add_argument("modules", nargs="*", help="Entry points to time (default: all)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help=f"Interpreter launches per measurement (default: {DEFAULT_RUNS})")
+    parser.add_argument("--json", help="Also write results to this file")
+    parser.add_argument("--max-ms", type=float,
+                        help="Exit 1 if any import or --help takes longer than this")
+    args = parser.parse_args(argv)
+
+    unknown = [m for m in args.modules if m not in ENTRY_POINTS]
+    if unknown:
+        parser.error(f"unknown entry point(s): {', '.join(unknown)}")
+    report = bench(args.modules or list(ENTRY_POINTS), max(1, args.runs))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[OK] Results written to {args.json}")
+    if args.max_ms is not None:
+        slow = [r["module"] for r in report["results"]
+                if max(r["import_ms"], r["help_ms"] or 0) > args.max_ms]
+        if slow:
+            print(f"[FAIL] Over {args.max_ms:g} ms: {', '.join(slow)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
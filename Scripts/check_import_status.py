@@ -1,25 +1,21 @@
-import requests
-import urllib3
+from analytics import Dataset
+from importer import APIClient
 
-urllib3.disable_warnings()
+client = APIClient()
 
-# Get all colleges
-response = requests.get('http://localhost:58346/api/colleges', verify=False)
-colleges = response.json()
+# Totals come from the count endpoint; only Ohio schools are listed
+totals = client.get_counts()
+ohio_counts = client.get_counts(location='Ohio')
 
 print(f"{'='*70}")
 print(f"DATABASE IMPORT STATUS")
 print(f"{'='*70}\n")
 
-print(f"Total Colleges in Database: {len(colleges)}")
+print(f"Total Colleges in Database: {totals['colleges']}")
+print(f"Ohio Schools: {ohio_counts['colleges']}")
+print(f"Total Resources: {totals['resources']}\n")
 
-# Count Ohio schools
-ohio_schools = [c for c in colleges if 'Ohio' in c.get('location', '')]
-print(f"Ohio Schools: {len(ohio_schools)}")
-
-# Count total resources
-total_resources = sum(len(c.get('resources', [])) for c in colleges)
-print(f"Total Resources: {total_resources}\n")
+ohio_schools = list(client.iter_colleges(fields=['name', 'location', 'resources'], location='Ohio'))
 
 # Show recent Ohio schools (likely our imports)
 print(f"{'='*70}")
@@ -49,5 +45,10 @@ for college in sorted(ohio_schools, key=lambda x: x.get('name', '')):
     print()
 
 print(f"{'='*70}")
-print(f"SUMMARY: {len(ohio_schools)} Ohio schools, {sum(len(c.get('resources', [])) for c in ohio_schools)} resources")
+print(f"SUMMARY: {ohio_counts['colleges']} Ohio schools, {ohio_counts['resources']} resources")
+# Same aggregates analytics.py prints for files, over the API's records
+ohio_summary = Dataset(ohio_schools).summary()
+print(f"Without resources: {len(ohio_summary['colleges_without_resources'])}, "
+      f"no contact info: {ohio_summary['issues']['no_contact']}, "
+      f"median quality score: {ohio_summary['scores']['median']}")
 print(f"{'='*70}")
@@ -3,8 +3,13 @@
 Flags a resource as bad if its service_name or description contains
 keywords associated with dental services, academic degree programs,
 error pages, cookie banners, or other irrelevant content.
+
+With --db DB the colleges table of a staging database (see
+staging_store.py) is cleaned instead; only changed colleges are rewritten.
 """
-import json, os, re, sys
+import argparse, json, os, re, sys
+
+from staging_store import StagingStore
 
 BAD_PATTERNS = [
     # Dental / medical (non-mental-health)
@@ -68,15 +73,13 @@ def is_bad_resource(r):
     return False, ""
 
 
-def clean_file(path):
-    if not os.path.exists(path):
-        print(f"  SKIP (not found): {path}")
-        return
+def clean_colleges(data):
+    """Drop bad resources, then colleges left without any.
 
-    data = json.load(open(path, "r", encoding="utf-8"))
-    total_before = sum(len(c.get("resources", [])) for c in data)
+    Returns (kept colleges, [(college name, service_name, reason)]).
+    The college dicts are updated in place.
+    """
     removed = []
-
     for college in data:
         clean = []
         for r in college.get("resources", []):
@@ -88,13 +91,49 @@ def clean_file(path):
         college["resources"] = clean
 
     # Drop colleges that ended up with zero resources
-    colleges_before = len(data)
-    data = [c for c in data if c.get("resources")]
-    colleges_after = len(data)
+    return [c for c in data if c.get("resources")], removed
+
 
+def clean_file(path):
+    if not os.path.exists(path):
+        print(f"  SKIP (not found): {path}")
+        return
+
+    data = json.load(open(path, "r", encoding="utf-8"))
+    total_before = sum(len(c.get("resources", [])) for c in data)
+    colleges_before = len(data)
+    data, removed = clean_colleges(data)
     total_after = sum(len(c.get("resources", [])) for c in data)
+    report(os.path.basename(path), colleges_before, len(data), total_before, total_after, removed)
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"    Written: {path}")
+
+
+def clean_store(path):
+    """Clean a staging database one college at a time."""
+    with StagingStore(path) as store, store.transaction():
+        colleges_before = colleges_after = total_before = total_after = 0
+        removed = []
+        for college in store.colleges():
+            colleges_before += 1
+            total_before += len(college["resources"])
+            kept, dropped = clean_colleges([college])
+            removed.extend(dropped)
+            if not kept:
+                store.delete_college(college["name"])
+                continue
+            colleges_after += 1
+            total_after += len(college["resources"])
+            if dropped:
+                store.upsert_college(college)
+        report(path, colleges_before, colleges_after, total_before, total_after, removed)
+    print(f"    Written: {path}")
+
 
-    print(f"\n  {os.path.basename(path)}:")
+def report(label, colleges_before, colleges_after, total_before, total_after, removed):
+    print(f"\n  {label}:")
     print(f"    Colleges: {colleges_before} -> {colleges_after}")
     print(f"    Resources: {total_before} -> {total_after}  (removed {total_before - total_after})")
     if removed:
@@ -102,14 +141,26 @@ def clean_file(path):
         for cname, rname, reason in removed:
             print(f"      [{cname[:35]}] {rname[:60]} ({reason})")
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"    Written: {path}")
 
-
-if __name__ == "__main__":
+def main(argv=None):
     base = os.path.dirname(__file__)
+    parser = argparse.ArgumentParser(description="Remove non-mental-health resources from data files in place.")
+    parser.add_argument("files", nargs="*",
+                        default=[os.path.join(base, "scraped_colleges_data.json"),
+                                 os.path.join(base, "starter_colleges_data.json")],
+                        help="Data files to clean (default: scraped and starter data)")
+    parser.add_argument("--db", help="Clean this staging database instead of the data files")
+    args = parser.parse_args(argv)
+
     print("=== Cleaning seed data ===")
-    clean_file(os.path.join(base, "scraped_colleges_data.json"))
-    clean_file(os.path.join(base, "starter_colleges_data.json"))
+    if args.db:
+        clean_store(args.db)
+    else:
+        for path in args.files:
+            clean_file(path)
     print("\nDone.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
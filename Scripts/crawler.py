@@ -0,0 +1,196 @@
+"""
+Bounded same-site crawl frontier for discovering counseling pages.
+
+Starts from a college's website and seed mental_health_urls, follows
+same-site links in priority order (anchor text and URL keywords from
+keywords.py) and stops once the depth or page budget is exhausted.
+
+Usage:
+    frontier = CrawlFrontier.for_college(college, max_depth=2, max_pages=8)
+    while (item := frontier.pop()) is not None:
+        url, depth = item
+        ...
+        for link, anchor in extract_links(soup, url):
+            frontier.add(link, depth + 1, score_link(link, anchor))
+"""
+
+import heapq
+import re
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+
+from keywords import MENTAL_HEALTH_KEYWORDS, NON_MENTAL_KEYWORDS
+
+DEFAULT_MAX_DEPTH = 2
+DEFAULT_MAX_PAGES = 8
+
+# Seeds always outrank discovered links; the homepage is a last resort.
+SEED_SCORE = 100
+WEBSITE_SCORE = 1
+
+# Discovered links must score at least this much to enter the frontier
+MIN_LINK_SCORE = 1
+
+ANCHOR_WEIGHT = 3
+PATH_WEIGHT = 2
+
+# Extra URL/anchor hints that are not strong enough for keywords.py
+LINK_HINTS = ['wellness', 'psych', 'crisis', 'student-health', 'health-center']
+
+TRACKING_PARAMS = {
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'gclid', 'fbclid', 'mc_cid', 'mc_eid',
+}
+
+SKIP_EXTENSIONS = (
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.zip',
+    '.jpg', '.jpeg', '.png', '.gif', '.svg', '.webp', '.ico',
+    '.mp3', '.mp4', '.mov', '.avi', '.css', '.js', '.xml', '.ics',
+)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def canonicalize_url(url, base=None):
+    """Return a canonical form of url (or None if it is not crawlable).
+
+    Resolves against base, lowercases scheme and host, drops default ports,
+    fragments, tracking parameters and trailing slashes, and sorts the query.
+    """
+    if not url:
+        return None
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return None
+    scheme = parsed.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parsed.hostname:
+        return None
+
+    host = parsed.hostname.lower()
+    try:
+        port = parsed.port
+    except ValueError:
+        return None
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f'{host}:{port}'
+
+    path = re.sub(r'/{2,}', '/', parsed.path or '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+             if k.lower() not in TRACKING_PARAMS]
+    query.sort()
+
+    return urlunparse((scheme, host, path, '', urlencode(query), ''))
+
+
+def site_domain(url):
+    """Return the host of url without a leading 'www.'."""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_same_site(url, domains):
+    """True if url's host equals, or is a subdomain of, one of domains."""
+    host = (urlparse(url).hostname or '').lower()
+    return any(host == d or host.endswith('.' + d) for d in domains)
+
+
+def score_link(url, anchor_text=''):
+    """Score how likely a link leads to a mental health services page."""
+    anchor = (anchor_text or '').lower()
+    path = urlparse(url).path.lower()
+    path_words = re.sub(r'[-_/.]+', ' ', path)
+
+    score = 0
+    for kw in MENTAL_HEALTH_KEYWORDS + LINK_HINTS:
+        words = kw.replace('-', ' ')
+        if words in anchor:
+            score += ANCHOR_WEIGHT
+        if words in path_words or kw.replace(' ', '') in path:
+            score += PATH_WEIGHT
+    for kw in NON_MENTAL_KEYWORDS:
+        if kw in anchor or kw.replace(' ', '-') in path:
+            score -= ANCHOR_WEIGHT
+    return score
+
+
+def extract_links(soup, base_url):
+    """Return (canonical_url, anchor_text) pairs for every <a href> in soup."""
+    links = []
+    for a in soup.find_all('a', href=True):
+        href = a.get('href', '')
+        if href.startswith(('mailto:', 'tel:', 'javascript:', '#')):
+            continue
+        url = canonicalize_url(href, base_url)
+        if not url or urlparse(url).path.lower().endswith(SKIP_EXTENSIONS):
+            continue
+        links.append((url, a.get_text(' ', strip=True)))
+    return links
+
+
+class CrawlFrontier:
+    """Priority queue of URLs with a visited set and depth/page budgets."""
+
+    def __init__(self, domains, max_depth=DEFAULT_MAX_DEPTH,
+                 max_pages=DEFAULT_MAX_PAGES, min_score=MIN_LINK_SCORE):
+        self.domains = {d for d in domains if d}
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.min_score = min_score
+        self.pages_popped = 0
+        self._heap = []
+        self._seen = set()
+        self._counter = 0
+
+    @classmethod
+    def for_college(cls, college, **kwargs):
+        """Build a frontier seeded from a college target entry."""
+        seeds = [u for u in college.get('mental_health_urls', []) if u]
+        website = college.get('website')
+        domains = {site_domain(u) for u in seeds + ([website] if website else [])}
+        frontier = cls(domains, **kwargs)
+        for url in seeds:
+            frontier.add(url, 0, SEED_SCORE, force=True)
+        if website:
+            frontier.add(website, 0, WEBSITE_SCORE, force=True)
+        return frontier
+
+    def add(self, url, depth=0, score=0, force=False):
+        """Queue url unless it was seen, is off-site, too deep or too weak.
+
+        force bypasses the same-site and minimum score checks (seed URLs).
+        Returns True if the URL was queued.
+        """
+        url = canonicalize_url(url)
+        if not url or url in self._seen or depth > self.max_depth:
+            return False
+        if not force:
+            if score < self.min_score or not is_same_site(url, self.domains):
+                return False
+        self._seen.add(url)
+        self._counter += 1
+        # Shallower pages win ties so the budget is spent near the seeds.
+        heapq.heappush(self._heap, (-(score - depth), self._counter, url, depth))
+        return True
+
+    def mark_visited(self, url):
+        """Record url (e.g. a redirect target) as seen without queueing it."""
+        url = canonicalize_url(url)
+        if url:
+            self._seen.add(url)
+
+    def pop(self):
+        """Return the next (url, depth) to fetch, or None when done."""
+        if self.pages_popped >= self.max_pages or not self._heap:
+            return None
+        _, _, url, depth = heapq.heappop(self._heap)
+        self.pages_popped += 1
+        return url, depth
+
+    def __len__(self):
+        return len(self._heap)
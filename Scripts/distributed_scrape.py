@@ -0,0 +1,265 @@
+"""
+Coordinator/worker scraping over a shared work queue.
+
+The coordinator puts one job per target into a SQLite queue file. Any
+number of worker processes claim targets under a lease, scrape them
+with CollegeScraper and write the results back to the queue. If a
+worker dies, its lease expires and another worker picks the target up.
+collect merges the finished results into scraped_colleges_data.json,
+replacing colleges by name and keeping the ones this run did not scrape.
+
+Workers do not write the re-scrape schedule or the targets' URL status
+themselves: every worker would overwrite the others' files. They log
+what they saw (an ObservationLog standing in for both) into each job's
+result, and collect applies the log to college_targets.schedule.json and
+college_targets.status.json, so enqueue --due-only sees the new run.
+
+Workers on other machines need the queue file on a network filesystem
+with working POSIX locks; see work_queue.py.
+
+Usage:
+    python distributed_scrape.py enqueue                 # all non-manual targets
+    python distributed_scrape.py enqueue --due-only      # only targets the re-scrape schedule says are due
+    python distributed_scrape.py enqueue --due-only --crawl   # the same, for workers started with --crawl
+    python distributed_scrape.py worker --id host1-a     # run as many of these as you like
+    python distributed_scrape.py status
+    python distributed_scrape.py collect                 # merge into scraped_colleges_data.json
+"""
+
+import argparse
+import os
+import socket
+import sys
+import time
+from datetime import datetime
+
+from crawler import DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES
+from persistence import Persistence
+from rescrape_schedule import RescrapeSchedule
+from simple_scraper import OUTPUT_FILE, TARGETS_FILE, CollegeScraper
+from target_registry import TargetRegistry
+from work_queue import DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, WorkQueue
+
+QUEUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrape_queue.db')
+IDLE_POLL_SECONDS = 5
+
+
+class ObservationLog:
+    """Stands in for the scraper's schedule and registry on a worker; see the module docstring."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.entries = []
+
+    def observe(self, url, resources):
+        self.entries.append({'url': url, 'resources': resources, 'at': self.clock()})
+
+    def observe_failure(self, url):
+        self.entries.append({'url': url, 'resources': None, 'at': self.clock()})
+
+    def tracks(self, url):
+        return True  # collect checks against the real registry
+
+    def record_url(self, url, ok, status=None, error=''):
+        self.entries.append({'url': url, 'fetch': {'ok': ok, 'status': status, 'error': error},
+                             'at': self.clock()})
+
+    def take(self):
+        entries, self.entries = self.entries, []
+        return entries
+
+
+def apply_observations(entries, schedule, registry):
+    """Replay logged observations into schedule and registry.
+
+    Anything not newer than what they already hold is skipped, so running
+    collect twice does not count the same scrape twice. Returns how many
+    were applied.
+    """
+    applied = 0
+    for entry in entries:
+        url, at = entry['url'], entry['at']
+        if 'fetch' in entry:
+            iso = datetime.fromtimestamp(at).isoformat()
+            status = registry.status_of(url) or {}
+            if not registry.tracks(url) or status.get('last_fetch', '') >= iso:
+                continue
+            registry.record_url(url, at=iso, **entry['fetch'])
+        elif entry['resources'] is None:
+            # A URL that never succeeded stays due; the schedule has nothing to update
+            if schedule.urls.get(url, {}).get('last_checked', at) >= at:
+                continue
+            schedule.observe_failure(url, now=at)
+        else:
+            if schedule.urls.get(url, {}).get('last_checked', 0) >= at:
+                continue
+            schedule.observe(url, entry['resources'], now=at)
+        applied += 1
+    return applied
+
+
+class LeaseLost(Exception):
+    pass
+
+
+class LeaseKeeper:
+    """Delegates to a fetcher and renews the current job's lease between pages.
+
+    A crawl can take longer than one lease (max_pages fetches, each behind
+    the host's delay), so the lease is extended whenever half of it has
+    run out. If another worker took the job over meanwhile, the next fetch
+    raises LeaseLost.
+    """
+
+    def __init__(self, fetcher, queue, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.fetcher = fetcher
+        self.queue = queue
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.job = None
+
+    def __getattr__(self, name):
+        return getattr(self.fetcher, name)
+
+    def renew(self):
+        job = self.job
+        if job is None or self.queue.clock() < job.lease_expires - self.lease_seconds / 2:
+            return
+        if not self.queue.heartbeat(job, self.worker_id, self.lease_seconds):
+            raise LeaseLost(job.key)
+
+    def fetch(self, url, timeout=None):
+        self.renew()
+        return self.fetcher.fetch(url, timeout)
+
+
+def enqueue_targets(queue, targets, reset=False):
+    """Queue every non-manual target; returns how many jobs were added."""
+    return queue.enqueue((t for t in targets if t.get('source') != 'manual'), reset=reset)
+
+
+def run_worker(queue, scraper, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS,
+               max_attempts=DEFAULT_MAX_ATTEMPTS, max_jobs=None, wait=False, sleep=time.sleep,
+               log=None, keeper=None):
+    """Claim and scrape targets until the queue is drained. Returns jobs completed.
+
+    Each result is {'record': college record, 'observations': log entries}.
+    keeper, the LeaseKeeper around the scraper's fetcher, is pointed at
+    each job in turn.
+    """
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        job = queue.claim(worker_id, lease_seconds, max_attempts)
+        if job is None:
+            counts = queue.counts()
+            # Other workers' leases may still expire and come back to the queue
+            if wait and counts['leased']:
+                sleep(IDLE_POLL_SECONDS)
+                continue
+            break
+        college = job.payload
+        print(f"[{worker_id}] {college['name']} (attempt {job.attempts})")
+        if keeper is not None:
+            keeper.job = job
+        try:
+            resources = scraper.scrape_college(college)
+        except LeaseLost:
+            print(f"  [WARN] lease lost; another worker has the target")
+            continue
+        except Exception as e:
+            queue.fail(job, worker_id, f'{type(e).__name__}: {e}', max_attempts)
+            print(f"  [FAIL] {type(e).__name__}: {e}")
+            continue
+        finally:
+            observations = log.take() if log is not None else []
+            if keeper is not None:
+                keeper.job = None
+        result = {'record': scraper.college_record(college, resources), 'observations': observations}
+        if not queue.complete(job, worker_id, result):
+            print(f"  [WARN] lease lost; result discarded")
+            continue
+        done += 1
+        print(f"  [OK] {len(resources)} resource(s)")
+    return done
+
+
+def collect_results(queue):
+    """Finished results that found resources, in target order."""
+    records = (result['record'] for _, result in queue.results())
+    return [record for record in records if record.get('resources')]
+
+
+def collect_observations(queue):
+    return [entry for _, result in queue.results() for entry in result['observations']]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Distributed scraping over a shared SQLite work queue.')
+    parser.add_argument('--queue', default=QUEUE_FILE, help=f'Queue file (default: {QUEUE_FILE})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('enqueue', help='Queue targets from college_targets.json')
+    p.add_argument('--targets', default=TARGETS_FILE)
+    p.add_argument('--reset', action='store_true', help='Re-queue targets that already finished')
+    p.add_argument('--due-only', action='store_true', help='Only targets due per the re-scrape schedule')
+    p.add_argument('--crawl', action='store_true',
+                   help='With --due-only: the workers crawl, so judge targets by their website')
+
+    p = sub.add_parser('worker', help='Claim and scrape targets until the queue is empty')
+    p.add_argument('--id', default=f'{socket.gethostname()}-{os.getpid()}', help='Worker name')
+    p.add_argument('--lease', type=int, default=DEFAULT_LEASE_SECONDS, help='Lease length in seconds')
+    p.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS)
+    p.add_argument('--max-jobs', type=int, help='Stop after this many targets')
+    p.add_argument('--wait', action='store_true', help="Keep polling while other workers hold leases")
+    p.add_argument('--crawl', action='store_true')
+    p.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH)
+    p.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES)
+
+    sub.add_parser('status', help='Job counts and failures')
+
+    p = sub.add_parser('collect', help='Write finished results as scraped data JSON')
+    p.add_argument('--output', default=OUTPUT_FILE)
+    p.add_argument('--targets', default=TARGETS_FILE, help='Targets whose URL status is updated')
+    p.add_argument('--replace', action='store_true',
+                   help='Overwrite the output with only the collected colleges instead of merging')
+    args = parser.parse_args(argv)
+
+    with WorkQueue(args.queue) as queue:
+        if args.command == 'enqueue':
+            targets = TargetRegistry(args.targets).targets()
+            if args.due_only:
+                targets, _ = RescrapeSchedule().split_due(targets, crawl=args.crawl)
+            added = enqueue_targets(queue, targets, reset=args.reset)
+            print(f"[OK] Queued {added} target(s) in {args.queue}")
+        elif args.command == 'worker':
+            log = ObservationLog()
+            scraper = CollegeScraper(crawl=args.crawl, max_depth=args.max_depth, max_pages=args.max_pages,
+                                     registry=log, schedule=log)
+            keeper = scraper.fetcher = LeaseKeeper(scraper.fetcher, queue, args.id, args.lease)
+            done = run_worker(queue, scraper, args.id, args.lease, args.max_attempts, args.max_jobs, args.wait,
+                              log=log, keeper=keeper)
+            print(f"[OK] {args.id} finished {done} target(s)")
+        elif args.command == 'status':
+            counts = queue.counts()
+            print("  ".join(f"{state}={n}" for state, n in counts.items()))
+            for failure in queue.failures():
+                print(f"  [FAIL] {failure['key']} after {failure['attempts']} attempt(s): {failure['error']}")
+        elif args.command == 'collect':
+            data = collect_results(queue)
+            if args.replace:
+                Persistence(args.output).save(data)
+                print(f"[OK] Wrote {len(data)} college(s) to {args.output}")
+            else:
+                total = len(Persistence(args.output).merge(data))
+                print(f"[OK] Merged {len(data)} college(s) into {args.output} ({total} in total)")
+            schedule = RescrapeSchedule()
+            registry = TargetRegistry(args.targets)
+            applied = apply_observations(collect_observations(queue), schedule, registry)
+            schedule.save()
+            registry.save()
+            print(f"[OK] Applied {applied} observation(s) to the schedule and URL status")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
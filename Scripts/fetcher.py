@@ -1,17 +1,184 @@
-import requests
+import threading
 import time
 
+from host_health import HostHealth
+from metrics import RunMetrics
+from robots import RobotsCache, host_key
+
+MAX_BODY_BYTES = 2 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+
+class Page:
+    """A fully downloaded response body plus the bits callers use."""
+
+    def __init__(self, url, status_code, headers, content, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
 
 class Fetcher:
-    def __init__(self, session=None, rate_limit_seconds=1):
-        self.session = session or requests.Session()
+    def __init__(self, session=None, rate_limit_seconds=1, respect_robots=True,
+                 robots=None, health=None, max_bytes=MAX_BODY_BYTES,
+                 clock=time.monotonic, sleep=time.sleep, metrics=None):
+        if session is None:
+            import requests
+            session = requests.Session()
+        self.session = session
         self.rate_limit_seconds = rate_limit_seconds
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.sleep = sleep
+        self.health = health or HostHealth(clock=clock)
+        self.robots = None
+        if respect_robots:
+            user_agent = self.session.headers.get('User-Agent', '*')
+            # robots.txt goes through the same breaker and host slots as pages
+            self.robots = robots or RobotsCache(
+                self.session, user_agent, clock=clock, health=self.health,
+                wait=lambda url: self.wait_for_slot(url, self.rate_limit_seconds))
+        # Per-host scheduling: host -> earliest time the next request may start
+        self._next_slot = {}
+        self._lock = threading.Lock()
+        self.skipped_by_robots = 0
+        # Why the most recent fetch() returned None, and tallies per reason
+        self.last_error = ''
+        self.errors = {}
+        self.bytes_downloaded = 0
+        self.metrics = metrics or RunMetrics()
+
+    def host_delay(self, url):
+        """Delay between requests to url's host (robots Crawl-delay wins)."""
+        if self.robots:
+            delay = self.robots.crawl_delay(url)
+            if delay is not None:
+                return delay
+        return self.rate_limit_seconds
+
+    def wait_for_slot(self, url, delay=None):
+        """Block until url's host may be hit again, reserving the next slot.
+
+        Only requests to the same host wait on each other, so a slow
+        Crawl-delay on one campus does not throttle the rest of the run.
+        delay defaults to host_delay(url).
+        """
+        host = host_key(url)
+        if delay is None:
+            delay = self.host_delay(url)
+        with self._lock:
+            now = self.clock()
+            start = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = start + delay
+        if start > now:
+            self.sleep(start - now)
+
+    def _fail(self, reason):
+        self.last_error = reason
+        kind = reason.split(':', 1)[0]
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+        self.metrics.fetch_failures.inc(reason=kind)
+        return None
+
+    def read_body(self, resp):
+        """Stream resp's body, refusing non-HTML and anything over max_bytes.
+
+        Returns (content, error); exactly one of them is None.
+        """
+        content_type = resp.headers.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type and content_type not in HTML_CONTENT_TYPES:
+            return None, f'content-type: {content_type}'
+
+        length = resp.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            return None, f'too large: {length} bytes'
+
+        chunks = []
+        size = 0
+        for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+            size += len(chunk)
+            if size > self.max_bytes:
+                return None, f'too large: over {self.max_bytes} bytes'
+            chunks.append(chunk)
+        with self._lock:
+            self.bytes_downloaded += size
+        self.metrics.fetch_bytes.inc(size)
+        return b''.join(chunks), None
+
+    def fetch(self, url, timeout=None):
+        """GET url as a Page, or return None and set last_error to the reason.
+
+        timeout defaults to an adaptive per-host value derived from observed
+        response times. Hosts whose circuit is open are not contacted. Bodies
+        are streamed and abandoned early when they are not HTML or exceed
+        max_bytes.
+        """
+        self.last_error = ''
+        host = host_key(url)
+        try:
+            if self.robots and not self.robots.allowed(url):
+                self.skipped_by_robots += 1
+                return self._fail('robots: disallowed by robots.txt')
+        except Exception as e:
+            return self._fail(f'robots: {type(e).__name__}: {e}')
+
+        if not self.health.allow(host):
+            stats = self.health.stats(host)
+            return self._fail(f'circuit open: {host} ({stats.last_error})')
+
+        self.wait_for_slot(url)
+        started = self.clock()
+        page = self._get(url, host, timeout, started)
+        self.metrics.fetch_seconds.observe(self.clock() - started, status=self._status_label(page))
+        return page
+
+    def _status_label(self, page):
+        """HTTP status of the last fetch, or the kind of error that prevented one."""
+        if page is not None:
+            return page.status_code
+        if self.last_error.startswith('HTTP '):
+            return self.last_error[5:]
+        return self.last_error.split(':', 1)[0]
+
+    def _get(self, url, host, timeout, started):
+        import requests  # already loaded by any real session; deferred for fakes
 
-    def fetch(self, url, timeout=15):
         try:
-            resp = self.session.get(url, timeout=timeout)
-            resp.raise_for_status()
-            time.sleep(self.rate_limit_seconds)
-            return resp
-        except Exception:
-            return None
+            resp = self.session.get(url, timeout=timeout or self.health.timeout(host), stream=True)
+        except requests.Timeout:
+            self.health.record_failure(host, 'timeout')
+            return self._fail('timeout')
+        except requests.ConnectionError as e:
+            self.health.record_failure(host, 'connection error')
+            return self._fail(f'connection error: {e}')
+        except Exception as e:
+            self.health.record_failure(host, type(e).__name__)
+            return self._fail(f'error: {type(e).__name__}: {e}')
+
+        try:
+            status = resp.status_code
+            if status >= 500 or status == 429:
+                self.health.record_failure(host, f'HTTP {status}')
+                return self._fail(f'HTTP {status}')
+            # Any other answer proves the host is up, so it feeds the latency estimate
+            self.health.record_success(host, self.clock() - started)
+            if status >= 400:
+                return self._fail(f'HTTP {status}')
+
+            try:
+                content, error = self.read_body(resp)
+            except (requests.RequestException, OSError) as e:
+                return self._fail(f'read error: {type(e).__name__}: {e}')
+            if error:
+                return self._fail(error)
+            return Page(resp.url or url, status, resp.headers, content, resp.encoding)
+        finally:
+            resp.close()
@@ -0,0 +1,121 @@
+"""
+Per-host latency tracking and circuit breaking used by Fetcher.
+
+Timeouts follow the TCP retransmission-timeout recipe (RFC 6298): a smoothed
+response time plus four deviations, clamped to [MIN_TIMEOUT, MAX_TIMEOUT].
+After FAILURE_THRESHOLD consecutive failures a host's circuit opens and
+requests are refused until the cooldown passes; one trial request is then
+let through (half-open) and either closes the circuit or re-opens it with a
+doubled cooldown.
+"""
+
+import threading
+import time
+
+DEFAULT_TIMEOUT = 15
+MIN_TIMEOUT = 3
+MAX_TIMEOUT = 15
+CONNECT_TIMEOUT = 5
+
+FAILURE_THRESHOLD = 3
+COOLDOWN_SECONDS = 300
+MAX_COOLDOWN_SECONDS = 3600
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class HostStats:
+    def __init__(self):
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.cooldown = COOLDOWN_SECONDS
+        self.last_error = ''
+
+    def observe(self, seconds):
+        """Fold one response time into the smoothed estimate."""
+        if self.srtt is None:
+            self.srtt = seconds
+            self.rttvar = seconds / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - seconds)
+            self.srtt = 0.875 * self.srtt + 0.125 * seconds
+        self.samples += 1
+
+    def timeout(self):
+        if self.srtt is None:
+            return DEFAULT_TIMEOUT
+        return max(MIN_TIMEOUT, min(MAX_TIMEOUT, self.srtt + 4 * self.rttvar))
+
+
+class HostHealth:
+    """Thread-safe registry of HostStats keyed by host."""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD,
+                 cooldown=COOLDOWN_SECONDS, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def stats(self, host):
+        with self._lock:
+            stats = self._hosts.get(host)
+            if stats is None:
+                stats = self._hosts[host] = HostStats()
+                stats.cooldown = self.cooldown
+            return stats
+
+    def timeout(self, host):
+        """(connect, read) timeout tuple for the next request to host."""
+        read = self.stats(host).timeout()
+        return (min(CONNECT_TIMEOUT, read), read)
+
+    def allow(self, host):
+        """False while host's circuit is open; moves to half-open after cooldown."""
+        stats = self.stats(host)
+        with self._lock:
+            if stats.state == CLOSED:
+                return True
+            if stats.state == HALF_OPEN:
+                return False  # a trial request is already in flight
+            if self.clock() - stats.opened_at >= stats.cooldown:
+                stats.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self, host, seconds):
+        stats = self.stats(host)
+        with self._lock:
+            stats.observe(seconds)
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            if stats.state != CLOSED:
+                stats.state = CLOSED
+                stats.cooldown = self.cooldown
+
+    def record_failure(self, host, reason):
+        stats = self.stats(host)
+        with self._lock:
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            stats.last_error = reason
+            if stats.state == HALF_OPEN:
+                stats.cooldown = min(stats.cooldown * 2, MAX_COOLDOWN_SECONDS)
+                stats.state = OPEN
+                stats.opened_at = self.clock()
+            elif stats.consecutive_failures >= self.failure_threshold:
+                stats.state = OPEN
+                stats.opened_at = self.clock()
+
+    def open_hosts(self):
+        with self._lock:
+            return sorted(h for h, s in self._hosts.items() if s.state == OPEN)
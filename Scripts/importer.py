@@ -9,21 +9,24 @@ Usage:
     python importer.py --base-url http://host:port  # Custom API base URL
     python importer.py --api-key YOUR_KEY           # Provide API key for auth
     python importer.py --skip-validation            # Skip validation step
+    python importer.py --match-names                # Rename colleges to the existing records they fuzzy-match
+    python importer.py --profile                    # Profile each step into profiles/ (see profiling.py)
+    python importer.py --metrics-file mhdb_importer.prom  # Prometheus textfile output (see metrics.py)
 """
 
 import argparse
 import json
 import sys
-import urllib3
 import re
+import time
 
-import requests
-
-# Disable SSL warnings for localhost
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from metrics import RunMetrics, add_metrics_arguments, metrics_from_args
+from name_matcher import NameMatcher
+from profiling import Profiler, add_profile_arguments, profiler_from_args
 
 DEFAULT_API_BASE = "http://localhost:58346/api"
 DEFAULT_DATA_FILE = "scraped_colleges_data.json"
+DEFAULT_PAGE_SIZE = 200
 
 # Validation thresholds - relaxed for real-world scraped data
 MIN_DESCRIPTION_LENGTH = 10
@@ -158,18 +161,76 @@ def build_college_payload(college_data):
     }
 
 
+def resolve_college_names(payloads, existing=(), matcher=None, start=0, rename=True):
+    """Rename payloads to the canonical name of the college they fuzzy-match.
+
+    existing are server records ({"id", "name", "website"}). The server
+    upserts by exact name, so without this "The Ohio State University"
+    would become a second copy of "Ohio State University". Payloads that
+    match nothing become canonical themselves, which also folds near
+    duplicates within one import. Returns [(old_name, new_name, score)].
+
+    With rename false the payloads keep their names and the matches are
+    only returned, for the caller to report.
+
+    start offsets the keys payloads are indexed under, so one matcher can
+    be reused across the batches of a streamed import.
+    """
+    matcher = matcher or NameMatcher()
+    for record in existing:
+        matcher.add(("server", record["id"]), record["name"], record.get("website"))
+    renames = []
+    for i, payload in enumerate(payloads):
+        name = payload.get("name") or ""
+        match = matcher.match(name, payload.get("website"))
+        if match is None:
+            matcher.add(("file", start + i), name, payload.get("website"))
+            continue
+        key, score = match
+        canonical = matcher.name_of(key)
+        if canonical != name:
+            if rename:
+                payload["name"] = canonical
+            renames.append((name, canonical, score))
+    return renames
+
+
+def report_matches(matches, renamed):
+    """Print resolve_college_names' matches, as renames or as candidates to check."""
+    for old, new, score in matches:
+        if renamed:
+            print(f"   [MATCH] {old} -> {new} ({score:.2f})")
+        else:
+            print(f"   [MATCH?] {old} looks like {new} ({score:.2f})")
+    if matches and renamed:
+        print(f"   [OK] {len(matches)} college name(s) matched to existing records")
+    elif matches:
+        print(f"   [INFO] {len(matches)} possible duplicate(s) imported under their own names; "
+              f"pass --match-names to merge them")
+
+
 class APIClient:
     """Thin wrapper around the Mental Health Database API."""
 
-    def __init__(self, base_url=DEFAULT_API_BASE, api_key=""):
+    def __init__(self, base_url=DEFAULT_API_BASE, api_key="", metrics=None):
+        # requests/urllib3 load here rather than at import, so validation-only
+        # runs and --help start fast
+        import requests
+        import urllib3
+
+        # Disable SSL warnings for localhost
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
         self.session.verify = False
         if api_key:
             self.session.headers["X-Api-Key"] = api_key
+        self.metrics = metrics or RunMetrics()
 
     def health_check(self):
         """Check if the API is reachable."""
+        import requests
+
         try:
             resp = self.session.get(f"{self.base_url}/colleges", timeout=5)
             return resp.status_code == 200
@@ -182,11 +243,62 @@ class APIClient:
         resp.raise_for_status()
         return resp.json()
 
+    def get_colleges_page(self, page=1, page_size=DEFAULT_PAGE_SIZE, fields=None, location=None):
+        """Fetch one page of colleges: {"items", "page", "pageSize", "total"}.
+
+        fields limits each item to those keys (e.g. ["id", "name"]); resources
+        are only loaded server-side when "resources" is among them.
+        """
+        params = {"page": page, "pageSize": page_size}
+        if fields:
+            params["fields"] = ",".join(fields)
+        if location:
+            params["location"] = location
+        resp = self.session.get(f"{self.base_url}/colleges/page", params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    def iter_colleges(self, page_size=DEFAULT_PAGE_SIZE, fields=None, location=None):
+        """Yield colleges one page at a time instead of loading them all."""
+        page = 1
+        while True:
+            body = self.get_colleges_page(page, page_size, fields, location)
+            items = body.get("items", [])
+            yield from items
+            if len(items) < page_size or page * page_size >= body.get("total", 0):
+                return
+            page += 1
+
+    def get_counts(self, location=None):
+        """Return {"colleges": n, "resources": n} without listing anything."""
+        params = {"location": location} if location else None
+        resp = self.session.get(f"{self.base_url}/colleges/count", params=params)
+        resp.raise_for_status()
+        return resp.json()
+
     def bulk_import(self, colleges_payload):
         """Import colleges via the bulk endpoint (upsert)."""
+        started = time.perf_counter()
+        try:
+            resp = self.session.post(
+                f"{self.base_url}/colleges/bulk",
+                json=colleges_payload,
+            )
+            resp.raise_for_status()
+        except Exception as e:
+            response = getattr(e, "response", None)
+            outcome = str(response.status_code) if response is not None else type(e).__name__
+            self.metrics.import_batch_seconds.observe(time.perf_counter() - started, outcome=outcome)
+            raise
+        self.metrics.import_batch_seconds.observe(time.perf_counter() - started, outcome="ok")
+        self.metrics.import_colleges.inc(len(colleges_payload))
+        return resp.json()
+
+    def delete_colleges(self, names):
+        """Delete colleges (and their resources) by name."""
         resp = self.session.post(
-            f"{self.base_url}/colleges/bulk",
-            json=colleges_payload,
+            f"{self.base_url}/resources/bulk/delete",
+            json=list(names),
         )
         resp.raise_for_status()
         return resp.json()
@@ -215,22 +327,36 @@ def load_data_file(filepath):
     return data
 
 
-def run_import(filepath, base_url, api_key, skip_validation=False):
-    """Main import flow: load file → validate → build payloads → bulk import."""
+def run_import(filepath, base_url, api_key, skip_validation=False, match_names=False, colleges_data=None,
+               profiler=None, metrics=None):
+    """Main import flow: load file → validate → build payloads → bulk import.
+
+    colleges_data, when given, is imported instead of reading filepath.
+    With match_names, colleges that fuzzy-match an existing record are
+    renamed to it; otherwise the matches are only listed.
+    profiler (profiling.Profiler) times and profiles each step as a stage;
+    metrics (metrics.RunMetrics) records the import requests.
+    """
+    import requests
+
+    profiler = profiler or Profiler()
     print("=" * 70)
     print("COLLEGE MENTAL HEALTH DATA IMPORTER")
     print("=" * 70)
 
     # Load data
-    print(f"\n[FILE] Loading data from: {filepath}")
-    colleges_data = load_data_file(filepath)
+    if colleges_data is None:
+        print(f"\n[FILE] Loading data from: {filepath}")
+        with profiler.stage("load"):
+            colleges_data = load_data_file(filepath)
     total_resources = sum(len(c.get("resources", [])) for c in colleges_data)
     print(f"   Found {len(colleges_data)} college(s) with {total_resources} total resource(s)")
 
     # Validate data
     if not skip_validation:
         print("\n[CHECK] Validating data...")
-        valid_data, invalid_data, errors = validate_data(colleges_data)
+        with profiler.stage("validate"):
+            valid_data, invalid_data, errors = validate_data(colleges_data)
 
         if invalid_data:
             print(f"   [WARN]  {len(invalid_data)} college(s) failed validation and will be skipped:")
@@ -251,7 +377,7 @@ def run_import(filepath, base_url, api_key, skip_validation=False):
 
     # Connect to API
     print(f"\n[NET] Connecting to API: {base_url}")
-    client = APIClient(base_url=base_url, api_key=api_key)
+    client = APIClient(base_url=base_url, api_key=api_key, metrics=metrics)
 
     if not client.health_check():
         print("[FAIL] API is not reachable. Is the server running?")
@@ -262,7 +388,17 @@ def run_import(filepath, base_url, api_key, skip_validation=False):
 
     # Build payloads
     print("\n[DATA] Building import payloads...")
-    payloads = [build_college_payload(c) for c in colleges_data]
+    with profiler.stage("payload"):
+        payloads = [build_college_payload(c) for c in colleges_data]
+
+    with profiler.stage("match"):
+        try:
+            existing = list(client.iter_colleges(fields=["id", "name", "website"]))
+        except requests.RequestException as e:
+            print(f"   [WARN] Could not list existing colleges for name matching: {e}")
+            existing = []
+        renames = resolve_college_names(payloads, existing, rename=match_names)
+    report_matches(renames, match_names)
 
     # Preview
     print("\n   Colleges to import:")
@@ -273,7 +409,8 @@ def run_import(filepath, base_url, api_key, skip_validation=False):
     # Bulk import
     print(f"\n[SEND] Sending bulk import request...")
     try:
-        result = client.bulk_import(payloads)
+        with profiler.stage("upload"):
+            result = client.bulk_import(payloads)
         print(f"   [OK] {result.get('message', 'Import complete')}")
     except requests.HTTPError as e:
         print(f"   [FAIL] Import failed: {e.response.status_code}")
@@ -287,9 +424,8 @@ def run_import(filepath, base_url, api_key, skip_validation=False):
     # Verify
     print("\n📊 Verifying import...")
     try:
-        colleges = client.get_colleges()
-        db_resources = sum(len(c.get("resources", [])) for c in colleges)
-        print(f"   Database now contains: {len(colleges)} college(s), {db_resources} resource(s)")
+        counts = client.get_counts()
+        print(f"   Database now contains: {counts['colleges']} college(s), {counts['resources']} resource(s)")
     except Exception as e:
         print(f"   [WARN] Could not verify: {e}")
 
@@ -299,7 +435,7 @@ def run_import(filepath, base_url, api_key, skip_validation=False):
     print("=" * 70)
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="Import college mental health data into the database."
     )
@@ -323,9 +459,26 @@ def main():
         action="store_true",
         help="Skip data validation before import",
     )
+    parser.add_argument(
+        "--match-names",
+        action="store_true",
+        help="Rename colleges to the existing records they fuzzy-match (default: only list the matches)",
+    )
+
+    add_profile_arguments(parser)
+    add_metrics_arguments(parser)
 
-    args = parser.parse_args()
-    run_import(args.file, args.base_url, args.api_key, args.skip_validation)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args, "importer")
+    metrics = metrics_from_args(args, "importer")
+    ok = False
+    try:
+        run_import(args.file, args.base_url, args.api_key, args.skip_validation, match_names=args.match_names,
+                   profiler=profiler, metrics=metrics)
+        ok = True
+    finally:
+        profiler.close()
+        metrics.close(ok=ok)
 
 
 if __name__ == "__main__":
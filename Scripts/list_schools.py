@@ -1,21 +1,55 @@
+"""List scraped colleges and the targets that failed to scrape.
+
+Reads scraped_colleges_data.json and college_targets.json, or with --db DB
+the colleges and targets tables of a staging database (see staging_store.py).
+"""
+import argparse
 import json
+import sys
+
+from analytics import Dataset
+from name_matcher import NameMatcher
+from staging_store import StagingStore
+
+
+def load(db=None):
+    """(scraped colleges, targets)."""
+    if db:
+        with StagingStore(db) as store:
+            return list(store.colleges()), list(store.targets())
+    with open('scraped_colleges_data.json') as f:
+        scraped = json.load(f)
+    with open('college_targets.json') as f:
+        targets = json.load(f)['colleges']
+    return scraped, targets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List scraped colleges and targets that failed to scrape.')
+    parser.add_argument('--db', help='Read from this staging database instead of the JSON files')
+    args = parser.parse_args(argv)
+
+    scraped, targets = load(args.db)
+    dataset = Dataset(scraped)
+
+    print('SCRAPED (' + str(len(dataset)) + '):')
+    print('='*60)
+    for name, _, r in dataset.colleges():
+        print(f'{r:2} | {name}')
+
+    print()
+    print('FAILED TO SCRAPE:')
+    print('='*60)
+
+    # Fuzzy, so "The Ohio State University" counts as scraped when stored as "Ohio State University"
+    scraped_names = NameMatcher()
+    for c in scraped:
+        scraped_names.add(c['name'], c['name'], c.get('website'))
+    for t in targets:
+        if scraped_names.match(t['name'], t.get('website')) is None and t.get('source') != 'manual':
+            print(f'{t["name"]} ({t.get("state")})')
+    return 0
+
 
-with open('scraped_colleges_data.json') as f:
-    scraped = json.load(f)
-
-print('SCRAPED (' + str(len(scraped)) + '):')
-print('='*60)
-for c in scraped:
-    r = len(c.get('resources', []))
-    print(f'{r:2} | {c["name"]}')
-
-print()
-print('FAILED TO SCRAPE:')
-print('='*60)
-with open('college_targets.json') as f:
-    targets = json.load(f)
-
-scraped_names = {c['name'] for c in scraped}
-for t in targets['colleges']:
-    if t['name'] not in scraped_names and t.get('source') != 'manual':
-        print(f'{t["name"]} ({t["state"]})')
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Run metrics for the scraper and importer in Prometheus text format.
+
+A Registry holds counters, gauges and histograms. render() produces the
+Prometheus text exposition format (version 0.0.4), write_textfile() writes
+it for the node exporter's textfile collector, and serve() exposes it at
+http://127.0.0.1:PORT/metrics while a long run is going.
+
+RunMetrics defines the metrics the tools record:
+
+    mhdb_fetch_duration_seconds{status}       histogram, HTTP status or error kind
+    mhdb_fetch_failures_total{reason}         fetches that returned no page (robots, timeout, HTTP 503, ...)
+    mhdb_fetch_bytes_total                    response bytes downloaded
+    mhdb_pages_parsed_total
+    mhdb_resources_extracted_total
+    mhdb_resources_filtered_total{reason}     duplicate, low_quality
+    mhdb_colleges_scraped_total{outcome}      success, failed, skipped, not_due
+    mhdb_import_batch_duration_seconds{outcome}  histogram, ok or the failure
+    mhdb_import_colleges_total                colleges accepted by the bulk endpoint
+    mhdb_publish_retries_total                publish_to_api attempts after the first
+    mhdb_run_duration_seconds{job}
+    mhdb_last_run_timestamp_seconds{job}
+    mhdb_last_run_success{job}
+
+simple_scraper, importer and publish_to_api accept --metrics-file and
+--metrics-port. Point --metrics-file into the textfile collector
+directory with one file per tool, for example
+/var/lib/node_exporter/textfile/mhdb_scraper.prom. The file is replaced
+atomically at the end of the run, so the exporter never reads a
+half-written file.
+
+Usage:
+    python simple_scraper.py --metrics-file /var/lib/node_exporter/textfile/mhdb_scraper.prom
+    python simple_scraper.py --crawl --metrics-port 9464          # curl localhost:9464/metrics
+    python importer.py --metrics-file /var/lib/node_exporter/textfile/mhdb_importer.prom
+"""
+
+import math
+import os
+import threading
+import time
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+IMPORT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels_text(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} takes labels {self.labels}, got {tuple(labels)}')
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def header(self):
+        help_text = self.help.replace('\\', r'\\').replace('\n', r'\n')
+        return [f'# HELP {self.name} {help_text}', f'# TYPE {self.name} {self.kind}']
+
+    def samples(self):
+        values = sorted(self._values.items())
+        if not values and not self.labels:
+            values = [((), 0)]  # an unlabelled series exists from the start
+        return [f'{self.name}{_labels_text(self.labels, key)} {_format_value(v)}' for key, v in values]
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError(f'{self.name}: counters only go up')
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=FETCH_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        counts, _ = self._values.get(self._key(labels), ((), 0.0))
+        return sum(counts)
+
+    def samples(self):
+        lines = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _labels_text(self.labels + ('le',), key + (_format_value(bound),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _labels_text(self.labels, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Named metrics, rendered in registration order."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, help_text, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labels, **kwargs)
+            elif type(metric) is not cls or metric.labels != tuple(labels):
+                raise ValueError(f'{name} is already registered as a different metric')
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=FETCH_BUCKETS):
+        return self._register(Histogram, name, help_text, labels, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics[name]
+
+    def render(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            with metric._lock:
+                lines.extend(metric.header())
+                lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Write render() to path atomically (temp file + rename)."""
+        path = os.fspath(path)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve /metrics on a daemon thread; returns the server (call shutdown())."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # keep scrapes of /metrics out of the run's output
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+
+class RunMetrics:
+    """The scraper and importer metrics, on one registry."""
+
+    def __init__(self, registry=None, job=None, textfile=None, port=None):
+        r = self.registry = registry or Registry()
+        self.job = job
+        self.textfile = textfile
+        self.fetch_seconds = r.histogram(
+            'mhdb_fetch_duration_seconds', 'Time to fetch a page, by HTTP status or error kind.',
+            ('status',), FETCH_BUCKETS)
+        self.fetch_failures = r.counter(
+            'mhdb_fetch_failures_total', 'Fetches that returned no page, by reason.', ('reason',))
+        self.fetch_bytes = r.counter('mhdb_fetch_bytes_total', 'Response body bytes downloaded.')
+        self.pages_parsed = r.counter('mhdb_pages_parsed_total', 'Pages parsed into HTML trees.')
+        self.resources_extracted = r.counter(
+            'mhdb_resources_extracted_total', 'Resources extracted from pages, before filtering.')
+        self.resources_filtered = r.counter(
+            'mhdb_resources_filtered_total', 'Extracted resources dropped, by reason.', ('reason',))
+        self.colleges_scraped = r.counter(
+            'mhdb_colleges_scraped_total', 'Scrape targets processed, by outcome.', ('outcome',))
+        self.import_batch_seconds = r.histogram(
+            'mhdb_import_batch_duration_seconds', 'Time for one bulk import request, by outcome.',
+            ('outcome',), IMPORT_BUCKETS)
+        self.import_colleges = r.counter(
+            'mhdb_import_colleges_total', 'Colleges sent in successful bulk import requests.')
+        self.publish_retries = r.counter(
+            'mhdb_publish_retries_total', 'Bulk publish attempts after the first.')
+        self.run_seconds = r.gauge('mhdb_run_duration_seconds', 'Duration of the last run.', ('job',))
+        self.last_run = r.gauge(
+            'mhdb_last_run_timestamp_seconds', 'Unix time the last run finished.', ('job',))
+        self.last_success = r.gauge(
+            'mhdb_last_run_success', '1 if the last run finished successfully, else 0.', ('job',))
+        self.started = time.time()
+        self.server = None
+        if port is not None:
+            self.server = self.registry.serve(port)
+            print(f"[OK] Serving metrics at http://{self.server.server_address[0]}:"
+                  f"{self.server.server_address[1]}/metrics")
+
+    def close(self, ok=True):
+        """Record the run, write the textfile (if any) and stop serving."""
+        if self.job is not None:
+            now = time.time()
+            self.run_seconds.set(round(now - self.started, 3), job=self.job)
+            self.last_run.set(int(now), job=self.job)
+            self.last_success.set(1 if ok else 0, job=self.job)
+        if self.textfile:
+            self.registry.write_textfile(self.textfile)
+            print(f"[OK] Metrics written to {self.textfile}")
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='Write Prometheus metrics here at the end of the run (textfile collector)')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='Serve Prometheus metrics on 127.0.0.1:PORT/metrics during the run')
+
+
+def metrics_from_args(args, job):
+    return RunMetrics(job=job, textfile=args.metrics_file, port=args.metrics_port)
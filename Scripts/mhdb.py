@@ -0,0 +1,159 @@
+"""
+Single command-line entry point for the data tools.
+
+Each subcommand hands the rest of the command line to the existing
+script's main(), so its options and --help are the script's own:
+
+    scrape     simple_scraper.py       scrape the targets into scraped_colleges_data.json
+    clean      clean_seed_data.py      drop non-mental-health resources from data files
+    validate   validate_data.py        validate data files
+    build-ui   prepare_ui_payload.py   build ui_payload.json (+ shards, indexes)
+    import     importer.py             import a data file through the API
+    publish    publish_to_api.py       publish the UI payload to a bulk endpoint
+
+pipeline runs the stages in one process (see pipeline.py). There are no
+prompts, data is passed between stages in memory, and each stage is timed.
+With --stream it goes from targets (or --input) to the API through
+generator stages instead, importing batch by batch while the scrape is
+still running.
+
+Usage:
+    python mhdb.py scrape --crawl
+    python mhdb.py build-ui --shards --search-index
+    python mhdb.py pipeline                                   # scrape, clean, validate, build-ui, import
+    python mhdb.py pipeline --input scraped_colleges_data.json --stages clean validate build-ui
+    python mhdb.py pipeline --publish-url https://app.example.com/api/resources/bulk --token SECRET
+    python mhdb.py pipeline --stream --batch-size 25                # scrape -> import, constant memory
+    python mhdb.py pipeline --stream --input big_snapshot.ndjson
+"""
+
+import argparse
+import importlib
+import json
+import sys
+
+# command -> (module whose main(argv) runs it, help)
+COMMANDS = {
+    'scrape': ('simple_scraper', 'Scrape college mental health pages'),
+    'clean': ('clean_seed_data', 'Remove non-mental-health resources from data files'),
+    'validate': ('validate_data', 'Validate data files'),
+    'build-ui': ('prepare_ui_payload', 'Build the UI payload'),
+    'import': ('importer', 'Import a data file through the API'),
+    'publish': ('publish_to_api', 'Publish the UI payload to a bulk endpoint'),
+}
+DEFAULT_STAGES = ('scrape', 'clean', 'validate', 'build-ui', 'import')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='mhdb', description='College mental health data tools.')
+    sub = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+    for command, (module, help_text) in COMMANDS.items():
+        # No -h here: --help is passed on to the tool itself
+        sub.add_parser(command, add_help=False, help=f'{help_text} ({module}.py)')
+
+    pipe = sub.add_parser('pipeline', help='Run the stages in-process with per-stage timings')
+    pipe.add_argument('--stages', nargs='+', metavar='STAGE',
+                      help=f"Stages to run, in order (default: {' '.join(DEFAULT_STAGES)}, "
+                           "without scrape when --input is given, plus publish when --publish-url is)")
+    pipe.add_argument('--input', help='Start from this data file instead of scraping')
+    pipe.add_argument('--output', help='UI payload to write (default: ui_payload.json)')
+    pipe.add_argument('--no-brotli', action='store_true', help='Skip the .br variant of the UI payload')
+    pipe.add_argument('--crawl', action='store_true', help='Scrape in crawl mode')
+    pipe.add_argument('--ignore-schedule', action='store_true', help='Scrape every target, due or not')
+    pipe.add_argument('--strict', action='store_true', help='Stop when validation finds any issue')
+    pipe.add_argument('--base-url', help='API base URL for import (default: importer.DEFAULT_API_BASE)')
+    pipe.add_argument('--api-key', default='', help='API key for import')
+    pipe.add_argument('--match-names', action='store_true',
+                      help='Rename colleges to the existing records they fuzzy-match (default: only list them)')
+    pipe.add_argument('--publish-url', help='Bulk URL to publish the UI payload to')
+    pipe.add_argument('--token', help='API token for publish (X-Api-Token)')
+    pipe.add_argument('--stream', action='store_true',
+                      help='Stream fetch -> ... -> batch-upload instead of running whole stages')
+    pipe.add_argument('--batch-size', type=int, default=None,
+                      help='Stream mode: colleges per import request (default: pipeline.DEFAULT_BATCH_SIZE)')
+    pipe.add_argument('--prefetch', type=int, default=None,
+                      help='Stream mode: colleges prepared ahead of the upload (default: one batch, 0 = none)')
+    pipe.add_argument('--timings', metavar='FILE', help='Also write the stage timings as JSON')
+    return parser
+
+
+def run_pipeline(args, parser):
+    from pipeline import DEFAULT_BATCH_SIZE, STAGES, Pipeline, print_timings
+
+    if args.stream:
+        for flag, given in (('--stages', args.stages), ('--crawl', args.crawl),
+                            ('--publish-url', args.publish_url)):
+            if given:
+                parser.error(f'{flag} does not apply to --stream')
+    elif args.batch_size is not None or args.prefetch is not None:
+        parser.error('--batch-size and --prefetch need --stream')
+
+    stages = args.stages
+    if stages is None and not args.stream:
+        stages = [s for s in DEFAULT_STAGES if not (args.input and s == 'scrape')]
+        if args.publish_url:
+            stages.append('publish')
+    if stages is not None:
+        unknown = [s for s in stages if s not in STAGES]
+        if unknown:
+            parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+        if stages[0] != 'scrape' and not args.input:
+            parser.error('--input is required when the pipeline does not start with scrape')
+        if 'publish' in stages and not args.publish_url:
+            parser.error('the publish stage needs --publish-url')
+
+    options = {
+        'use_brotli': not args.no_brotli,
+        'crawl': args.crawl,
+        'ignore_schedule': args.ignore_schedule,
+        'strict': args.strict,
+        'api_key': args.api_key,
+        'match_names': args.match_names,
+        'publish_url': args.publish_url,
+        'token': args.token,
+    }
+    if args.output:
+        options['output'] = args.output
+    if args.base_url:
+        options['base_url'] = args.base_url
+    pipeline = Pipeline(**options)
+
+    if args.stream:
+        records = None
+        if args.input:
+            from snapshot_diff import iter_snapshot
+            records = iter_snapshot(args.input)  # one college at a time, JSON array or NDJSON
+        timings = pipeline.stream_import(records, batch_size=args.batch_size or DEFAULT_BATCH_SIZE,
+                                         prefetch=args.prefetch)
+    else:
+        colleges = None
+        if args.input:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                colleges = json.load(f)
+        _, timings = pipeline.run(stages, colleges)
+    print_timings(timings)
+    if args.timings:
+        with open(args.timings, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, indent=2)
+    return 0 if all(t['ok'] for t in timings) else 1
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.command == 'pipeline':
+        if rest:
+            parser.error(f"unrecognized arguments: {' '.join(rest)}")
+        return run_pipeline(args, parser)
+
+    # Imported only now, so "mhdb validate" never loads the scraper's dependencies
+    module = importlib.import_module(COMMANDS[args.command][0])
+    try:
+        code = module.main(rest)
+    except SystemExit as e:
+        code = e.code
+    return code or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Fuzzy college identity matching by name and website domain.
+
+Names are normalized first (case, accents, punctuation, a leading "The",
+"&", common abbreviations), so "The Ohio State University" and
+"Ohio State University" are the same name. Beyond that, names are
+compared by the Jaccard similarity of their character trigrams.
+
+A fuzzy match also needs every word of each name to pair up with a word of
+the other: the same word, a prefix ("Penn" / "Pennsylvania") or a close
+spelling ("Univeristy"). Branch campuses differ from the flagship by a word
+that pairs with nothing ("Ohio State University Lima", "Kent State
+University at Stark"), so they never fold into it, however close the
+trigrams are. Only "at", "of", "the", "and" and "in" may be left over.
+
+The matcher keeps an inverted index from trigram to college, and probes
+only the rarest trigrams of a query: a name with similarity t must share
+at least ceil(t * |grams|) of the query's trigrams, so it has to contain
+one of the |grams| - that + 1 rarest ones (prefix filtering). Only those
+candidates are scored, so a lookup does not scan every known college.
+
+Website domains decide close calls. Two records whose sites sit on
+different registrable domains are never merged, even with identical names
+("Columbia College" exists in several states). Records on the same domain
+match at the lower DOMAIN_THRESHOLD, as long as their words pair up.
+
+Usage:
+    matcher = NameMatcher()
+    matcher.add(12, 'Ohio State University', 'https://www.osu.edu')
+    matcher.match('The Ohio State University')         # (12, 1.0)
+    matcher.match('Ohio State Univ.', 'https://osu.edu/caps')
+"""
+
+import math
+import re
+import unicodedata
+from urllib.parse import urlparse
+
+# Jaccard similarity needed to match on the name alone, and when the websites agree
+NAME_THRESHOLD = 0.8
+DOMAIN_THRESHOLD = 0.5
+# Trigram similarity at which two words count as one spelled differently
+WORD_THRESHOLD = 0.4
+
+ABBREVIATIONS = {
+    'univ': 'university',
+    'coll': 'college',
+    'inst': 'institute',
+    'mt': 'mount',
+    'ft': 'fort',
+}
+# Words that may appear in only one of two matching names
+FILLER_WORDS = frozenset({'at', 'of', 'the', 'and', 'in'})
+WORD_RE = re.compile(r'[a-z0-9]+')
+# Second-level labels under a country TLD that are not registrable on their own
+PUBLIC_SECOND_LEVEL = {'ac', 'co', 'com', 'edu', 'gov', 'net', 'org'}
+
+
+def normalize_name(name):
+    """Lowercase ASCII words with abbreviations expanded and a leading 'the' dropped."""
+    text = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode('ascii')
+    words = WORD_RE.findall(text.lower().replace('&', ' and '))
+    words = [ABBREVIATIONS.get(w, w) for w in words]
+    if len(words) > 1 and words[0] == 'the':
+        words = words[1:]
+    return ' '.join(words)
+
+
+def trigrams(normalized):
+    padded = f'  {normalized} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def domain_of(url):
+    """Registrable domain of a URL or bare host ('https://www.counseling.osu.edu/x' -> 'osu.edu')."""
+    if not url:
+        return ''
+    host = urlparse(url if '//' in url else '//' + url).hostname or ''
+    labels = [label for label in host.lower().split('.') if label]
+    if len(labels) < 2:
+        return ''
+    keep = 3 if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in PUBLIC_SECOND_LEVEL else 2
+    return '.'.join(labels[-keep:])
+
+
+def jaccard(a, b):
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if a or b else 0.0
+
+
+def _similar_words(a, b):
+    if len(a) >= 3 and len(b) >= 3 and (a.startswith(b) or b.startswith(a)):
+        return True
+    return jaccard(trigrams(a), trigrams(b)) >= WORD_THRESHOLD
+
+
+def unpaired_words(normalized, other):
+    """Words of two normalized names left over once each is paired with an equal or similar one."""
+    left = [w for w in normalized.split() if w not in FILLER_WORDS]
+    right = [w for w in other.split() if w not in FILLER_WORDS]
+    for word in list(left):
+        if word in right:
+            left.remove(word)
+            right.remove(word)
+    for word in list(left):
+        for candidate in right:
+            if _similar_words(word, candidate):
+                left.remove(word)
+                right.remove(candidate)
+                break
+    return left + right
+
+
+class NameMatcher:
+    def __init__(self, threshold=NAME_THRESHOLD, domain_threshold=DOMAIN_THRESHOLD):
+        self.threshold = threshold
+        self.domain_threshold = domain_threshold
+        self._records = {}   # key -> (name, normalized, trigrams, domain)
+        self._exact = {}     # normalized name -> {key: None}
+        self._grams = {}     # trigram -> set of keys
+        self._domains = {}   # domain -> {key: None}
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, key):
+        return key in self._records
+
+    def add(self, key, name, website=None):
+        """Index (or re-index) the record key."""
+        if key in self._records:
+            self.remove(key)
+        normalized = normalize_name(name)
+        grams = trigrams(normalized)
+        domain = domain_of(website)
+        self._records[key] = (name, normalized, grams, domain)
+        self._exact.setdefault(normalized, {})[key] = None
+        for gram in grams:
+            self._grams.setdefault(gram, set()).add(key)
+        if domain:
+            self._domains.setdefault(domain, {})[key] = None
+
+    def remove(self, key):
+        record = self._records.pop(key, None)
+        if record is None:
+            return False
+        _, normalized, grams, domain = record
+        _discard(self._exact, normalized, key)
+        for gram in grams:
+            _discard(self._grams, gram, key)
+        if domain:
+            _discard(self._domains, domain, key)
+        return True
+
+    def name_of(self, key):
+        record = self._records.get(key)
+        return record[0] if record else None
+
+    def candidates(self, name, min_score=None):
+        """Known records with name similarity >= min_score, as [(key, score)] best first."""
+        min_score = self.threshold if min_score is None else min_score
+        grams = trigrams(normalize_name(name))
+        return self._scored(grams, min_score)
+
+    def _scored(self, grams, min_score):
+        if not grams or min_score <= 0:
+            return []
+        need = max(1, math.ceil(min_score * len(grams) - 1e-9))
+        rarest = sorted(grams, key=lambda g: len(self._grams.get(g, ())))[:len(grams) - need + 1]
+        keys = set().union(*(self._grams.get(g, ()) for g in rarest))
+        scored = []
+        for key in keys:
+            other = self._records[key][2]
+            # |A ∩ B| <= min(|A|, |B|), so very different lengths cannot reach min_score
+            if min(len(grams), len(other)) < min_score * max(len(grams), len(other)):
+                continue
+            score = jaccard(grams, other)
+            if score >= min_score:
+                scored.append((key, score))
+        scored.sort(key=lambda item: -item[1])
+        return scored
+
+    def match(self, name, website=None):
+        """Best (key, score) for a name and optional website, or None.
+
+        None as well when two records tie for the best score.
+        """
+        normalized = normalize_name(name)
+        domain = domain_of(website)
+
+        def compatible(key):
+            other = self._records[key][3]
+            return not (domain and other and other != domain)
+
+        exact = [k for k in self._exact.get(normalized, ()) if compatible(k)]
+        if len(exact) == 1:
+            return exact[0], 1.0
+
+        grams = trigrams(normalized)
+        floor = self.domain_threshold if domain in self._domains else self.threshold
+        best = []
+        for key, score in self._scored(grams, floor):
+            if not compatible(key):
+                continue
+            if score < self.threshold and self._records[key][3] != domain:
+                continue  # below the name-only bar and not vouched for by the website
+            if unpaired_words(normalized, self._records[key][1]):
+                continue  # a campus or city name the other lacks: a different college
+            best.append((key, score))
+        if not best or (len(best) > 1 and best[1][1] == best[0][1]):
+            return None
+        return best[0]
+
+
+def _discard(index, value, key):
+    bucket = index.get(value)
+    if bucket is None:
+        return
+    if isinstance(bucket, set):
+        bucket.discard(key)
+    else:
+        bucket.pop(key, None)
+    if not bucket:
+        del index[value]
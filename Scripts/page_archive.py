@@ -0,0 +1,164 @@
+"""
+Record/replay archive of fetched pages.
+
+An archive is a directory holding two files:
+    pages.dat   - concatenated gzip members, one per distinct body
+                  (content-addressed by SHA-256, so identical pages are stored once)
+    index.json  - URL -> {sha256, status, content_type, final url, fetched_at}
+                  plus sha256 -> (offset, length) into pages.dat
+
+RecordingFetcher wraps a live Fetcher and archives every result (including
+failures); ReplayFetcher answers fetch() from the archive with no network.
+
+Usage:
+    python simple_scraper.py --record fixtures/2026-10    # live run, archived
+    python simple_scraper.py --replay fixtures/2026-10    # offline, deterministic
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from crawler import canonicalize_url
+from fetcher import Page
+
+INDEX_FILE = 'index.json'
+DATA_FILE = 'pages.dat'
+INDEX_VERSION = 1
+
+
+def archive_key(url):
+    return canonicalize_url(url) or url
+
+
+class PageArchive:
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        self.data_path = os.path.join(directory, DATA_FILE)
+        self.records = {}
+        self.blobs = {}
+        self._data = None
+        self._reader = None
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            self.records = index.get('records', {})
+            self.blobs = {h: tuple(loc) for h, loc in index.get('blobs', {}).items()}
+
+    def __len__(self):
+        return len(self.records)
+
+    def _store_blob(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        if digest not in self.blobs:
+            if self._data is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._data = open(self.data_path, 'ab')
+            offset = self._data.seek(0, os.SEEK_END)
+            # mtime=0 keeps the archive byte-identical across re-recordings
+            packed = gzip.compress(content, mtime=0)
+            self._data.write(packed)
+            self.blobs[digest] = (offset, len(packed))
+        return digest
+
+    def record(self, url, page=None, error=''):
+        """Archive the result of fetching url (a Page, or an error reason)."""
+        entry = {'fetched_at': datetime.now().isoformat()}
+        if page is not None:
+            headers = getattr(page, 'headers', {}) or {}
+            entry.update({
+                'sha256': self._store_blob(page.content),
+                'status': getattr(page, 'status_code', 200),
+                'content_type': headers.get('Content-Type', ''),
+                'encoding': getattr(page, 'encoding', None),
+                'url': getattr(page, 'url', None) or url,
+            })
+        else:
+            entry['error'] = error or 'fetch failed'
+        self.records[archive_key(url)] = entry
+
+    def read_blob(self, digest):
+        offset, length = self.blobs[digest]
+        if self._data is not None:
+            self._data.flush()
+        if self._reader is None:
+            self._reader = open(self.data_path, 'rb')
+        self._reader.seek(offset)
+        return gzip.decompress(self._reader.read(length))
+
+    def lookup(self, url):
+        """Return (Page, None) or (None, error) for url; (None, None) if unknown."""
+        entry = self.records.get(archive_key(url))
+        if entry is None:
+            return None, None
+        if 'error' in entry:
+            return None, entry['error']
+        headers = {'Content-Type': entry.get('content_type', '')}
+        content = self.read_blob(entry['sha256'])
+        return Page(entry.get('url') or url, entry.get('status', 200), headers,
+                    content, entry.get('encoding')), None
+
+    def save(self):
+        """Flush page data and atomically rewrite the index."""
+        if self._data is not None:
+            self._data.flush()
+            os.fsync(self._data.fileno())
+        os.makedirs(self.directory, exist_ok=True)
+        index = {
+            'version': INDEX_VERSION,
+            'records': self.records,
+            'blobs': {h: list(loc) for h, loc in self.blobs.items()},
+        }
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'), sort_keys=True)
+        os.replace(tmp, self.index_path)
+
+    def close(self):
+        self.save()
+        for handle in (self._data, self._reader):
+            if handle is not None:
+                handle.close()
+        self._data = self._reader = None
+
+
+class RecordingFetcher:
+    """Delegates to a live fetcher and archives every result."""
+
+    def __init__(self, fetcher, archive):
+        self.fetcher = fetcher
+        self.archive = archive
+
+    def __getattr__(self, name):
+        # last_error, errors, health, skipped_by_robots, ... come from the live fetcher
+        return getattr(self.fetcher, name)
+
+    def fetch(self, url, timeout=None):
+        page = self.fetcher.fetch(url, timeout)
+        self.archive.record(url, page, getattr(self.fetcher, 'last_error', ''))
+        return page
+
+
+class ReplayFetcher:
+    """Serves fetch() from a PageArchive; never touches the network."""
+
+    def __init__(self, archive):
+        self.archive = archive
+        self.last_error = ''
+        self.errors = {}
+        self.skipped_by_robots = 0
+        self.bytes_downloaded = 0
+
+    def fetch(self, url, timeout=None):
+        page, error = self.archive.lookup(url)
+        if page is None:
+            self.last_error = error or 'not in archive'
+            kind = self.last_error.split(':', 1)[0]
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+            return None
+        self.last_error = ''
+        self.bytes_downloaded += len(page.content)
+        return page
@@ -1,9 +1,8 @@
-from _html_compat import BeautifulSoup
-
-
 class Parser:
     def __init__(self, parser_type='html.parser'):
         self.parser_type = parser_type
 
     def parse(self, content):
+        # Imported here: bs4 is the slowest import in the scraper
+        from _html_compat import BeautifulSoup
         return BeautifulSoup(content, self.parser_type)
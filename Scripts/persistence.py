@@ -6,9 +6,26 @@ class Persistence:
     def __init__(self, output_file=None):
         self.output_file = output_file
 
+    def load(self):
+        if not self.output_file or not os.path.exists(self.output_file):
+            return []
+        with open(self.output_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def save(self, colleges_data):
         if not self.output_file:
             return
         os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
         with open(self.output_file, 'w', encoding='utf-8') as f:
             json.dump(colleges_data, f, indent=2, ensure_ascii=False)
+
+    def merge(self, colleges_data):
+        """Save colleges_data over the saved colleges of the same name, keeping the rest.
+
+        Returns the merged list: saved order first, then new colleges.
+        """
+        updates = {c['name']: c for c in colleges_data}
+        merged = [updates.pop(c['name'], c) for c in self.load()]
+        merged.extend(updates.values())
+        self.save(merged)
+        return merged
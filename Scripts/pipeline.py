@@ -0,0 +1,476 @@
+"""
+In-process data pipeline: scrape -> clean -> validate -> build-ui -> import -> publish.
+
+Each stage takes the previous stage's colleges as a list in memory and
+returns its own, so no stage re-reads what an earlier one wrote. The scrape
+stage still saves scraped_colleges_data.json, because the re-scrape schedule
+reuses it for colleges that are not due. build-ui writes ui_payload.json,
+which is the product. Every stage is timed, and the run stops at the first
+stage that fails.
+
+    clean     drops non-mental-health resources (clean_seed_data.clean_colleges)
+    validate  reports validator issues; strict=True makes any issue fatal
+    build-ui  writes ui_payload.json (+ .gz/.br, manifest, build state)
+    import    sends the colleges to the API (importer.run_import)
+    publish   sends the changed UI entries to a bulk URL (publish_to_api.publish)
+
+Pipeline.stream_import goes straight from targets (or a data file) to
+the API through generator stages instead. Each stage pulls one item at a
+time from the one before it:
+
+    fetch -> parse -> extract -> normalize -> dedupe -> filter -> validate -> payload -> batch-upload
+
+fetch, parse and extract work on pages. normalize joins a college's pages
+into one record, and from there on the items are colleges. Buffering is
+bounded in three places:
+    - normalize holds one college's pages
+    - a queue of at most `prefetch` payloads sits in front of batch-upload
+    - batch-upload holds one batch
+The queue is filled by a background thread, so scraping goes on while a
+batch uploads. The first batch leaves once batch_size colleges are ready,
+and memory stays flat however many targets there are. Only names are kept
+for the whole run, for dedupe and name matching.
+
+Usage:
+    pipeline = Pipeline(strict=True)
+    colleges, timings = pipeline.run(['clean', 'validate', 'build-ui'], colleges)
+    print_timings(timings)
+
+    timings = Pipeline(base_url=url).stream_import()          # scrape targets -> API
+    timings = Pipeline(base_url=url).stream_import(records)   # records (e.g. iter_snapshot) -> API
+"""
+
+import itertools
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+
+from clean_seed_data import clean_colleges
+from importer import (
+    DEFAULT_API_BASE, APIClient, build_college_payload, resolve_college_names, run_import,
+    validate_college as validate_for_import,
+)
+from name_matcher import NameMatcher
+from prepare_ui_payload import OUTPUT, build_ui, load_state, save_state, write_artifacts
+from publish_to_api import delete_url_for, publish, publish_state_path
+from validate_data import ValidationResult, validate_college
+
+STAGES = ('scrape', 'clean', 'validate', 'build-ui', 'import', 'publish')
+STREAM_STAGES = ('fetch', 'parse', 'extract', 'normalize', 'dedupe', 'filter', 'validate', 'payload',
+                 'batch-upload')
+# Scraped records (a data file) enter the stream here
+RECORD_STAGE = 'dedupe'
+DEFAULT_BATCH_SIZE = 50
+
+
+class StageFailed(Exception):
+    """A stage could not produce output; the run stops there."""
+
+
+class Pipeline:
+    def __init__(self, output=OUTPUT, use_brotli=True, crawl=False, ignore_schedule=False, strict=False,
+                 base_url=DEFAULT_API_BASE, api_key='', match_names=False, publish_url=None, token=None):
+        self.output = Path(output)
+        self.use_brotli = use_brotli
+        self.crawl = crawl
+        self.ignore_schedule = ignore_schedule
+        self.strict = strict
+        self.base_url = base_url
+        self.api_key = api_key
+        self.match_names = match_names
+        self.publish_url = publish_url
+        self.token = token
+        self.ui = None
+        self.stages = {
+            'scrape': self.scrape,
+            'clean': self.clean,
+            'validate': self.validate,
+            'build-ui': self.build_ui,
+            'import': self.import_,
+            'publish': self.publish,
+        }
+
+    def run(self, stages, colleges=None):
+        """Run stages in order; return (colleges, one timing dict per stage run)."""
+        timings = []
+        for name in stages:
+            print(f"\n== {name} ==")
+            colleges_in = None if colleges is None else len(colleges)
+            started = time.perf_counter()
+            error = None
+            try:
+                colleges = self.stages[name](colleges)
+            except StageFailed as e:
+                error = str(e)
+            except SystemExit as e:
+                # The standalone tools exit on fatal errors; that fails the stage, not the run
+                if e.code not in (None, 0):
+                    error = f'exited with status {e.code}'
+            except Exception as e:
+                # e.g. a connection error from the API: fail the stage and keep the timings
+                error = f'{type(e).__name__}: {e}'
+            colleges_out = None if colleges is None or error else len(colleges)
+            timings.append(_timing(name, time.perf_counter() - started, colleges_in, colleges_out, error))
+            if error:
+                print(f"[FAIL] {name}: {error}")
+                break
+        return colleges, timings
+
+    def scrape(self, colleges):
+        from rescrape_schedule import RescrapeSchedule
+        from simple_scraper import TARGETS_FILE, CollegeScraper
+        from target_registry import TargetRegistry
+
+        registry = TargetRegistry(TARGETS_FILE)
+        scraper = CollegeScraper(crawl=self.crawl, registry=registry)
+        if not self.ignore_schedule:
+            scraper.schedule = RescrapeSchedule()
+        try:
+            data = scraper.scrape_all()
+        finally:
+            registry.save()
+            if scraper.schedule is not None:
+                scraper.schedule.save()
+        if not data:
+            raise StageFailed('no data collected')
+        scraper.save_results()
+        scraper.print_stats()
+        return data
+
+    def clean(self, colleges):
+        before = sum(len(c.get('resources') or []) for c in colleges)
+        kept, removed = clean_colleges(colleges)
+        print(f"Removed {len(removed)} of {before} resources; {len(kept)} of {len(colleges)} colleges kept")
+        return kept
+
+    def validate(self, colleges):
+        result = ValidationResult()
+        for college in colleges:
+            validate_college(college, result)
+        stats = result.stats
+        print(f"{stats['colleges_valid']} valid, {stats['colleges_with_issues']} with issues "
+              f"({stats['no_contact']} resources without contact info, "
+              f"{stats['short_description']} short descriptions)")
+        for error in result.errors[:5]:
+            print(f"   • {error}")
+        if self.strict and stats['colleges_with_issues']:
+            raise StageFailed(f"{stats['colleges_with_issues']} college(s) with issues")
+        return colleges
+
+    def build_ui(self, colleges):
+        state = load_state(self.output) or {}
+        ui, ids, fingerprints, _ = build_ui(colleges, state)
+        manifest = write_artifacts(ui, self.output, use_brotli=self.use_brotli)
+        save_state(self.output, ui, ids, fingerprints, state.get('shards'), state.get('indexes'))
+        self.ui = ui
+        print(f"Wrote {len(ui)} colleges to {self.output} ({manifest['files']['identity']['bytes']:,} bytes)")
+        if not manifest['validated']:
+            print(f"[WARN] Payload failed validation ({len(manifest['errors'])} problem(s))")
+        return colleges
+
+    def import_(self, colleges):
+        run_import(None, self.base_url, self.api_key, match_names=self.match_names, colleges_data=colleges)
+        return colleges
+
+    def publish(self, colleges):
+        if not self.publish_url:
+            raise StageFailed('no publish URL given')
+        ui = self.ui
+        if ui is None:
+            ui = json.loads(self.output.read_text(encoding='utf-8'))
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['X-Api-Token'] = self.token
+        summary = publish(ui, self.publish_url, headers, publish_state_path(self.output),
+                          delete_url=delete_url_for(self.publish_url))
+        if summary['failed_batches']:
+            raise StageFailed(f"{summary['failed_batches']} batch(es) failed")
+        return colleges
+
+    def stream_import(self, records=None, batch_size=DEFAULT_BATCH_SIZE, prefetch=None, scraper=None,
+                      client=None):
+        """Scrape the targets (or take scraped records) and import them batch by batch.
+
+        records may be any iterable, e.g. snapshot_diff.iter_snapshot(path),
+        and enter the stream at RECORD_STAGE. Returns one timing dict per
+        stream stage, as run() does.
+        """
+        from simple_scraper import TARGETS_FILE, CollegeScraper
+        from target_registry import TargetRegistry
+
+        registry = None
+        if scraper is None:
+            if records is None:
+                registry = TargetRegistry(TARGETS_FILE)
+            scraper = CollegeScraper(registry=registry)
+        client = client or APIClient(base_url=self.base_url, api_key=self.api_key)
+        if not client.health_check():
+            print(f"[FAIL] API is not reachable: {self.base_url}")
+            return [_timing('batch-upload', error=f'API not reachable: {self.base_url}')]
+
+        import requests
+
+        matcher = NameMatcher()
+        try:
+            for college in client.iter_colleges(fields=['id', 'name', 'website']):
+                matcher.add(('server', college['id']), college['name'], college.get('website'))
+        except requests.RequestException as e:
+            print(f"[WARN] Could not list existing colleges for name matching: {e}")
+
+        if records is None:
+            stages, records = STREAM_STAGES, scraper.load_targets()
+        else:
+            stages = STREAM_STAGES[STREAM_STAGES.index(RECORD_STAGE):]
+        meters = compose(records, stages, scraper, client.bulk_import, batch_size, prefetch, matcher,
+                         rename=self.match_names)
+        error = None
+        try:
+            for names, result in meters[-1]:
+                print(f"[OK] Imported batch of {len(names)}: {result.get('message', 'ok')}")
+        except StageFailed as e:
+            error = str(e)
+            print(f"[FAIL] {e}")
+        finally:
+            # Downstream first: closing the buffer stops its thread before the stages it was running
+            for meter in reversed(meters):
+                meter.close()
+            if registry is not None:
+                registry.save()
+        return stream_timings(meters, error)
+
+
+# Streaming stages: each takes an iterable and returns a generator; compose() chains them.
+
+def fetch_pages(targets, scraper):
+    """(college, url, page) for every seed URL that could be fetched."""
+    for college in targets:
+        if college.get('source') == 'manual':
+            continue
+        for url in college.get('mental_health_urls', []):
+            if not scraper.is_valid_url(url):
+                continue
+            page = scraper.fetch_page(url)
+            if page:
+                yield college, url, page
+
+
+def parse_pages(pages, scraper):
+    for college, url, page in pages:
+        soup = scraper.parser.parse(page.content)
+        scraper.metrics.pages_parsed.inc()
+        yield college, url, soup
+
+
+def extract_resources(soups, scraper):
+    for college, url, soup in soups:
+        resources = scraper.extract_resources(soup, url)
+        scraper.metrics.resources_extracted.inc(len(resources))
+        yield college, url, resources
+
+
+def college_records(extracted, scraper):
+    """One scraped-data record per college, from its consecutive pages."""
+    for _, pages in itertools.groupby(extracted, key=lambda item: id(item[0])):
+        resources = []
+        for college, _, found in pages:
+            resources.extend(found)
+        print(f"{college['name']}: {len(resources)} resource(s)")
+        yield scraper.college_record(college, resources)
+
+
+def dedupe_colleges(records, scraper):
+    """Drop repeated college names; dedupe each college's resources."""
+    seen = set()
+    for record in records:
+        if record.get('name') in seen:
+            continue
+        seen.add(record.get('name'))
+        record['resources'] = scraper.deduplicate_resources(record.get('resources') or [])
+        yield record
+
+
+def filter_colleges(records, scraper):
+    """Drop low-quality resources, then colleges left without any."""
+    for record in records:
+        record['resources'] = scraper.filter_low_quality(record['resources'])
+        if record['resources']:
+            yield record
+
+
+def validate_colleges(records):
+    """Records that pass the importer's validation (the others are reported)."""
+    for record in records:
+        ok, error = validate_for_import(record)
+        if ok:
+            yield record
+        else:
+            print(f"   [SKIP] {record.get('name', 'Unknown')}: {error}")
+
+
+def build_payloads(records, matcher=None, rename=True):
+    """Import payloads for records; with a matcher, fuzzy matches are renamed (or, without rename, listed)."""
+    for n, record in enumerate(records):
+        payload = build_college_payload(record)
+        if matcher is not None:
+            for old, new, score in resolve_college_names([payload], matcher=matcher, start=n, rename=rename):
+                if rename:
+                    print(f"   [MATCH] {old} -> {new} ({score:.2f})")
+                else:
+                    print(f"   [MATCH?] {old} looks like {new} ({score:.2f}); kept as is")
+        yield payload
+
+
+def upload_batches(payloads, upload, batch_size=DEFAULT_BATCH_SIZE):
+    """upload() each batch of batch_size payloads; yield (names, upload result)."""
+    payloads = iter(payloads)
+    for n in itertools.count(1):
+        batch = list(itertools.islice(payloads, batch_size))
+        if not batch:
+            return
+        try:
+            result = upload(batch)
+        except Exception as e:
+            raise StageFailed(f'batch {n} ({len(batch)} colleges): {e}') from e
+        yield [p['name'] for p in batch], result
+
+
+_DONE = object()
+
+
+def buffered(items, size):
+    """Iterate items in a background thread, running at most size items ahead."""
+    slots = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                slots.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((_DONE, e))
+        else:
+            put((_DONE, None))
+
+    thread = threading.Thread(target=produce, name='pipeline-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = slots.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class _Meter:
+    """Counts the items a stage yields and the time spent producing them."""
+
+    def __init__(self, name, items, upstream=None):
+        self.name = name
+        self.items = items
+        self.upstream = upstream
+        self.count = 0
+        self.seconds = 0.0  # including the stages upstream, when they run in this thread
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            item = next(self.items)
+        finally:
+            self.seconds += time.perf_counter() - started
+        self.count += 1
+        return item
+
+    def close(self):
+        close = getattr(self.items, 'close', None)
+        if close:
+            close()
+
+
+def compose(items, stages, scraper, upload, batch_size=DEFAULT_BATCH_SIZE, prefetch=None, matcher=None,
+            rename=True):
+    """Chain the named stream stages over items; return their meters, the last one outermost.
+
+    A prefetch buffer (default: one batch) is put in front of batch-upload;
+    prefetch=0 runs everything in the calling thread.
+    """
+    make = {
+        'fetch': lambda it: fetch_pages(it, scraper),
+        'parse': lambda it: parse_pages(it, scraper),
+        'extract': lambda it: extract_resources(it, scraper),
+        'normalize': lambda it: college_records(it, scraper),
+        'dedupe': lambda it: dedupe_colleges(it, scraper),
+        'filter': lambda it: filter_colleges(it, scraper),
+        'validate': validate_colleges,
+        'payload': lambda it: build_payloads(it, matcher, rename),
+        'batch-upload': lambda it: upload_batches(it, upload, batch_size),
+    }
+    prefetch = batch_size if prefetch is None else prefetch
+    meters, upstream = [], None
+    for name in stages:
+        if name == 'batch-upload' and prefetch and upstream is not None:
+            # Its time is the consumer's wait, not work, so nothing is subtracted from it
+            upstream = _Meter('(buffer)', buffered(upstream, prefetch))
+            meters.append(upstream)
+        upstream = _Meter(name, make[name](upstream if upstream is not None else items), upstream)
+        meters.append(upstream)
+    return meters
+
+
+def _timing(stage, seconds=0.0, colleges_in=None, colleges_out=None, error=None):
+    return {
+        'stage': stage,
+        'seconds': round(seconds, 3),
+        'colleges_in': colleges_in,
+        'colleges_out': colleges_out,
+        'ok': error is None,
+        'error': error,
+    }
+
+
+def stream_timings(meters, error=None):
+    """Timing rows for composed stages: own time and items in/out per stage."""
+    timings = []
+    for meter in meters:
+        upstream = meter.upstream
+        own = meter.seconds - (upstream.seconds if upstream is not None else 0.0)
+        timings.append(_timing(meter.name, max(0.0, own), upstream.count if upstream is not None else None,
+                               meter.count))
+    if error and timings:
+        timings[-1].update(ok=False, error=error)
+    return timings
+
+
+def _count(n):
+    return '-' if n is None else str(n)
+
+
+def print_timings(timings):
+    print('\n' + '=' * 60)
+    print('PIPELINE TIMINGS')
+    print('=' * 60)
+    for t in timings:
+        counts = f"{_count(t['colleges_in']):>6} -> {_count(t['colleges_out']):<6}"
+        status = 'ok' if t['ok'] else f"FAILED: {t['error']}"
+        print(f"   {t['stage']:<10} {t['seconds']:9.2f}s  {counts:16} {status}")
+    print(f"   {'total':<10} {sum(t['seconds'] for t in timings):9.2f}s")
+    print('=' * 60)
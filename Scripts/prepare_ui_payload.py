@@ -1,8 +1,79 @@
+"""
+Build the UI payload served by GET /api/resources/ui.
+
+Writes, next to each other:
+    ui_payload.json           - minified payload (array of colleges with cards)
+    ui_payload.json.gz        - gzip-precompressed copy
+    ui_payload.json.br        - brotli-precompressed copy (only if `brotli` is installed)
+    ui_payload.manifest.json  - sizes, SHA-256 hashes, ETag and a validated flag
+
+The endpoint serves these bytes straight from disk when the manifest says
+the payload was validated, so no request ever parses the JSON.
+
+With --shards the builder additionally writes a shard set for the map view
+(served by GET /api/resources/ui/pins and /api/resources/ui/shards/{key}):
+    ui_shards/pins.json          - name, location, lat/lon, resource count and shard key per college
+    ui_shards/shards/<key>.json  - full college entries (with cards) for one geotile or state
+    ui_shards/manifest.json      - shard scheme plus hashes/ETags for every file
+Pins are tiny, so the map can place every marker before any card is loaded.
+
+Every run also writes ui_payload.state.json: a fingerprint and stable pin id
+per college, plus, in a section only --shards runs update, the fingerprint
+and shard key each college's shard was last written with. With --incremental
+only colleges whose scraped input changed are rebuilt and spliced into the
+previous payload. Only the shards whose colleges changed since they were
+written are rewritten. The state also records the payload ETag each index
+was built from, so an index left behind by an earlier run is rebuilt.
+Nothing is written at all when nothing changed.
+
+Usage:
+    python prepare_ui_payload.py             # minified + precompressed + manifest
+    python prepare_ui_payload.py --incremental --shards   # nightly: rebuild only what changed
+    python prepare_ui_payload.py --pretty    # indented JSON (for eyeballing diffs)
+    python prepare_ui_payload.py --shards    # also write ui_shards/ (2-degree geotiles)
+    python prepare_ui_payload.py --shards --shard-by state
+    python prepare_ui_payload.py --search-index   # also write ui_payload.search.json (see search_index.py)
+    python prepare_ui_payload.py --spatial-index  # also write ui_payload.spatial.json (see spatial_index.py)
+"""
+
+import argparse
+import gzip
+import hashlib
 import json
+import math
+import os
+import re
+from datetime import datetime, timezone
 from pathlib import Path
 
+from profiling import add_profile_arguments, profiler_from_args
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 INPUT = Path(__file__).parent / 'scraped_colleges_data.json'
 OUTPUT = Path(__file__).parent / 'ui_payload.json'
+SHARD_DIR = Path(__file__).parent / 'ui_shards'
+MANIFEST_VERSION = 1
+STATE_VERSION = 2
+# Bump when build_card/build_college_entry change so --incremental rebuilds everything
+BUILD_VERSION = 1
+DEFAULT_TILE_SIZE = 2.0  # degrees; a tile is roughly a metro region at mid latitudes
+
+# Fields GET /api/resources/ui guarantees on every card
+REQUIRED_CARD_FIELDS = ('title', 'description', 'contact')
+
+
+def manifest_path(output):
+    output = Path(output)
+    return output.with_name(output.stem + '.manifest.json')
+
+
+def state_path(output):
+    output = Path(output)
+    return output.with_name(output.stem + '.state.json')
 
 
 def build_card(resource):
@@ -25,26 +96,416 @@ def build_card(resource):
     }
 
 
-def main():
-    if not INPUT.exists():
-        print('No scraped data found at', INPUT)
-        return 1
-    data = json.loads(INPUT.read_text(encoding='utf-8'))
-    ui = []
-    for college in data:
-        college_entry = {
-            'name': college.get('name'),
-            'location': college.get('location'),
-            'latitude': college.get('latitude'),
-            'longitude': college.get('longitude'),
-            'website': college.get('website'),
-            'scraped_at': college.get('scraped_at'),
-            'cards': [build_card(r) for r in college.get('resources', [])]
+def build_college_entry(college):
+    return {
+        'name': college.get('name'),
+        'location': college.get('location'),
+        'latitude': college.get('latitude'),
+        'longitude': college.get('longitude'),
+        'website': college.get('website'),
+        'scraped_at': college.get('scraped_at'),
+        'cards': [build_card(r) for r in college.get('resources', [])]
+    }
+
+
+def college_keys(colleges):
+    """Stable identity per college: its name, with '#n' for repeated names."""
+    seen = {}
+    keys = []
+    for college in colleges:
+        name = college.get('name') or ''
+        n = seen.get(name, 0)
+        seen[name] = n + 1
+        keys.append(name if n == 0 else f'{name}#{n}')
+    return keys
+
+
+def fingerprint(college):
+    """Hash of a scraped college's inputs (plus BUILD_VERSION)."""
+    blob = json.dumps(college, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(f'{BUILD_VERSION}:{blob}'.encode('utf-8')).hexdigest()
+
+
+def load_state(output):
+    path = state_path(output)
+    if not path.exists():
+        return None
+    state = json.loads(path.read_text(encoding='utf-8'))
+    return state if state.get('version') == STATE_VERSION else None
+
+
+def build_ui(data, state=None, previous_ui=None):
+    """Build UI entries, reusing previous_ui entries whose fingerprint is unchanged.
+
+    Returns (ui, ids, fingerprints, report) where ids are stable pin ids and
+    report lists added/changed/removed college keys and the reused count.
+    """
+    prev = (state or {}).get('colleges', {})
+    prev_entries = {}
+    if previous_ui is not None:
+        prev_entries = dict(zip(college_keys(previous_ui), previous_ui))
+    next_id = max((c['id'] for c in prev.values()), default=-1) + 1
+
+    ui, ids, fingerprints = [], [], []
+    report = {'added': [], 'changed': [], 'removed': [], 'reused': 0}
+    keys = college_keys(data)
+    for key, college in zip(keys, data):
+        fp = fingerprint(college)
+        old = prev.get(key)
+        if old and old.get('fp') == fp and key in prev_entries:
+            entry = prev_entries[key]
+            report['reused'] += 1
+        else:
+            entry = build_college_entry(college)
+            report['changed' if old else 'added'].append(key)
+        if old:
+            ids.append(old['id'])
+        else:
+            ids.append(next_id)
+            next_id += 1
+        ui.append(entry)
+        fingerprints.append(fp)
+    report['removed'] = sorted(set(prev) - set(keys))
+    return ui, ids, fingerprints, report
+
+
+def save_state(output, ui, ids, fingerprints, shards=None, indexes=None):
+    """Write the state file.
+
+    shards is the shard_state() of the shard set on disk, if any; indexes
+    maps each index written next to the payload ('search', 'spatial') to
+    the payload ETag it was built from.
+    """
+    state = {
+        'version': STATE_VERSION,
+        'build_version': BUILD_VERSION,
+        'colleges': {key: {'fp': fp, 'id': cid} for key, cid, fp in zip(college_keys(ui), ids, fingerprints)},
+        'shards': shards,
+        'indexes': indexes or {},
+    }
+    _atomic_write(state_path(output), json.dumps(state, separators=(',', ':')).encode('utf-8'))
+
+
+def shard_state(ui, fingerprints, directory, shard_by, tile_size):
+    """What a shard set written from ui holds: per college, its fingerprint and shard key."""
+    return {
+        'dir': Path(directory).resolve().as_posix(),
+        'shard_by': shard_by,
+        'tile_size': tile_size,
+        'colleges': {
+            key: {'fp': fp, 'shard': shard_key(entry, shard_by, tile_size)}
+            for key, entry, fp in zip(college_keys(ui), ui, fingerprints)
+        },
+    }
+
+
+def dirty_shards(ui, fingerprints, shards, directory, shard_by, tile_size):
+    """Shard keys out of date with ui, or None if every shard must be rewritten.
+
+    shards is the state's record of the shard set on disk (shard_state()),
+    so colleges changed by runs that did not write shards count as well.
+    """
+    current = shard_state(ui, fingerprints, directory, shard_by, tile_size)
+    if not shards or any(shards.get(k) != current[k] for k in ('dir', 'shard_by', 'tile_size')):
+        return None
+    prev, now = shards['colleges'], current['colleges']
+    dirty = set()
+    for key, entry in now.items():
+        old = prev.get(key)
+        if old != entry:
+            dirty.add(entry['shard'])
+            if old:
+                dirty.add(old['shard'])
+    dirty.update(prev[key]['shard'] for key in prev.keys() - now.keys())
+    return dirty
+
+
+def validate_payload(ui):
+    """Return a list of schema problems (empty if the payload is servable)."""
+    errors = []
+    for i, college in enumerate(ui):
+        cards = college.get('cards')
+        if not isinstance(cards, list):
+            errors.append(f"college {i} ({college.get('name')}): missing cards")
+            continue
+        for j, card in enumerate(cards):
+            missing = [f for f in REQUIRED_CARD_FIELDS if f not in card]
+            if missing:
+                errors.append(f"college {i} ({college.get('name')}) card {j}: missing {', '.join(missing)}")
+    return errors
+
+
+def _atomic_write(path, data):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(str(path) + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _describe(path, data):
+    return {
+        'path': Path(path).name,
+        'bytes': len(data),
+        'sha256': hashlib.sha256(data).hexdigest(),
+    }
+
+
+def _dumps(obj, pretty=False):
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _etag(data):
+    return f'"{hashlib.sha256(data).hexdigest()[:32]}"'
+
+
+def write_variants(output, data, use_brotli=True, root=None):
+    """Write data plus .gz (and .br) copies next to output.
+
+    Returns {encoding: {path, bytes, sha256}} with paths relative to root
+    (default: output's directory).
+    """
+    output = Path(output)
+    root = Path(root) if root else output.parent
+    variants = {'identity': (output, data)}
+    # mtime=0 makes the .gz byte-stable for identical payloads
+    variants['gzip'] = (Path(str(output) + '.gz'), gzip.compress(data, compresslevel=9, mtime=0))
+    br_path = Path(str(output) + '.br')
+    if use_brotli and brotli is not None:
+        variants['br'] = (br_path, brotli.compress(data, quality=11))
+    elif br_path.exists():
+        br_path.unlink()  # never leave a stale .br the manifest does not describe
+
+    files = {}
+    for enc, (path, blob) in variants.items():
+        _atomic_write(path, blob)
+        files[enc] = _describe(path, blob)
+        files[enc]['path'] = path.relative_to(root).as_posix()
+    return files
+
+
+def write_artifacts(ui, output=OUTPUT, pretty=False, use_brotli=True):
+    """Write the payload, its precompressed variants and the manifest.
+
+    Returns the manifest dict.
+    """
+    output = Path(output)
+    errors = validate_payload(ui)
+    data = _dumps(ui, pretty)
+    files = write_variants(output, data, use_brotli)
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'etag': _etag(data),
+        'validated': not errors,
+        'errors': errors[:20],
+        'colleges': len(ui),
+        'cards': sum(len(c.get('cards', [])) for c in ui),
+        'files': files,
+    }
+    # Manifest last: the server only trusts files the manifest describes
+    _atomic_write(manifest_path(output), json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def tile_key(lat, lon, tile_size=DEFAULT_TILE_SIZE):
+    """Grid cell containing (lat, lon), e.g. '20_-42' for 2-degree tiles."""
+    return f"{math.floor(float(lat) / tile_size)}_{math.floor(float(lon) / tile_size)}"
+
+
+def state_key(location):
+    """Slug of the state part of 'City, State' (e.g. 'new-york')."""
+    state = (location or '').rsplit(',', 1)[-1].strip().lower()
+    return re.sub(r'[^a-z0-9]+', '-', state).strip('-') or 'unknown'
+
+
+def shard_key(entry, shard_by='tile', tile_size=DEFAULT_TILE_SIZE):
+    if shard_by == 'state':
+        return state_key(entry.get('location'))
+    try:
+        return tile_key(entry.get('latitude'), entry.get('longitude'), tile_size)
+    except (TypeError, ValueError):
+        return 'unknown'
+
+
+def build_pin(index, entry, key):
+    return {
+        'id': index,
+        'name': entry.get('name'),
+        'location': entry.get('location'),
+        'latitude': entry.get('latitude'),
+        'longitude': entry.get('longitude'),
+        'website': entry.get('website'),
+        'resource_count': len(entry.get('cards', [])),
+        'shard': key,
+    }
+
+
+def write_shard_set(ui, directory=SHARD_DIR, shard_by='tile', tile_size=DEFAULT_TILE_SIZE, use_brotli=True,
+                    ids=None, only_shards=None):
+    """Write pins, per-shard card files and the shard manifest.
+
+    ids are the pin ids (default: list positions). When only_shards is a set,
+    shards outside it keep their files and manifest entries from the previous
+    build. Returns the manifest dict.
+    """
+    directory = Path(directory)
+    shard_dir = directory / 'shards'
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    ids = list(range(len(ui))) if ids is None else ids
+
+    previous = {}
+    if only_shards is not None and (directory / 'manifest.json').exists():
+        previous = json.loads((directory / 'manifest.json').read_text(encoding='utf-8')).get('shards', {})
+
+    pins = []
+    groups = {}
+    for cid, entry in zip(ids, ui):
+        key = shard_key(entry, shard_by, tile_size)
+        pins.append(build_pin(cid, entry, key))
+        # Shard entries carry the pin id so the map can attach cards to markers
+        groups.setdefault(key, []).append(dict(entry, id=cid))
+
+    shards = {}
+    for key, entries in sorted(groups.items()):
+        if only_shards is not None and key not in only_shards and key in previous:
+            shards[key] = previous[key]
+            continue
+        data = _dumps(entries)
+        shards[key] = {
+            'colleges': len(entries),
+            'cards': sum(len(e.get('cards', [])) for e in entries),
+            'etag': _etag(data),
+            'files': write_variants(shard_dir / f'{key}.json', data, use_brotli, root=directory),
         }
-        ui.append(college_entry)
 
-    OUTPUT.write_text(json.dumps(ui, indent=2, ensure_ascii=False), encoding='utf-8')
-    print('Wrote UI payload to', OUTPUT)
+    # Drop shard files left over from a previous build with different keys
+    for stale in shard_dir.glob('*.json*'):
+        if stale.name.split('.json', 1)[0] not in shards:
+            stale.unlink()
+
+    pins_data = _dumps(pins)
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'shard_by': shard_by,
+        'tile_size': tile_size if shard_by == 'tile' else None,
+        'validated': not validate_payload(ui),
+        'colleges': len(ui),
+        'pins': {'etag': _etag(pins_data), 'files': write_variants(directory / 'pins.json', pins_data, use_brotli)},
+        'shards': shards,
+    }
+    _atomic_write(directory / 'manifest.json', json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the UI payload from scraped data.')
+    parser.add_argument('--input', default=str(INPUT), help='Scraped colleges JSON')
+    parser.add_argument('--output', default=str(OUTPUT), help='UI payload JSON to write')
+    parser.add_argument('--pretty', action='store_true', help='Indent the JSON payload')
+    parser.add_argument('--no-brotli', action='store_true', help='Skip the .br variant')
+    parser.add_argument('--shards', nargs='?', const=str(SHARD_DIR), metavar='DIR',
+                        help=f'Also write pins + shard files for the map (default dir: {SHARD_DIR.name})')
+    parser.add_argument('--shard-by', choices=('tile', 'state'), default='tile',
+                        help='Shard by lat/lon geotile or by state (default: tile)')
+    parser.add_argument('--tile-size', type=float, default=DEFAULT_TILE_SIZE,
+                        help=f'Geotile edge in degrees (default: {DEFAULT_TILE_SIZE})')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Rebuild only colleges whose scraped data changed since the last build')
+    parser.add_argument('--search-index', action='store_true',
+                        help='Also write the BM25 search index (ui_payload.search.json)')
+    parser.add_argument('--spatial-index', action='store_true',
+                        help='Also write the nearest-campus k-d tree (ui_payload.spatial.json)')
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args, 'prepare_ui_payload')
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        print('No scraped data found at', input_path)
+        return 1
+    with profiler.stage('load'):
+        data = json.loads(input_path.read_text(encoding='utf-8'))
+
+    output = Path(args.output)
+    with profiler.stage('build'):
+        state = load_state(output)
+        previous_ui = None
+        if args.incremental and state and output.exists() and manifest_path(output).exists():
+            previous_ui = json.loads(output.read_text(encoding='utf-8'))
+        ui, ids, fingerprints, report = build_ui(data, state, previous_ui)
+
+    # Incremental and nothing changed: only write what is missing or out of date
+    unchanged = False
+    only = None  # shards to rewrite; None rewrites them all
+    if previous_ui is not None:
+        print(f"Incremental: {len(report['added'])} added, {len(report['changed'])} changed,"
+              f" {len(report['removed'])} removed, {report['reused']} reused")
+        unchanged = not (report['added'] or report['changed'] or report['removed'])
+        if args.shards and (Path(args.shards) / 'manifest.json').exists():
+            only = dirty_shards(ui, fingerprints, state.get('shards'), args.shards, args.shard_by, args.tile_size)
+    rebuild = not unchanged
+    write_shards = bool(args.shards) and only != set()
+    indexes = dict((state or {}).get('indexes') or {})
+    etag = json.loads(manifest_path(output).read_text(encoding='utf-8'))['etag'] if unchanged else None
+
+    def index_stale(name, path):
+        return rebuild or not path.exists() or indexes.get(name) != etag
+
+    write_search = write_spatial = False
+    if args.search_index:
+        from search_index import build_index, index_path, write_index
+        write_search = index_stale('search', index_path(output))
+    if args.spatial_index:
+        from spatial_index import SpatialIndex, index_path as spatial_path
+        write_spatial = index_stale('spatial', spatial_path(output))
+    if not (rebuild or write_shards or write_search or write_spatial):
+        print('UI payload is up to date; nothing written.')
+        profiler.close()
+        return 0
+
+    if rebuild:
+        with profiler.stage('write'):
+            manifest = write_artifacts(ui, output, pretty=args.pretty, use_brotli=not args.no_brotli)
+        etag = manifest['etag']
+        print('Wrote UI payload to', output)
+        for enc, info in manifest['files'].items():
+            print(f"  {enc:8} {info['bytes']:>9,} bytes  {info['path']}")
+    else:
+        print('UI payload is up to date; writing out-of-date shards and indexes only.')
+    shards = (state or {}).get('shards')
+    if write_shards:
+        with profiler.stage('shards'):
+            shard_manifest = write_shard_set(ui, args.shards, args.shard_by, args.tile_size,
+                                             use_brotli=not args.no_brotli, ids=ids, only_shards=only)
+        pins = shard_manifest['pins']['files']['identity']
+        rewritten = len(shard_manifest['shards']) if only is None else len(only & set(shard_manifest['shards']))
+        print(f"Wrote {rewritten} of {len(shard_manifest['shards'])} {args.shard_by} shard(s) to {args.shards}"
+              f" (pins: {pins['bytes']:,} bytes)")
+        shards = shard_state(ui, fingerprints, args.shards, args.shard_by, args.tile_size)
+    if write_search:
+        with profiler.stage('search-index'):
+            index = build_index(ui)
+            files = write_index(index, index_path(output), use_brotli=not args.no_brotli)
+        print(f"Wrote search index ({len(index['terms']):,} terms, {files['identity']['bytes']:,} bytes)"
+              f" to {index_path(output)}")
+        indexes['search'] = etag
+    if write_spatial:
+        with profiler.stage('spatial-index'):
+            spatial = SpatialIndex.from_payload(ui, ids)
+            spatial.write(spatial_path(output), use_brotli=not args.no_brotli)
+        print(f"Wrote spatial index ({len(spatial)} campuses) to {spatial_path(output)}")
+        indexes['spatial'] = etag
+    with profiler.stage('save-state'):
+        save_state(output, ui, ids, fingerprints, shards, indexes)
+    if rebuild:
+        if not manifest['validated']:
+            print(f"[WARN] Payload failed validation ({len(manifest['errors'])} problem(s) listed in the manifest);"
+                  " the API will not serve it from the precompressed files.")
+    profiler.close()
     return 0
 
 
@@ -0,0 +1,222 @@
+"""
+Opt-in profiling for the pipeline entry points (--profile).
+
+simple_scraper, importer, validate_data and prepare_ui_payload accept
+
+    --profile [DIR]          write a profile of this run under DIR (default: profiles/)
+    --profile-top N          allocation sites listed per stage (default: 25)
+    --profile-sample FRAC    also deep-profile extract_resources on this fraction of pages
+
+Each run gets its own directory, DIR/<tool>-<YYYYmmdd-HHMMSS>, holding:
+
+    01-<stage>.prof          cProfile dump of the stage (open with pstats or snakeviz)
+    01-<stage>.alloc.txt     tracemalloc top-N: where the stage's net allocations came from
+    extract_resources.prof   sampled extract_resources calls only, merged (with --profile-sample)
+    profile.json             per-stage seconds and peak traced memory, per-page samples
+
+Sampled extract_resources calls are left out of the enclosing stage's
+.prof, so the two never count the same time twice. tracemalloc slows a
+run down several times, so the seconds are only comparable with other
+profiled runs.
+
+Usage:
+    python simple_scraper.py --profile --profile-sample 0.05
+    python prepare_ui_payload.py --profile /tmp/profiles --profile-top 50
+    python -m pstats profiles/simple_scraper-20260101-120000/01-scrape.prof
+"""
+
+import argparse
+import cProfile
+import functools
+import json
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_DIR = 'profiles'
+DEFAULT_TOP = 25
+TRACE_FRAMES = 1
+# Allocations made by the profilers themselves, not by the code under test
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _fraction(value):
+    fraction = float(value)
+    if not 0 <= fraction <= 1:
+        raise argparse.ArgumentTypeError(f'must be between 0 and 1, got {value}')
+    return fraction
+
+
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_DIR, metavar='DIR',
+                        help=f'Write cProfile and tracemalloc output per stage under DIR (default: {DEFAULT_DIR})')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP, metavar='N',
+                        help=f'Profile mode: allocation sites listed per stage (default: {DEFAULT_TOP})')
+    parser.add_argument('--profile-sample', type=_fraction, default=0.0, metavar='FRACTION',
+                        help='Profile mode: also profile extract_resources on this fraction of pages (0-1)')
+
+
+def profiler_from_args(args, tool):
+    """Profiler for a parsed command line; a disabled one without --profile."""
+    if not getattr(args, 'profile', None):
+        return Profiler()
+    run_dir = Path(args.profile) / f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}"
+    return Profiler(run_dir, top=args.profile_top, sample=args.profile_sample)
+
+
+def _kib(size):
+    return round(size / 1024, 1)
+
+
+class Profiler:
+    """Profile named stages into run_dir; does nothing when run_dir is None."""
+
+    def __init__(self, run_dir=None, top=DEFAULT_TOP, sample=0.0, seed=None):
+        self.run_dir = Path(run_dir) if run_dir else None
+        self.top = top
+        self.sample = sample
+        self.stages = []
+        self.samples = []
+        self._random = random.Random(seed)
+        self._active = None          # cProfile.Profile of the running stage
+        self._stage_peak = 0         # peak before the last sampled page reset it
+        self._extract_profile = None
+        self._started_tracing = False
+
+    @property
+    def enabled(self):
+        return self.run_dir is not None
+
+    def _start(self):
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name):
+        """Profile the with-block as one stage. Stages do not nest."""
+        if not self.enabled:
+            yield
+            return
+        self._start()
+        n = len(self.stages) + 1
+        stem = f'{n:02d}-{name}'
+        before = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+        tracemalloc.reset_peak()
+        self._stage_peak = 0
+        profile = cProfile.Profile()
+        self._active = profile
+        error = None
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        except BaseException as e:
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            profile.disable()
+            seconds = time.perf_counter() - started
+            self._active = None
+            peak = max(self._stage_peak, tracemalloc.get_traced_memory()[1])
+            after = tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+            profile.dump_stats(self.run_dir / f'{stem}.prof')
+            self._write_allocations(self.run_dir / f'{stem}.alloc.txt', name, after.compare_to(before, 'lineno'))
+            self.stages.append({
+                'stage': name,
+                'seconds': round(seconds, 4),
+                'peak_kib': _kib(peak),
+                'files': [f'{stem}.prof', f'{stem}.alloc.txt'],
+                'error': error,
+            })
+
+    def _write_allocations(self, path, name, diffs):
+        growth = sum(d.size_diff for d in diffs)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f'Top {self.top} allocation sites for stage {name} (net {_kib(growth):+,} KiB)\n\n')
+            for d in diffs[:self.top]:
+                f.write(f'{_kib(d.size_diff):+12,.1f} KiB  {d.count_diff:+9,} blocks  '
+                        f'{_kib(d.size):12,.1f} KiB live  {d.traceback}\n')
+
+    def wrap_extract(self, scraper):
+        """Deep-profile scraper.extract_resources on a sample of the pages."""
+        if not (self.enabled and self.sample):
+            return
+        extract = scraper.extract_resources
+
+        @functools.wraps(extract)
+        def sampled(soup, url):
+            if self._random.random() >= self.sample:
+                return extract(soup, url)
+            return self._profile_extract(extract, soup, url)
+        scraper.extract_resources = sampled
+
+    def _profile_extract(self, extract, soup, url):
+        self._start()
+        if self._extract_profile is None:
+            self._extract_profile = cProfile.Profile()
+        # Only one profiler can be hooked at a time: pause the stage's
+        if self._active is not None:
+            self._active.disable()
+        current, peak = tracemalloc.get_traced_memory()
+        self._stage_peak = max(self._stage_peak, peak)
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        self._extract_profile.enable()
+        try:
+            resources = extract(soup, url)
+        finally:
+            self._extract_profile.disable()
+            seconds = time.perf_counter() - started
+            self.samples.append({
+                'url': url,
+                'seconds': round(seconds, 5),
+                'peak_kib': _kib(tracemalloc.get_traced_memory()[1] - current),
+            })
+            if self._active is not None:
+                self._active.enable()
+        return resources
+
+    def close(self):
+        """Write profile.json and stop tracing; returns the run directory."""
+        if not self.enabled or not (self.stages or self.samples):
+            return None
+        files = []
+        if self._extract_profile is not None:
+            self._extract_profile.dump_stats(self.run_dir / 'extract_resources.prof')
+            files.append('extract_resources.prof')
+        summary = {
+            'stages': self.stages,
+            'extract_resources': {
+                'sample': self.sample,
+                'pages': len(self.samples),
+                'seconds': round(sum(s['seconds'] for s in self.samples), 4),
+                'files': files,
+                'samples': self.samples,
+            },
+        }
+        with open(self.run_dir / 'profile.json', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        print_profile(summary, self.run_dir)
+        return self.run_dir
+
+
+def print_profile(summary, run_dir):
+    print(f'\n[PROFILE] Written to {run_dir}')
+    for s in summary['stages']:
+        status = f"  ({s['error']})" if s['error'] else ''
+        print(f"   {s['stage']:<20} {s['seconds']:9.3f}s  peak {s['peak_kib']:>12,.1f} KiB{status}")
+    extract = summary['extract_resources']
+    if extract['pages']:
+        print(f"   extract_resources    {extract['seconds']:9.3f}s  over {extract['pages']} sampled page(s)")
@@ -1,34 +1,244 @@
 #!/usr/bin/env python3
 """
 Publish normalized UI payload to the web API bulk endpoint.
-Usage: python3 publish_to_api.py --url https://app.example.com/api/resources/bulk --token SECRET
+
+Only colleges that changed since the last successful publish to the same URL
+are sent. A small manifest next to the payload (ui_payload.publish.json)
+records a hash per college; it is updated after every batch the server
+accepts, so an interrupted run resumes where it stopped. Colleges that
+disappeared from the payload are removed via <url>/delete.
+
+Changed colleges are split into batches bounded by both serialized size and
+count; each batch is retried on its own, and one failing batch does not
+stop the rest.
+
+Usage:
+    python3 publish_to_api.py --url https://app.example.com/api/resources/bulk --token SECRET
+    python3 publish_to_api.py --url ... --dry-run      # show what would be sent
+    python3 publish_to_api.py --url ... --full         # ignore the manifest, send everything
 """
 import argparse
+import hashlib
 import json
+import os
+import sys
 import time
-import requests
+from datetime import datetime
+from pathlib import Path
+
+from metrics import add_metrics_arguments, metrics_from_args
+from prepare_ui_payload import college_keys
+
+STATE_VERSION = 1
+DEFAULT_MAX_BATCH_BYTES = 1024 * 1024
+DEFAULT_MAX_BATCH_COLLEGES = 50
+# Fields that change on every scrape without changing what the API stores
+VOLATILE_FIELDS = ('scraped_at',)
 
 
-def post_with_retries(url, data, headers, retries=5, backoff=1.0):
+def post_with_retries(url, data, headers, retries=5, backoff=1.0, session=None, sleep=time.sleep, metrics=None):
+    """POST data (JSON-serializable, or pre-encoded bytes) until it succeeds."""
+    import requests
+
+    http = session or requests
     for attempt in range(1, retries + 1):
+        if attempt > 1 and metrics is not None:
+            metrics.publish_retries.inc()
         try:
-            resp = requests.post(url, json=data, headers=headers, timeout=30)
+            if isinstance(data, bytes):
+                resp = http.post(url, data=data, headers=headers, timeout=30)
+            else:
+                resp = http.post(url, json=data, headers=headers, timeout=30)
             if resp.status_code in (200, 201):
                 return resp
             else:
                 print(f"Attempt {attempt}: status {resp.status_code} - {resp.text}")
         except requests.RequestException as e:
             print(f"Attempt {attempt} failed: {e}")
-        time.sleep(backoff * (2 ** (attempt - 1)))
+        if attempt < retries:
+            sleep(backoff * (2 ** (attempt - 1)))
     raise RuntimeError("All attempts failed")
 
 
-def main():
+def publish_state_path(payload_file):
+    path = Path(payload_file)
+    return path.with_name(path.stem + '.publish.json')
+
+
+def entry_hash(entry):
+    """Hash of what the API stores for one college."""
+    stable = {k: v for k, v in entry.items() if k not in VOLATILE_FIELDS}
+    blob = json.dumps(stable, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def load_publish_state(path, url):
+    """Return {college key: hash} last published to url (empty if none)."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    state = json.loads(path.read_text(encoding='utf-8'))
+    if state.get('version') != STATE_VERSION:
+        return {}
+    return dict(state.get('targets', {}).get(url, {}).get('colleges', {}))
+
+
+def save_publish_state(path, url, published):
+    """Atomically record published (key -> hash) for url, keeping other targets."""
+    path = Path(path)
+    state = {'version': STATE_VERSION, 'targets': {}}
+    if path.exists():
+        existing = json.loads(path.read_text(encoding='utf-8'))
+        if existing.get('version') == STATE_VERSION:
+            state = existing
+    state['targets'][url] = {
+        'published_at': datetime.now().isoformat(),
+        'colleges': published,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def plan_delta(payload, published):
+    """Compare payload against published hashes.
+
+    Returns (changed, removed, hashes): changed is a list of (key, entry)
+    to send, removed the keys no longer in the payload, hashes the new
+    key -> hash map for the whole payload.
+    """
+    keys = college_keys(payload)
+    hashes = {}
+    changed = []
+    for key, entry in zip(keys, payload):
+        digest = entry_hash(entry)
+        hashes[key] = digest
+        if published.get(key) != digest:
+            changed.append((key, entry))
+    removed = sorted(k for k in published if k not in hashes)
+    return changed, removed, hashes
+
+
+def make_batches(items, max_bytes=DEFAULT_MAX_BATCH_BYTES, max_count=DEFAULT_MAX_BATCH_COLLEGES):
+    """Group (key, entry) pairs into batches of pre-encoded JSON arrays.
+
+    Yields (keys, body) where body is the UTF-8 JSON array of the batch's
+    entries. A single entry larger than max_bytes still goes out, alone.
+    """
+    keys, parts, size = [], [], 2  # the enclosing []
+    for key, entry in items:
+        encoded = json.dumps(entry, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        extra = len(encoded) + (1 if parts else 0)
+        if parts and (size + extra > max_bytes or len(parts) >= max_count):
+            yield keys, b'[' + b','.join(parts) + b']'
+            keys, parts, size = [], [], 2
+            extra = len(encoded)
+        keys.append(key)
+        parts.append(encoded)
+        size += extra
+    if parts:
+        yield keys, b'[' + b','.join(parts) + b']'
+
+
+def key_name(key):
+    """The college name behind a college_keys() key ('Name#2' -> 'Name')."""
+    name, sep, n = key.rpartition('#')
+    return name if sep and n.isdigit() else key
+
+
+def delete_url_for(url):
+    return url.rstrip('/') + '/delete'
+
+
+def publish(payload, url, headers, state_file, full=False, delete_url=None,
+            max_bytes=DEFAULT_MAX_BATCH_BYTES, max_count=DEFAULT_MAX_BATCH_COLLEGES,
+            retries=5, backoff=1.0, session=None, sleep=time.sleep, dry_run=False, metrics=None):
+    """Send the delta between payload and the last publish to url.
+
+    Returns a summary dict: sent, unchanged, removed, failed_batches.
+    The manifest is saved after each accepted batch.
+
+    The API upserts by name, so repeated names share one server record.
+    A removed 'Name#n' key whose name is still in the payload is not
+    deleted; the remaining colleges under that name are resent instead.
+    """
+    published = load_publish_state(state_file, url)
+    changed, removed, hashes = plan_delta(payload, {} if full else published)
+    if full:
+        removed = sorted(k for k in published if k not in hashes)
+    present = {college.get('name') or '' for college in payload}
+    folded = {}
+    for key in removed:
+        if key_name(key) in present:
+            folded.setdefault(key_name(key), []).append(key)
+    if folded:
+        queued = {key for key, _ in changed}
+        changed += [(key, college) for key, college in zip(college_keys(payload), payload)
+                    if (college.get('name') or '') in folded and key not in queued]
+    names = sorted({key_name(k) for k in removed} - folded.keys())
+    summary = {
+        'sent': 0,
+        'unchanged': len(payload) - len(changed),
+        'removed': 0,
+        'failed_batches': 0,
+    }
+    batches = list(make_batches(changed, max_bytes, max_count))
+    print(f"{len(changed)} changed, {summary['unchanged']} unchanged, "
+          f"{len(removed)} removed -> {len(batches)} batch(es)")
+    if dry_run:
+        for keys, body in batches:
+            print(f"  batch of {len(keys)} ({len(body)} bytes): {', '.join(keys)}")
+        if names:
+            print(f"  delete: {', '.join(names)}")
+        return summary
+
+    for n, (keys, body) in enumerate(batches, 1):
+        try:
+            post_with_retries(url, body, headers, retries, backoff, session, sleep, metrics)
+        except RuntimeError:
+            summary['failed_batches'] += 1
+            print(f"[FAIL] batch {n}/{len(batches)} ({len(keys)} colleges)")
+            continue
+        for key in keys:
+            published[key] = hashes[key]
+            for stale in folded.pop(key_name(key), ()):
+                published.pop(stale, None)
+                summary['removed'] += 1
+        summary['sent'] += len(keys)
+        save_publish_state(state_file, url, published)
+        print(f"[OK] batch {n}/{len(batches)} ({len(keys)} colleges, {len(body)} bytes)")
+
+    if names and delete_url:
+        try:
+            post_with_retries(delete_url, names, headers, retries, backoff, session, sleep, metrics)
+        except RuntimeError:
+            summary['failed_batches'] += 1
+            print(f"[FAIL] delete of {len(names)} colleges")
+        else:
+            for key in removed:
+                if key_name(key) in names:
+                    published.pop(key, None)
+                    summary['removed'] += 1
+            save_publish_state(state_file, url, published)
+            print(f"[OK] deleted {len(names)} colleges")
+    return summary
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument('--url', required=True, help='Bulk API URL')
     parser.add_argument('--token', required=False, help='API token for X-Api-Token header')
     parser.add_argument('--file', default='Scripts/ui_payload.json', help='Path to ui_payload.json')
-    args = parser.parse_args()
+    parser.add_argument('--state', help='Publish manifest (default: <file>.publish.json)')
+    parser.add_argument('--full', action='store_true', help='Ignore the manifest and send every college')
+    parser.add_argument('--no-delete', action='store_true', help='Do not remove colleges missing from the payload')
+    parser.add_argument('--delete-url', help='Delete endpoint (default: <url>/delete)')
+    parser.add_argument('--max-batch-bytes', type=int, default=DEFAULT_MAX_BATCH_BYTES)
+    parser.add_argument('--max-batch-colleges', type=int, default=DEFAULT_MAX_BATCH_COLLEGES)
+    parser.add_argument('--dry-run', action='store_true', help='Print the plan without sending anything')
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
 
     with open(args.file, 'r', encoding='utf-8') as f:
         payload = json.load(f)
@@ -37,9 +247,21 @@ def main():
     if args.token:
         headers['X-Api-Token'] = args.token
 
-    resp = post_with_retries(args.url, payload, headers)
-    print('Success:', resp.status_code, resp.text)
+    delete_url = None if args.no_delete else (args.delete_url or delete_url_for(args.url))
+    metrics = metrics_from_args(args, 'publish')
+    try:
+        summary = publish(payload, args.url, headers, args.state or publish_state_path(args.file),
+                          full=args.full, delete_url=delete_url,
+                          max_bytes=args.max_batch_bytes, max_count=args.max_batch_colleges,
+                          dry_run=args.dry_run, metrics=metrics)
+    except BaseException:
+        metrics.close(ok=False)
+        raise
+    metrics.close(ok=not summary['failed_batches'])
+    print(f"Sent {summary['sent']}, unchanged {summary['unchanged']}, "
+          f"removed {summary['removed']}, failed batches {summary['failed_batches']}")
+    return 1 if summary['failed_batches'] else 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Adaptive re-scrape schedule.
+
+Each scraped URL gets a hash of the resources extracted from it and a
+re-scrape interval. When a re-scrape finds the same resources, the
+interval doubles, up to MAX_INTERVAL. When they changed, it halves, down
+to MIN_INTERVAL. Stable pages therefore drift towards a monthly check
+and volatile ones stay near daily. A failed fetch keeps the interval and
+retries after MIN_INTERVAL.
+
+The state lives in college_targets.schedule.json, next to the targets file.
+
+Usage:
+    schedule = RescrapeSchedule()
+    due, not_due = schedule.split_due(targets)
+    schedule.observe(url, resources)     # after scraping url
+    schedule.save()
+"""
+
+import hashlib
+import json
+import os
+import time
+
+SCHEDULE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'college_targets.schedule.json')
+SCHEDULE_VERSION = 1
+DAY = 24 * 3600
+MIN_INTERVAL = DAY
+MAX_INTERVAL = 30 * DAY
+BACKOFF_FACTOR = 2.0
+
+
+def resources_hash(resources):
+    """Order-insensitive hash of extracted resources."""
+    blobs = sorted(json.dumps(r, sort_keys=True, ensure_ascii=False) for r in resources)
+    return hashlib.sha256('\n'.join(blobs).encode('utf-8')).hexdigest()
+
+
+def schedule_keys(college, crawl=False):
+    """URLs the schedule tracks for a target: its seeds, or its website when crawling."""
+    if crawl:
+        return [college.get('website') or college['name']]
+    return list(college.get('mental_health_urls', [])) or [college.get('website') or college['name']]
+
+
+class RescrapeSchedule:
+    def __init__(self, path=SCHEDULE_FILE, clock=time.time,
+                 min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        self.path = path
+        self.clock = clock
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.urls = {}  # url -> {hash, interval, last_checked, last_changed, next_due, changes, checks}
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == SCHEDULE_VERSION:
+                self.urls = data.get('urls', {})
+
+    def is_due(self, url, now=None):
+        entry = self.urls.get(url)
+        if entry is None:
+            return True
+        return entry['next_due'] <= (self.clock() if now is None else now)
+
+    def target_due(self, college, crawl=False, now=None):
+        """A target is due when any of its tracked URLs is."""
+        now = self.clock() if now is None else now
+        return any(self.is_due(url, now) for url in schedule_keys(college, crawl))
+
+    def split_due(self, colleges, crawl=False):
+        """Partition targets into (due, not_due), keeping their order."""
+        now = self.clock()
+        due, not_due = [], []
+        for college in colleges:
+            (due if self.target_due(college, crawl, now) else not_due).append(college)
+        return due, not_due
+
+    def observe(self, url, resources, now=None):
+        """Record a successful scrape of url; returns True if its resources changed."""
+        now = self.clock() if now is None else now
+        digest = resources_hash(resources)
+        entry = self.urls.get(url)
+        if entry is None:
+            entry = {'hash': digest, 'interval': self.min_interval, 'last_changed': now,
+                     'changes': 0, 'checks': 0}
+            changed = True
+        elif entry['hash'] != digest:
+            entry['hash'] = digest
+            entry['interval'] = max(self.min_interval, entry['interval'] / BACKOFF_FACTOR)
+            entry['last_changed'] = now
+            entry['changes'] += 1
+            changed = True
+        else:
+            entry['interval'] = min(self.max_interval, entry['interval'] * BACKOFF_FACTOR)
+            changed = False
+        entry['checks'] += 1
+        entry['last_checked'] = now
+        entry['next_due'] = now + entry['interval']
+        self.urls[url] = entry
+        self.dirty = True
+        return changed
+
+    def observe_failure(self, url, now=None):
+        """A failed fetch says nothing about change: retry soon, keep the interval."""
+        now = self.clock() if now is None else now
+        entry = self.urls.get(url)
+        if entry is None:
+            return  # never scraped; it stays due
+        entry['last_checked'] = now
+        entry['next_due'] = now + self.min_interval
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty or not self.path:
+            return False
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': SCHEDULE_VERSION, 'urls': self.urls}, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.dirty = False
+        return True
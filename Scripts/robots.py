@@ -0,0 +1,125 @@
+"""
+robots.txt cache used by Fetcher.
+
+Fetches and parses robots.txt once per host (scheme + netloc), keeps the
+rules for a TTL, and exposes per-URL allow checks and per-host Crawl-delay.
+
+Rules are matched on the product token ("MentalHealthScraper"), not on
+the full User-Agent header. RobotFileParser only looks at the text before
+the first '/', which for "Mozilla/5.0 (compatible; ...)" is "Mozilla".
+
+Given the Fetcher's HostHealth and slot wait, robots.txt requests use the
+same per-host breaker and scheduling as page requests, so a dead host is
+not asked again every time its rules expire.
+"""
+
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_ROBOTS_TTL = 24 * 60 * 60   # Re-fetch rules once a day
+ERROR_ROBOTS_TTL = 10 * 60          # Retry sooner when robots.txt was unreachable
+MAX_CRAWL_DELAY = 60                # Never let one host stall a run for longer
+ROBOTS_TIMEOUT = 10
+
+
+def product_token(user_agent):
+    """The robots.txt name in a User-Agent: the 'compatible;' product, else the first one."""
+    if not user_agent:
+        return '*'
+    compatible = re.search(r'compatible;\s*([^/;\s)]+)', user_agent)
+    if compatible:
+        return compatible.group(1)
+    return user_agent.split('/', 1)[0].split()[0]
+
+
+def host_key(url):
+    """Return 'scheme://netloc' for url, the unit robots.txt applies to."""
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+class RobotsCache:
+    def __init__(self, session, user_agent='*', ttl=DEFAULT_ROBOTS_TTL, clock=time.monotonic,
+                 health=None, wait=None):
+        self.session = session
+        self.user_agent = product_token(user_agent)
+        self.ttl = ttl
+        self.clock = clock
+        # Optional HostHealth and wait(url) from the Fetcher that owns this cache
+        self.health = health
+        self.wait = wait
+        self._rules = {}  # host -> (RobotFileParser, expires_at)
+        self._lock = threading.Lock()
+
+    def rules_for(self, url):
+        """Return the parsed rules for url's host, fetching them if stale."""
+        host = host_key(url)
+        now = self.clock()
+        with self._lock:
+            cached = self._rules.get(host)
+            if cached and cached[1] > now:
+                return cached[0]
+        parser, ttl = self._fetch(host)
+        with self._lock:
+            self._rules[host] = (parser, now + ttl)
+        return parser
+
+    def _fetch(self, host):
+        # urllib.robotparser pulls in urllib.request and http.client; load it on the first host
+        from urllib.robotparser import RobotFileParser
+
+        parser = RobotFileParser(f"{host}/robots.txt")
+        if self.health is not None and not self.health.allow(host):
+            # Circuit open: the page fetch will be refused anyway
+            parser.allow_all = True
+            return parser, ERROR_ROBOTS_TTL
+        timeout = ROBOTS_TIMEOUT
+        if self.health is not None:
+            connect, read = self.health.timeout(host)
+            timeout = (connect, min(read, ROBOTS_TIMEOUT))
+        if self.wait is not None:
+            self.wait(f"{host}/robots.txt")
+        started = self.clock()
+        try:
+            resp = self.session.get(f"{host}/robots.txt", timeout=timeout)
+        except Exception as e:
+            if self.health is not None:
+                self.health.record_failure(host, f'robots.txt: {type(e).__name__}')
+            parser.allow_all = True
+            return parser, ERROR_ROBOTS_TTL
+
+        if self.health is not None:
+            if resp.status_code >= 500 or resp.status_code == 429:
+                self.health.record_failure(host, f'robots.txt: HTTP {resp.status_code}')
+            else:
+                self.health.record_success(host, self.clock() - started)
+        # Same conventions as RobotFileParser.read()
+        if resp.status_code in (401, 403):
+            parser.disallow_all = True
+        elif 400 <= resp.status_code < 500:
+            parser.allow_all = True
+        elif resp.status_code >= 500:
+            parser.allow_all = True
+            return parser, ERROR_ROBOTS_TTL
+        else:
+            parser.parse(resp.text.splitlines())
+        parser.modified()
+        return parser, self.ttl
+
+    def allowed(self, url):
+        """True if robots.txt lets our user agent fetch url."""
+        return self.rules_for(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        """Crawl-delay (seconds) for url's host, or None if unspecified."""
+        parser = self.rules_for(url)
+        delay = parser.crawl_delay(self.user_agent)
+        if delay is None:
+            rate = parser.request_rate(self.user_agent)
+            if rate and rate.requests:
+                delay = rate.seconds / rate.requests
+        if delay is None:
+            return None
+        return min(float(delay), MAX_CRAWL_DELAY)
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
-from simple_scraper import CollegeScraper, BeautifulSoup
+from _html_compat import BeautifulSoup
+from simple_scraper import CollegeScraper
 import sys
 
 
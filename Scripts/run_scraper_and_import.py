@@ -1,6 +1,10 @@
 """
 Automated Script: Scrape and Import College Mental Health Data
 Runs the entire pipeline: Scrape → Save JSON → Import to Database
+
+Interactive walk-through. For cron or CI use the non-interactive runner,
+which also reports per-stage timings:
+    python mhdb.py pipeline
 """
 
 import sys
@@ -41,10 +45,10 @@ def run_scraper():
         from simple_scraper import SimpleCollegeScraper
         
         scraper = SimpleCollegeScraper()
-        data = scraper.scrape_all_colleges()
+        data = scraper.scrape_all()
         
         if data:
-            scraper.save_to_json('scraped_colleges_data.json')
+            scraper.save_results()
             print(f"\n✅ Successfully scraped {len(data)} colleges")
             return True
         else:
@@ -120,7 +124,7 @@ def import_to_database():
         print("   cd ..")
         print("   dotnet run")
         print("\nThen run this script again, or manually import with:")
-        print("   python -c \"from data_importer import DataImporter; DataImporter().import_colleges_from_json('scraped_colleges_data.json')\"")
+        print("   python importer.py --file scraped_colleges_data.json")
         return False
     
     print("✅ API is running\n")
@@ -206,7 +210,7 @@ def main():
     else:
         print("\nImport skipped. Data saved in scraped_colleges_data.json")
         print("To import later, run:")
-        print("   python data_importer.py")
+        print("   python importer.py")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,350 @@
+"""
+Offline full-text search over the UI resource cards.
+
+Tokenizes each card's service name, description, office hours and freshman
+notes from ui_payload.json into an inverted index and writes it next to the
+payload as ui_payload.search.json (plus .gz/.br copies). The file stores, per
+term, the cards containing it as (doc, term frequency) pairs sorted by their
+BM25 weight under the default K1 and B, and each card's length, so k1 and b
+can still be tuned at query time (other values re-sort a term on first use).
+
+search() reads the lists best-first, in growing batches (the threshold
+algorithm), weighing only the postings it reads, and stops once the k-th
+best score beats anything the unread postings could add up to. Measured on
+a synthetic 100k-card payload (5,000 colleges x 20 cards, each common word
+in about half the cards), Python 3.11 on one CPU:
+
+    query                               first query   repeated
+    "w12000" (one rare word)                  6 ms     0.02 ms
+    "campus" (one common word)               16 ms     0.02 ms
+    "w5 counseling"                          24 ms        1 ms
+    "counseling support"                     30 ms        2 ms
+    "mental health services students"        95 ms       25 ms
+
+The first query against a loaded index includes about 6 ms to compute the
+per-card length norms. Queries made only of common words have flat scores,
+so most of their postings are read before the top ten are settled.
+
+Usage:
+    python search_index.py build                         # ui_payload.json -> ui_payload.search.json
+    python search_index.py query "walk-in counseling"
+    python search_index.py query "crisis li" --prefix --limit 5
+
+    index = SearchIndex.load()
+    for hit in index.search('peer support'):
+        print(hit['college'], hit['title'], hit['score'])
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import math
+import re
+import sys
+import time
+from itertools import chain, repeat
+from operator import neg
+from pathlib import Path
+
+from prepare_ui_payload import OUTPUT as UI_PAYLOAD, write_variants
+
+INDEX_VERSION = 2
+K1 = 1.2
+B = 0.75
+# Term frequency multiplier per field; a hit in the service name counts double
+FIELD_WEIGHTS = {'service_name': 2, 'description': 1, 'office_hours': 1, 'freshman_notes': 1}
+MAX_PREFIX_TERMS = 20
+MAX_BATCH = 4096  # postings read per list per step, at most
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our that the this to we with you your'.split())
+
+
+def index_path(payload_path=UI_PAYLOAD):
+    """ui_payload.json -> ui_payload.search.json"""
+    payload_path = Path(payload_path)
+    return payload_path.with_name(payload_path.stem + '.search.json')
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall((text or '').lower()) if t not in STOPWORDS]
+
+
+def card_text(card, field):
+    """Text of one indexed field of a UI card."""
+    if field == 'service_name':
+        return card.get('title') or ''
+    if field == 'description':
+        return card.get('description') or ''
+    return (card.get('meta') or {}).get(field) or ''
+
+
+def idf(n_docs, df):
+    return math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+
+def doc_norms(lengths, k1=K1, b=B):
+    """BM25's tf saturation term per card: k1 * (1 - b + b * length / avgdl)."""
+    avgdl = (sum(lengths) / len(lengths)) if lengths else 1.0
+    base = k1 * (1 - b)
+    per_length = k1 * b / avgdl
+    return [base + per_length * length for length in lengths]
+
+
+def term_weights(docs, tfs, idf, norms, k1=K1):
+    """BM25 weight of one term in each of docs (with term frequencies tfs)."""
+    scale = idf * (k1 + 1)
+    return [scale * tf / (tf + norm) for tf, norm in zip(tfs, map(norms.__getitem__, docs))]
+
+
+def build_index(ui):
+    """Build the serializable index for a UI payload (list of college entries).
+
+    Each term's postings are stored best-first by their BM25 weight under
+    the default K1 and B, so a search with those never sorts them.
+    """
+    colleges, docs, lengths, postings = [], [], [], {}
+    for college_index, entry in enumerate(ui):
+        colleges.append(entry.get('name'))
+        for card_index, card in enumerate(entry.get('cards', [])):
+            doc = len(docs)
+            freqs = {}
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(card_text(card, field)):
+                    freqs[token] = freqs.get(token, 0) + weight
+            docs.append([college_index, card_index, card.get('title') or ''])
+            lengths.append(sum(freqs.values()))
+            for token, tf in freqs.items():
+                postings.setdefault(token, []).append((doc, tf))
+
+    terms = {}
+    norms = doc_norms(lengths)
+    for token in sorted(postings):
+        ids, tfs = zip(*postings[token])
+        weights = term_weights(ids, tfs, idf(len(lengths), len(ids)), norms)
+        order = sorted(range(len(ids)), key=weights.__getitem__, reverse=True)
+        terms[token] = [x for i in order for x in (ids[i], tfs[i])]
+    return {
+        'version': INDEX_VERSION,
+        'k1': K1,
+        'b': B,
+        'fields': FIELD_WEIGHTS,
+        'colleges': colleges,
+        'docs': docs,
+        'lengths': lengths,
+        'terms': terms,
+    }
+
+
+def write_index(index, path, use_brotli=True):
+    """Write the index and its precompressed copies; returns write_variants' file info."""
+    data = json.dumps(index, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return write_variants(path, data, use_brotli)
+
+
+class _Postings:
+    """One term's postings, best first, weighted as search reads them."""
+
+    __slots__ = ('docs', 'tfs', 'tf_of', 'scale', 'norms', 'weights')
+
+    def __init__(self, docs, tfs, scale, norms):
+        self.docs = docs
+        self.tfs = tfs
+        self.tf_of = dict(zip(docs, tfs))
+        self.scale = scale
+        self.norms = norms
+        self.weights = {}  # doc -> BM25 weight, for the docs scored so far
+
+    def __len__(self):
+        return len(self.docs)
+
+    def weight_at(self, i):
+        """Weight of the i-th best posting."""
+        tf = self.tfs[i]
+        return self.scale * tf / (tf + self.norms[self.docs[i]])
+
+    def weigh(self, docs):
+        """Weigh those of docs that contain the term; returns {doc: weight}."""
+        weights, scale, norms, tf_of = self.weights, self.scale, self.norms, self.tf_of
+        new = (tf_of.keys() & docs).difference(weights)
+        if new:
+            weights.update((doc, scale * tf_of[doc] / (tf_of[doc] + norms[doc])) for doc in new)
+        return weights
+
+
+def _merge_top(lists, docs, top, limit):
+    """Score docs against every query term and keep the best limit of them and top."""
+    if not docs:
+        return top
+    docs = list(docs)
+    columns = [map(postings.weigh(docs).get, docs, repeat(0.0)) for postings in lists]
+    return heapq.nlargest(limit, chain(top, zip(map(sum, zip(*columns)), map(neg, docs))))
+
+
+class SearchIndex:
+    def __init__(self, data, k1=K1, b=B):
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version: {data.get('version')}")
+        self.colleges = data['colleges']
+        self.docs = data['docs']
+        self.lengths = data['lengths']
+        self.k1 = k1
+        self.b = b
+        self._postings = data['terms']
+        self._presorted = (data['k1'], data['b']) == (k1, b)
+        self._norms = None
+        self._vocab = sorted(self._postings)
+        self._scored = {}  # term -> _Postings
+
+    @classmethod
+    def load(cls, path=None, **kwargs):
+        path = Path(path) if path else index_path()
+        return cls(json.loads(path.read_text(encoding='utf-8')), **kwargs)
+
+    @classmethod
+    def from_payload(cls, ui, **kwargs):
+        return cls(build_index(ui), **kwargs)
+
+    def __len__(self):
+        return len(self.docs)
+
+    def _term(self, term):
+        """The term's postings, set up on first use."""
+        scored = self._scored.get(term)
+        if scored is None:
+            flat = self._postings.get(term)
+            if not flat:
+                return None
+            if self._norms is None:
+                self._norms = doc_norms(self.lengths, self.k1, self.b)
+            docs, tfs = flat[0::2], flat[1::2]
+            term_idf = idf(len(self.docs), len(docs))
+            if not self._presorted:
+                # Stored best-first for other k1 and b: weigh and sort them all once
+                weights = term_weights(docs, tfs, term_idf, self._norms, self.k1)
+                order = sorted(range(len(docs)), key=weights.__getitem__, reverse=True)
+                docs, tfs = [docs[i] for i in order], [tfs[i] for i in order]
+            scored = self._scored[term] = _Postings(docs, tfs, term_idf * (self.k1 + 1), self._norms)
+        return scored
+
+    def expand(self, prefix, limit=MAX_PREFIX_TERMS):
+        """Indexed terms starting with prefix, shortest first."""
+        start = bisect.bisect_left(self._vocab, prefix)
+        matches = []
+        for term in self._vocab[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        return sorted(matches, key=len)[:limit]
+
+    def query_terms(self, query, prefix=False):
+        """Distinct query terms; with prefix the last word also matches longer terms."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if prefix and terms and not query[-1:].isspace():
+            last = terms.pop()
+            terms.extend(t for t in self.expand(last) if t not in terms)
+        return terms
+
+    def search(self, query, limit=10, prefix=False):
+        """Top cards for query by BM25 score.
+
+        Returns [{college, college_index, card, title, score}], best first.
+        """
+        lists = [s for s in map(self._term, self.query_terms(query, prefix)) if s]
+        if not lists or limit <= 0:
+            return []
+        top, seen = [], set()  # top: up to limit (score, -doc), best first
+        best = [postings.weight_at(0) for postings in lists]
+        longest = max(map(len, lists))
+        depth, step = 0, limit
+        while depth < longest:
+            end = depth + step
+            batch, threshold = set(), 0.0
+            for postings in lists:
+                batch.update(postings.docs[depth:end])
+                if end < len(postings):
+                    threshold += postings.weight_at(end)
+            batch -= seen
+            seen |= batch
+            top = _merge_top(lists, batch, top, limit)
+            if len(top) == limit:
+                kth = top[-1][0]
+                # Every unread card scores at most the sum of the next weight in each list
+                if kth >= threshold:
+                    break
+                # A card missing from every list whose max weights add up past kth cannot
+                # make the top either; once those lists' unread tails are short, score them all
+                tails, bound = [], 0.0
+                for postings, w in sorted(zip(lists, best), key=lambda item: item[1]):
+                    bound += w
+                    if bound > kth:
+                        tails.append(postings.docs[end:])
+                if sum(map(len, tails)) <= 2 * step * len(lists):
+                    top = _merge_top(lists, set(chain.from_iterable(tails)) - seen, top, limit)
+                    break
+            depth, step = end, min(step * 2, MAX_BATCH)
+        return [self._hit(-neg_doc, score) for score, neg_doc in top]
+
+    def _hit(self, doc, score):
+        college_index, card_index, title = self.docs[doc]
+        return {
+            'college': self.colleges[college_index],
+            'college_index': college_index,
+            'card': card_index,
+            'title': title,
+            'score': round(score, 4),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or query the resource search index.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('build', help='Index ui_payload.json')
+    p.add_argument('--payload', default=str(UI_PAYLOAD), help='UI payload JSON to index')
+    p.add_argument('--output', help='Index file (default: next to the payload)')
+    p.add_argument('--no-brotli', action='store_true', help='Skip the .br variant')
+
+    p = sub.add_parser('query', help='Search the index')
+    p.add_argument('query')
+    p.add_argument('--index', help='Index file (default: ui_payload.search.json)')
+    p.add_argument('--limit', type=int, default=10)
+    p.add_argument('--prefix', action='store_true', help='Treat the last word as a prefix')
+    p.add_argument('--json', action='store_true', help='Print hits as JSON')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        payload = Path(args.payload)
+        if not payload.exists():
+            print('No UI payload found at', payload)
+            return 1
+        ui = json.loads(payload.read_text(encoding='utf-8'))
+        index = build_index(ui)
+        output = Path(args.output) if args.output else index_path(payload)
+        files = write_index(index, output, use_brotli=not args.no_brotli)
+        print(f"[OK] Indexed {len(index['docs'])} card(s), {len(index['terms'])} term(s)")
+        for enc, info in files.items():
+            print(f"  {enc:8} {info['bytes']:>9,} bytes  {info['path']}")
+        return 0
+
+    path = Path(args.index) if args.index else index_path()
+    if not path.exists():
+        print('No search index found at', path, '- run: python search_index.py build')
+        return 1
+    index = SearchIndex.load(path)
+    start = time.perf_counter()
+    hits = index.search(args.query, args.limit, args.prefix)
+    elapsed = (time.perf_counter() - start) * 1000
+    if args.json:
+        print(json.dumps(hits, indent=2, ensure_ascii=False))
+        return 0
+    for hit in hits:
+        print(f"{hit['score']:8.3f}  {hit['college']} - {hit['title']}")
+    print(f"{len(hits)} hit(s) in {elapsed:.2f} ms over {len(index):,} card(s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
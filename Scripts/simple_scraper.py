@@ -3,12 +3,9 @@ College Mental Health Resource Scraper
 Reads targets from college_targets.json and scrapes mental health service pages.
 """
 
-import requests
-from _html_compat import BeautifulSoup  # noqa: F401
-
+import argparse
 import re
 import json
-import time
 import os
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
@@ -16,7 +13,14 @@ from fetcher import Fetcher
 from parser import Parser
 from scorer import Scorer
 from normalizer import Normalizer
+from metrics import RunMetrics, add_metrics_arguments, metrics_from_args
 from persistence import Persistence
+from profiling import add_profile_arguments, profiler_from_args
+from page_archive import PageArchive, RecordingFetcher, ReplayFetcher
+from staging_store import StagingFetcher, StagingStore
+from target_registry import TargetRegistry
+from rescrape_schedule import RescrapeSchedule, schedule_keys
+from crawler import CrawlFrontier, extract_links, score_link, DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES
 from keywords import MENTAL_HEALTH_KEYWORDS, NON_MENTAL_KEYWORDS
 
 # Configuration
@@ -56,29 +60,63 @@ GARBAGE_KEYWORDS = [
 
 
 class CollegeScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (compatible; MentalHealthScraper/1.0)',
-        })
-        self.session.timeout = 15
+    def __init__(self, crawl=False, max_depth=DEFAULT_MAX_DEPTH, max_pages=DEFAULT_MAX_PAGES, fetcher=None,
+                 registry=None, schedule=None, metrics=None):
+        # requests and bs4 are imported on first use, so building a scraper
+        # (tests, --help, replays with a fake fetcher) stays cheap
+        self._session = None
+        self._fetcher = fetcher
         self.colleges_data = []
         self.stats = {
             'total': 0,
             'success': 0,
             'failed': 0,
             'skipped': 0,
-            'low_quality': 0
+            'low_quality': 0,
+            'robots_skipped': 0,
+            'not_due': 0
         }
         # Components
-        self.fetcher = Fetcher(self.session)
         self.parser = Parser()
         self.scorer = Scorer(MIN_QUALITY_SCORE)
         self.normalizer = Normalizer()
         self.persistence = Persistence(OUTPUT_FILE)
+        # Crawl mode: discover pages from website + seeds instead of only the seeds
+        self.crawl = crawl
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        # Optional TargetRegistry: source of targets and sink for per-URL fetch status
+        self.registry = registry
+        # Optional RescrapeSchedule: only targets that are due get scraped
+        self.schedule = schedule
+        # Prometheus counters; shared with the Fetcher built below
+        self.metrics = metrics or RunMetrics()
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (compatible; MentalHealthScraper/1.0)',
+            })
+            self._session.timeout = 15
+        return self._session
+
+    @property
+    def fetcher(self):
+        if self._fetcher is None:
+            self._fetcher = Fetcher(self.session, metrics=self.metrics)
+        return self._fetcher
+
+    @fetcher.setter
+    def fetcher(self, fetcher):
+        self._fetcher = fetcher
 
     def load_targets(self):
-        """Load college targets from JSON file."""
+        """Load college targets from the registry, or from the JSON file."""
+        if self.registry is not None:
+            return self.registry.targets()
         with open(TARGETS_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
         return data['colleges']
@@ -93,7 +131,14 @@ class CollegeScraper:
 
     def fetch_page(self, url):
         """Fetch a page with error handling."""
-        return self.fetcher.fetch(url)
+        response = self.fetcher.fetch(url)
+        error = getattr(self.fetcher, 'last_error', '')
+        if response is None and error:
+            print(f"  [SKIP] {url}: {error}")
+        if self.registry is not None and self.registry.tracks(url):
+            self.registry.record_url(url, response is not None,
+                                     getattr(response, 'status_code', None), error)
+        return response
 
     def score_content(self, soup, text):
         """Score content quality (0-100)."""
@@ -352,6 +397,7 @@ class CollegeScraper:
             name = resource.get('service_name', '').lower().strip()
             if name and name not in unique:
                 unique[name] = resource
+        self.metrics.resources_filtered.inc(len(resources) - len(unique), reason='duplicate')
         return list(unique.values())
 
 
@@ -368,27 +414,37 @@ class CollegeScraper:
                 filtered.append(resource)
             else:
                 self.stats['low_quality'] += 1
+                self.metrics.resources_filtered.inc(reason='low_quality')
         return filtered
 
     def scrape_college(self, college):
         """Scrape mental health resources for a single college."""
-        all_resources = []
-        urls = college.get('mental_health_urls', [])
-
-        for url in urls:
-            if not self.is_valid_url(url):
-                continue
-
-            response = self.fetch_page(url)
-            if not response:
-                continue
+        if isinstance(self.fetcher, StagingFetcher):
+            self.fetcher.college = college['name']
+        if self.crawl:
+            all_resources = self.crawl_college(college)
+        else:
+            all_resources = []
+            urls = college.get('mental_health_urls', [])
+
+            for url in urls:
+                if not self.is_valid_url(url):
+                    continue
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            resources = self.extract_resources(soup, url)
-            all_resources.extend(resources)
+                response = self.fetch_page(url)
+                if not response:
+                    if self.schedule is not None:
+                        self.schedule.observe_failure(url)
+                    continue
 
-            # Rate limiting
-            time.sleep(1)
+                soup = self.parser.parse(response.content)
+                resources = self.extract_resources(soup, url)
+                self.metrics.pages_parsed.inc()
+                self.metrics.resources_extracted.inc(len(resources))
+                all_resources.extend(resources)
+                if self.schedule is not None:
+                    self.schedule.observe(url, resources)
+                # Rate limiting is per host inside Fetcher (robots Crawl-delay aware)
 
         # Deduplicate
         unique_resources = self.deduplicate_resources(all_resources)
@@ -396,13 +452,68 @@ class CollegeScraper:
         # Filter low quality
         unique_resources = self.filter_low_quality(unique_resources)
 
+        if self.crawl and self.schedule is not None:
+            self.schedule.observe(schedule_keys(college, crawl=True)[0], unique_resources)
+
         return unique_resources
 
-    def scrape_all(self):
-        """Scrape all target colleges."""
-        colleges = self.load_targets()
+    def crawl_college(self, college):
+        """Crawl same-site links from the website and seed URLs, best-first."""
+        all_resources = []
+        frontier = CrawlFrontier.for_college(
+            college, max_depth=self.max_depth, max_pages=self.max_pages)
+
+        while True:
+            item = frontier.pop()
+            if item is None:
+                break
+            url, depth = item
+
+            response = self.fetch_page(url)
+            if not response:
+                continue
+            final_url = getattr(response, 'url', None) or url
+            frontier.mark_visited(final_url)
+
+            soup = self.parser.parse(response.content)
+            # Collect links before extract_resources() strips nav/header/footer
+            if depth < self.max_depth:
+                for link, anchor in extract_links(soup, final_url):
+                    frontier.add(link, depth + 1, score_link(link, anchor))
+
+            resources = self.extract_resources(soup, final_url)
+            self.metrics.pages_parsed.inc()
+            self.metrics.resources_extracted.inc(len(resources))
+            all_resources.extend(resources)
+
+        return all_resources
+
+    def college_record(self, college, resources):
+        """Output entry for a scraped target."""
+        return {
+            "name": college['name'],
+            "location": college['location'],
+            "latitude": college['latitude'],
+            "longitude": college['longitude'],
+            "website": college['website'],
+            "resources": resources,
+            "scraped_at": datetime.now().isoformat()
+        }
+
+    def scrape_all(self, colleges=None):
+        """Scrape all target colleges (or just the given targets)."""
+        if colleges is None:
+            colleges = self.load_targets()
         self.stats['total'] = len(colleges)
 
+        not_due = set()
+        previous = {}
+        if self.schedule is not None:
+            due, waiting = self.schedule.split_due(colleges, self.crawl)
+            not_due = {c['name'] for c in waiting}
+            previous = self.load_previous_results()
+            print(f"Schedule: {len(due)} due, {len(waiting)} not due yet")
+
         print(f"Starting scrape of {len(colleges)} colleges...\n")
 
         for i, college in enumerate(colleges, 1):
@@ -410,38 +521,53 @@ class CollegeScraper:
             if college.get('source') == 'manual':
                 print(f"[{i}/{len(colleges)}] {college['name']}: SKIP (manual entry)")
                 self.stats['skipped'] += 1
+                self.metrics.colleges_scraped.inc(outcome='skipped')
+                continue
+
+            # Not due: keep the last results instead of fetching again (if there are any)
+            if college['name'] in not_due and college['name'] in previous:
+                self.stats['not_due'] += 1
+                self.metrics.colleges_scraped.inc(outcome='not_due')
+                self.colleges_data.append(previous[college['name']])
                 continue
 
             print(f"[{i}/{len(colleges)}] Scraping {college['name']} ({college.get('state', 'unknown')})...")
 
             resources = self.scrape_college(college)
-
-            college_data = {
-                "name": college['name'],
-                "location": college['location'],
-                "latitude": college['latitude'],
-                "longitude": college['longitude'],
-                "website": college['website'],
-                "resources": resources,
-                "scraped_at": datetime.now().isoformat()
-            }
+            college_data = self.college_record(college, resources)
 
             if resources:
                 self.colleges_data.append(college_data)
                 print(f"  [OK] Found {len(resources)} resource(s)")
                 self.stats['success'] += 1
+                self.metrics.colleges_scraped.inc(outcome='success')
             else:
                 print(f"  [FAIL] No resources found")
                 self.stats['failed'] += 1
+                self.metrics.colleges_scraped.inc(outcome='failed')
 
-            time.sleep(1)  # Rate limiting between colleges
-
+        self.stats['robots_skipped'] = getattr(self.fetcher, 'skipped_by_robots', 0)
         return self.colleges_data
 
-    def save_results(self):
-        """Save scraped data to JSON file."""
-        self.persistence.save(self.colleges_data)
-        print(f"\n[OK] Saved {len(self.colleges_data)} colleges to {OUTPUT_FILE}")
+    def load_previous_results(self):
+        """Last saved results by college name (empty if there are none)."""
+        if not os.path.exists(OUTPUT_FILE):
+            return {}
+        with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
+            return {c['name']: c for c in json.load(f)}
+
+    def save_results(self, merge=False):
+        """Save scraped data to JSON file.
+
+        With merge, colleges in the last saved results that this run did
+        not scrape are kept, so a partial run only replaces its own colleges.
+        """
+        if merge:
+            data = self.persistence.merge(self.colleges_data)
+        else:
+            data = self.colleges_data
+            self.persistence.save(data)
+        print(f"\n[OK] Saved {len(data)} colleges to {OUTPUT_FILE}")
 
     def print_stats(self):
         """Print scraping statistics."""
@@ -453,27 +579,101 @@ class CollegeScraper:
         print(f"Failed:            {self.stats['failed']}")
         print(f"Skipped (manual):  {self.stats['skipped']}")
         print(f"Low quality filtered: {self.stats['low_quality']}")
+        print(f"Blocked by robots.txt: {self.stats['robots_skipped']}")
+        if self.schedule is not None:
+            print(f"Not due (kept previous): {self.stats['not_due']}")
+        errors = getattr(self.fetcher, 'errors', {})
+        if errors:
+            print("Fetch failures:    " + ", ".join(f"{k}={v}" for k, v in sorted(errors.items())))
+        health = getattr(self.fetcher, 'health', None)
+        if health and health.open_hosts():
+            print("Circuit open:      " + ", ".join(health.open_hosts()))
         print("="*50)
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape college mental health resources.")
+    parser.add_argument("--crawl", action="store_true",
+                        help="Discover pages from each website and seed URL instead of only the seeds")
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MAX_DEPTH,
+                        help=f"Crawl mode: maximum link depth from a seed (default: {DEFAULT_MAX_DEPTH})")
+    parser.add_argument("--max-pages", type=int, default=DEFAULT_MAX_PAGES,
+                        help=f"Crawl mode: page budget per college (default: {DEFAULT_MAX_PAGES})")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Archive every fetched page into DIR for later --replay")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="Serve pages from an archive recorded with --record (no network)")
+    parser.add_argument("--failing-only", action="store_true",
+                        help="Only scrape targets whose seed URLs failed on their last fetch")
+    parser.add_argument("--ignore-schedule", action="store_true",
+                        help="Scrape every target, not just the ones the re-scrape schedule says are due")
+    parser.add_argument("--stage", metavar="DB",
+                        help="Also log fetches and upsert scraped colleges into this staging database")
+    add_profile_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.record and args.replay:
+        parser.error("--record and --replay are mutually exclusive")
+    profiler = profiler_from_args(args, "simple_scraper")
+    metrics = metrics_from_args(args, "scraper")
+
     print("="*60)
     print("College Mental Health Resource Scraper")
     print("="*60)
     print(f"Targets: {TARGETS_FILE}")
     print(f"Output:  {OUTPUT_FILE}")
+    if args.crawl:
+        print(f"Mode:    crawl (depth {args.max_depth}, {args.max_pages} pages/college)")
+    if args.record or args.replay:
+        print(f"Archive: {args.record or args.replay} ({'record' if args.record else 'replay'})")
     print("="*60 + "\n")
 
-    scraper = CollegeScraper()
-    data = scraper.scrape_all()
-
-    if data:
-        scraper.save_results()
-        scraper.print_stats()
-        print(f"\n[OK] Complete! Scraped {len(data)} colleges.")
-    else:
-        print("\n[FAIL] No data collected. Check URLs and try again.")
-
+    archive = PageArchive(args.record or args.replay) if (args.record or args.replay) else None
+    registry = TargetRegistry(TARGETS_FILE)
+    scraper = CollegeScraper(crawl=args.crawl, max_depth=args.max_depth, max_pages=args.max_pages,
+                             fetcher=ReplayFetcher(archive) if args.replay else None,
+                             registry=registry, metrics=metrics)
+    # Replays must not move the live schedule; targeted re-runs bypass it too
+    if not (args.replay or args.ignore_schedule or args.failing_only):
+        scraper.schedule = RescrapeSchedule()
+    if args.record:
+        scraper.fetcher = RecordingFetcher(scraper.fetcher, archive)
+    store = StagingStore(args.stage) if args.stage else None
+    if store:
+        scraper.fetcher = StagingFetcher(scraper.fetcher, store)
+    targets = registry.failing_targets() if args.failing_only else None
+    if targets is not None:
+        print(f"Re-scraping {len(targets)} target(s) with failing URLs\n")
+    profiler.wrap_extract(scraper)
+    ok = False
+    try:
+        try:
+            with profiler.stage("scrape"):
+                data = scraper.scrape_all(targets)
+        finally:
+            if args.record:
+                archive.close()
+            if not args.replay:
+                registry.save()
+            if scraper.schedule is not None:
+                scraper.schedule.save()
+
+        if data:
+            with profiler.stage("save"):
+                scraper.save_results(merge=args.failing_only)
+                if store:
+                    store.upsert_colleges(data)
+                    print(f"[OK] Staged {len(data)} colleges in {args.stage}")
+            scraper.print_stats()
+            print(f"\n[OK] Complete! Scraped {len(data)} colleges.")
+        else:
+            print("\n[FAIL] No data collected. Check URLs and try again.")
+        ok = bool(data)
+    finally:
+        if store:
+            store.close()
+        profiler.close()
+        metrics.close(ok=ok)
 
 if __name__ == "__main__":
     main()
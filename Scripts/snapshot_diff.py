@@ -0,0 +1,224 @@
+"""
+Diff two scrape snapshots: added, removed and changed colleges and resources.
+
+Both snapshots are read as streams, either a JSON array (the usual
+scraped_colleges_data.json) or NDJSON with one college per line, so
+neither file is ever loaded whole. Colleges are keyed by name, and
+resources by service_name, with '#n' appended for repeats, the same way
+prepare_ui_payload.college_keys does it.
+
+The diff takes up to four sequential passes:
+    1. old snapshot -> {key: 16-byte digest}
+    2. new snapshot -> colleges added (emitted right away), keys whose
+       digest differs, and removed (old keys never seen)
+    3. old snapshot -> full records for the changed keys only
+    4. new snapshot -> field-level changes for those keys
+Passes 3 and 4 only run when something changed. Time is linear in the
+two files. Memory is one digest per college plus the changed colleges.
+scraped_at is ignored by default, so an unchanged re-scrape diffs empty.
+
+Every change is one event dict:
+    {"op": "added",   "key": k, "college": {...}}
+    {"op": "removed", "key": k}
+    {"op": "changed", "key": k, "fields": {field: {"old": a, "new": b}},
+     "resources": {"added": [{...}], "removed": [rkey], "changed": {rkey: {field: {"old", "new"}}}}}
+
+Usage:
+    python snapshot_diff.py old.json new.json                 # summary
+    python snapshot_diff.py old.json new.ndjson --ndjson      # one event per line
+    python snapshot_diff.py old.json new.json --json -o diff.json
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+
+CHUNK_SIZE = 1 << 16
+IGNORED_FIELDS = ('scraped_at',)
+_SEPARATORS = ' \t\r\n,'
+
+
+def iter_snapshot(path, chunk_size=CHUNK_SIZE):
+    """Yield the colleges in a JSON-array or NDJSON file one at a time."""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        head = f.read(chunk_size)
+        stripped = head.lstrip()
+        if stripped.startswith('['):
+            yield from _iter_array(f, stripped[1:], chunk_size)
+            return
+        f.seek(0)
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f'{path}:{n}: {e}') from None
+
+
+def _iter_array(f, buf, chunk_size):
+    """Decode array elements from buf and further reads of f (after the '[')."""
+    decoder = json.JSONDecoder()
+    pos = 0
+    while True:
+        while True:
+            while pos < len(buf) and buf[pos] in _SEPARATORS:
+                pos += 1
+            if pos < len(buf):
+                break
+            buf, pos = f.read(chunk_size), 0
+            if not buf:
+                raise ValueError('unterminated JSON array')
+        if buf[pos] == ']':
+            return
+        while True:
+            try:
+                record, pos = decoder.raw_decode(buf, pos)
+                break
+            except json.JSONDecodeError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                # An element straddles the chunk boundary; keep its start and read on
+                buf, pos = buf[pos:] + chunk, 0
+        yield record
+
+
+def keyed(records, field='name'):
+    """(key, record) pairs: record[field], with '#n' for its n-th repeat."""
+    seen = {}
+    for record in records:
+        name = record.get(field) or ''
+        n = seen.get(name, 0)
+        seen[name] = n + 1
+        yield (name if n == 0 else f'{name}#{n}'), record
+
+
+def digest(college, ignore=IGNORED_FIELDS):
+    body = {k: v for k, v in college.items() if k not in ignore}
+    blob = json.dumps(body, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.blake2b(blob.encode('utf-8'), digest_size=16).digest()
+
+
+def field_changes(old, new, ignore=()):
+    """{field: {"old", "new"}} for every top-level field that differs."""
+    changes = {}
+    for field in list(old) + [f for f in new if f not in old]:
+        if field in ignore:
+            continue
+        before, after = old.get(field), new.get(field)
+        if before != after:
+            changes[field] = {'old': before, 'new': after}
+    return changes
+
+
+def resource_changes(old_resources, new_resources):
+    old = dict(keyed(old_resources or [], 'service_name'))
+    added, changed = [], {}
+    for key, resource in keyed(new_resources or [], 'service_name'):
+        previous = old.pop(key, None)
+        if previous is None:
+            added.append(resource)
+        elif previous != resource:
+            changed[key] = field_changes(previous, resource)
+    return {'added': added, 'removed': list(old), 'changed': changed}
+
+
+def college_change(key, old, new, ignore=IGNORED_FIELDS):
+    return {
+        'op': 'changed',
+        'key': key,
+        'fields': field_changes(old, new, tuple(ignore) + ('resources',)),
+        'resources': resource_changes(old.get('resources'), new.get('resources')),
+    }
+
+
+def diff_snapshots(old_path, new_path, ignore=IGNORED_FIELDS):
+    """Yield change events from old_path to new_path (see the module docstring)."""
+    index = {key: digest(college, ignore) for key, college in keyed(iter_snapshot(old_path))}
+
+    changed = set()
+    for key, college in keyed(iter_snapshot(new_path)):
+        old_digest = index.pop(key, None)
+        if old_digest is None:
+            yield {'op': 'added', 'key': key, 'college': college}
+        elif old_digest != digest(college, ignore):
+            changed.add(key)
+    removed = list(index)
+    del index
+
+    if changed:
+        old_records = {key: college for key, college in keyed(iter_snapshot(old_path)) if key in changed}
+        for key, college in keyed(iter_snapshot(new_path)):
+            if key in changed:
+                yield college_change(key, old_records.pop(key), college, ignore)
+    for key in removed:
+        yield {'op': 'removed', 'key': key}
+
+
+def summarize(events):
+    """Counts per op plus resource-level totals."""
+    summary = {'added': 0, 'removed': 0, 'changed': 0,
+               'resources_added': 0, 'resources_removed': 0, 'resources_changed': 0}
+    for event in events:
+        summary[event['op']] += 1
+        if event['op'] == 'added':
+            summary['resources_added'] += len(event['college'].get('resources') or [])
+        elif event['op'] == 'changed':
+            for part in ('added', 'removed', 'changed'):
+                summary[f'resources_{part}'] += len(event['resources'][part])
+    return summary
+
+
+def describe(event):
+    """One human-readable line per event."""
+    if event['op'] == 'added':
+        return f"+ {event['key']} ({len(event['college'].get('resources') or [])} resource(s))"
+    if event['op'] == 'removed':
+        return f"- {event['key']}"
+    parts = sorted(event['fields'])
+    res = event['resources']
+    for label, items in (('+', res['added']), ('-', res['removed']), ('~', res['changed'])):
+        if items:
+            parts.append(f'{label}{len(items)} resource(s)')
+    return f"~ {event['key']}: {', '.join(parts)}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Diff two scraped-college snapshots (JSON array or NDJSON).')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    fmt = parser.add_mutually_exclusive_group()
+    fmt.add_argument('--ndjson', action='store_true', help='Write one change event per line')
+    fmt.add_argument('--json', action='store_true', help='Write {"summary", "changes"} as one JSON document')
+    parser.add_argument('-o', '--output', help='Write here instead of stdout')
+    parser.add_argument('--include-volatile', action='store_true',
+                        help=f"Also diff {', '.join(IGNORED_FIELDS)}")
+    args = parser.parse_args(argv)
+
+    ignore = () if args.include_volatile else IGNORED_FIELDS
+    events = diff_snapshots(args.old, args.new, ignore)
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.ndjson:
+            for event in events:
+                out.write(json.dumps(event, ensure_ascii=False) + '\n')
+        elif args.json:
+            changes = list(events)
+            json.dump({'summary': summarize(changes), 'changes': changes}, out, indent=2, ensure_ascii=False)
+            out.write('\n')
+        else:
+            counts = {'added': 0, 'removed': 0, 'changed': 0}
+            for event in events:
+                counts[event['op']] += 1
+                out.write(describe(event) + '\n')
+            out.write(f"{counts['added']} added, {counts['removed']} removed, {counts['changed']} changed\n")
+    finally:
+        if args.output:
+            out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Spatial index over college coordinates for nearest-campus queries.
+
+A k-d tree over points on the unit sphere (x, y, z), so straight-line
+(chord) distance orders points exactly like great-circle distance and
+nothing breaks at the antimeridian or the poles. k-nearest and
+within-radius queries visit O(log n) nodes for typical inputs instead of
+measuring every campus.
+
+The tree is stored implicitly: points are kept in tree order, the node for
+the index range [lo, hi) is the point at mid = (lo + hi) // 2, its left
+subtree is [lo, mid) and its right subtree is [mid + 1, hi), and it splits
+on axis depth % 3 (x, y, z). ui_payload.spatial.json is just that list of
+[pin id, lat, lon, name] rows, so the UI or the API can walk the same tree
+without rebuilding it. Pin ids match ui_shards/pins.json.
+
+Usage:
+    python spatial_index.py build                         # ui_payload.json -> ui_payload.spatial.json
+    python spatial_index.py near 39.96 -83.00 --k 5
+    python spatial_index.py near 39.96 -83.00 --radius 50
+
+    index = SpatialIndex.load()
+    index.nearest(39.96, -83.0, k=3)       # [(pin id, km), ...]
+    index.within(39.96, -83.0, 25)
+"""
+
+import argparse
+import heapq
+import json
+import math
+import sys
+from pathlib import Path
+
+from prepare_ui_payload import OUTPUT as UI_PAYLOAD, college_keys, load_state, write_variants
+
+INDEX_VERSION = 1
+EARTH_RADIUS_KM = 6371.0088
+
+
+def index_path(payload_path=UI_PAYLOAD):
+    """ui_payload.json -> ui_payload.spatial.json"""
+    payload_path = Path(payload_path)
+    return payload_path.with_name(payload_path.stem + '.spatial.json')
+
+
+def to_xyz(lat, lon):
+    lat, lon = math.radians(lat), math.radians(lon)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(km, math.pi * EARTH_RADIUS_KM) / (2 * EARTH_RADIUS_KM))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km; what the index's distances mean."""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def payload_points(ui, ids=None):
+    """[id, lat, lon, name] for every payload entry with usable coordinates."""
+    ids = list(range(len(ui))) if ids is None else ids
+    points = []
+    for cid, entry in zip(ids, ui):
+        try:
+            lat, lon = float(entry.get('latitude')), float(entry.get('longitude'))
+        except (TypeError, ValueError):
+            continue
+        if -90 <= lat <= 90 and -180 <= lon <= 180:
+            points.append([cid, lat, lon, entry.get('name')])
+    return points
+
+
+class SpatialIndex:
+    def __init__(self, points, ordered=False):
+        """points: [id, lat, lon, name] rows. ordered=True means they are already in tree order."""
+        self.points = [list(p) for p in points]
+        self._xyz = [to_xyz(p[1], p[2]) for p in self.points]
+        if not ordered:
+            order = list(range(len(self.points)))
+            self._build(order, 0, len(order), 0)
+            self.points = [self.points[i] for i in order]
+            self._xyz = [self._xyz[i] for i in order]
+        self._names = None
+
+    def _build(self, order, lo, hi, depth):
+        if hi - lo <= 1:
+            return
+        axis = depth % 3
+        order[lo:hi] = sorted(order[lo:hi], key=lambda i: self._xyz[i][axis])
+        mid = (lo + hi) // 2
+        self._build(order, lo, mid, depth + 1)
+        self._build(order, mid + 1, hi, depth + 1)
+
+    @classmethod
+    def from_payload(cls, ui, ids=None):
+        return cls(payload_points(ui, ids))
+
+    @classmethod
+    def load(cls, path=None):
+        path = Path(path) if path else index_path()
+        data = json.loads(path.read_text(encoding='utf-8'))
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported spatial index version: {data.get('version')}")
+        return cls(data['points'], ordered=True)
+
+    def to_dict(self):
+        return {'version': INDEX_VERSION, 'points': self.points}
+
+    def write(self, path, use_brotli=True):
+        """Write the index and its precompressed copies; returns write_variants' file info."""
+        data = json.dumps(self.to_dict(), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        return write_variants(path, data, use_brotli)
+
+    def __len__(self):
+        return len(self.points)
+
+    def nearest(self, lat, lon, k=1, max_km=None):
+        """The k closest points as [(id, km)], nearest first."""
+        if k <= 0 or not self.points:
+            return []
+        query = to_xyz(lat, lon)
+        limit = km_to_chord(max_km) ** 2 if max_km is not None else math.inf
+        best = []  # max-heap of (-chord², position), at most k
+        stack = [(0, len(self.points), 0, 0.0)]  # (lo, hi, depth, chord² to the subtree's side)
+        while stack:
+            lo, hi, depth, bound = stack.pop()
+            worst = -best[0][0] if len(best) == k else limit
+            if lo >= hi or bound > worst:
+                continue
+            mid = (lo + hi) // 2
+            point = self._xyz[mid]
+            d2 = (point[0] - query[0]) ** 2 + (point[1] - query[1]) ** 2 + (point[2] - query[2]) ** 2
+            if d2 <= worst:
+                if len(best) == k:
+                    heapq.heapreplace(best, (-d2, mid))
+                else:
+                    heapq.heappush(best, (-d2, mid))
+            diff = query[depth % 3] - point[depth % 3]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            # LIFO: the near side is searched first, so by the time the far side is
+            # popped the k-th distance has usually shrunk below the splitting plane
+            stack.append((far[0], far[1], depth + 1, diff * diff))
+            stack.append((near[0], near[1], depth + 1, bound))
+        return [(self.points[pos][0], chord_to_km(math.sqrt(-neg)))
+                for neg, pos in sorted(best, reverse=True)]
+
+    def within(self, lat, lon, radius_km):
+        """Every point within radius_km as [(id, km)], nearest first."""
+        if not self.points or radius_km < 0:
+            return []
+        query = to_xyz(lat, lon)
+        limit = km_to_chord(radius_km) ** 2
+        found = []
+        stack = [(0, len(self.points), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            point = self._xyz[mid]
+            d2 = (point[0] - query[0]) ** 2 + (point[1] - query[1]) ** 2 + (point[2] - query[2]) ** 2
+            if d2 <= limit:
+                found.append((d2, mid))
+            diff = query[depth % 3] - point[depth % 3]
+            if diff <= 0 or diff * diff <= limit:
+                stack.append((lo, mid, depth + 1))
+            if diff >= 0 or diff * diff <= limit:
+                stack.append((mid + 1, hi, depth + 1))
+        return [(self.points[pos][0], chord_to_km(math.sqrt(d2))) for d2, pos in sorted(found)]
+
+    def name_of(self, point_id):
+        if self._names is None:
+            self._names = {p[0]: p[3] for p in self.points}
+        return self._names.get(point_id)
+
+
+def pin_ids(ui, output):
+    """Pin ids prepare_ui_payload assigned to ui (list positions without a state file)."""
+    state = load_state(output)
+    if not state:
+        return None
+    known = state.get('colleges', {})
+    return [known[key]['id'] if key in known else i for i, key in enumerate(college_keys(ui))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build or query the nearest-campus spatial index.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('build', help='Index ui_payload.json coordinates')
+    p.add_argument('--payload', default=str(UI_PAYLOAD), help='UI payload JSON to index')
+    p.add_argument('--output', help='Index file (default: next to the payload)')
+    p.add_argument('--no-brotli', action='store_true', help='Skip the .br variant')
+
+    p = sub.add_parser('near', help='Campuses nearest to a point')
+    p.add_argument('lat', type=float)
+    p.add_argument('lon', type=float)
+    p.add_argument('--k', type=int, default=5, help='How many campuses (default: 5)')
+    p.add_argument('--radius', type=float, help='Every campus within this many km instead')
+    p.add_argument('--index', help='Index file (default: ui_payload.spatial.json)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        payload = Path(args.payload)
+        if not payload.exists():
+            print('No UI payload found at', payload)
+            return 1
+        ui = json.loads(payload.read_text(encoding='utf-8'))
+        index = SpatialIndex.from_payload(ui, pin_ids(ui, payload))
+        output = Path(args.output) if args.output else index_path(payload)
+        files = index.write(output, use_brotli=not args.no_brotli)
+        skipped = len(ui) - len(index)
+        print(f"[OK] Indexed {len(index)} campus(es)" + (f", skipped {skipped} without coordinates" if skipped else ''))
+        for enc, info in files.items():
+            print(f"  {enc:8} {info['bytes']:>9,} bytes  {info['path']}")
+        return 0
+
+    path = Path(args.index) if args.index else index_path()
+    if not path.exists():
+        print('No spatial index found at', path, '- run: python spatial_index.py build')
+        return 1
+    index = SpatialIndex.load(path)
+    if args.radius is not None:
+        hits = index.within(args.lat, args.lon, args.radius)
+    else:
+        hits = index.nearest(args.lat, args.lon, args.k)
+    for point_id, km in hits:
+        print(f"{km:9.1f} km  {index.name_of(point_id)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,412 @@
+"""
+SQLite staging store for the scrape pipeline.
+
+Holds the same data as college_targets.json and scraped_colleges_data.json
+in four tables (targets, fetches, colleges, resources), so a script can
+read or change one college without loading and rewriting the whole file.
+Colleges and targets are keyed by name (unique index) and indexed by
+state; JSON import/export keeps the existing file formats as the
+interchange format, including fields the store has no column for.
+
+Usage:
+    python staging_store.py import                      # both JSON files -> staging.db
+    python staging_store.py export --colleges out.json  # staging.db -> JSON
+    python staging_store.py show "Ohio State University"
+    python staging_store.py stats
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(SCRIPT_DIR, 'staging.db')
+TARGETS_FILE = os.path.join(SCRIPT_DIR, 'college_targets.json')
+COLLEGES_FILE = os.path.join(SCRIPT_DIR, 'scraped_colleges_data.json')
+SCHEMA_VERSION = 1
+
+# Columns exported back to JSON; 'state' is indexed separately and round-trips via extra
+TARGET_FIELDS = ('name', 'location', 'latitude', 'longitude', 'website', 'source')
+COLLEGE_FIELDS = ('name', 'location', 'latitude', 'longitude', 'website', 'scraped_at')
+RESOURCE_FIELDS = (
+    'service_name', 'description', 'contact_email', 'contact_phone', 'contact_website',
+    'department', 'office_hours', 'location', 'freshman_notes',
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS targets (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    state TEXT,
+    location TEXT,
+    latitude REAL,
+    longitude REAL,
+    website TEXT,
+    source TEXT,
+    mental_health_urls TEXT NOT NULL DEFAULT '[]',
+    extra TEXT NOT NULL DEFAULT '{}',
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_targets_state ON targets(state);
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    college TEXT,
+    status INTEGER,
+    error TEXT,
+    bytes INTEGER,
+    fetched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fetches_url ON fetches(url, fetched_at);
+CREATE INDEX IF NOT EXISTS idx_fetches_college ON fetches(college);
+CREATE TABLE IF NOT EXISTS colleges (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    state TEXT,
+    location TEXT,
+    latitude REAL,
+    longitude REAL,
+    website TEXT,
+    scraped_at TEXT,
+    extra TEXT NOT NULL DEFAULT '{}',
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_colleges_state ON colleges(state);
+CREATE TABLE IF NOT EXISTS resources (
+    id INTEGER PRIMARY KEY,
+    college_id INTEGER NOT NULL REFERENCES colleges(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    service_name TEXT,
+    description TEXT,
+    contact_email TEXT,
+    contact_phone TEXT,
+    contact_website TEXT,
+    department TEXT,
+    office_hours TEXT,
+    location TEXT,
+    freshman_notes TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_resources_college ON resources(college_id, position);
+"""
+
+
+def state_of(record):
+    """Lower-case state for indexing: the record's 'state', else the end of 'location'."""
+    state = record.get('state')
+    if not state:
+        location = record.get('location') or ''
+        state = location.rsplit(',', 1)[-1] if ',' in location else ''
+    return state.strip().lower() or None
+
+
+def _split(record, fields):
+    """(known column values, JSON of every other key)."""
+    values = [record.get(f) for f in fields]
+    extra = {k: v for k, v in record.items() if k not in fields}
+    return values, extra
+
+
+def _merge(row, fields, extra):
+    out = {f: row[f] for f in fields if row[f] is not None}
+    out.update(json.loads(extra))
+    return out
+
+
+def _atomic_write_json(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class StagingStore:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self._depth = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        if path != ':memory:':
+            self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("INSERT OR IGNORE INTO meta(key, value) VALUES ('schema_version', ?)",
+                          (str(SCHEMA_VERSION),))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        """Group writes into one commit; nested blocks join the outermost one."""
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.rollback()
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self.conn.commit()
+
+    # ----- meta -----
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return json.loads(row['value']) if row and row['value'] is not None else default
+
+    def set_meta(self, key, value):
+        self.conn.execute('INSERT INTO meta(key, value) VALUES (?, ?) '
+                          'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+                          (key, json.dumps(value)))
+
+    # ----- targets -----
+
+    def upsert_targets(self, targets):
+        """Insert or replace targets by name. Returns how many were written."""
+        now = datetime.now().isoformat()
+        rows = []
+        for target in targets:
+            values, extra = _split(target, TARGET_FIELDS + ('mental_health_urls',))
+            urls = target.get('mental_health_urls') or []
+            rows.append(values[:len(TARGET_FIELDS)]
+                        + [state_of(target), json.dumps(urls), json.dumps(extra), now])
+        with self.transaction():
+            self.conn.executemany(
+                'INSERT INTO targets(name, location, latitude, longitude, website, source, state, '
+                'mental_health_urls, extra, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET state = excluded.state, location = excluded.location, '
+                'latitude = excluded.latitude, longitude = excluded.longitude, website = excluded.website, '
+                'source = excluded.source, mental_health_urls = excluded.mental_health_urls, '
+                'extra = excluded.extra, updated_at = excluded.updated_at',
+                rows)
+        return len(rows)
+
+    def upsert_target(self, target):
+        self.upsert_targets([target])
+
+    def _target_from_row(self, row):
+        target = _merge(row, TARGET_FIELDS, row['extra'])
+        target['mental_health_urls'] = json.loads(row['mental_health_urls'])
+        return target
+
+    def get_target(self, name):
+        row = self.conn.execute('SELECT * FROM targets WHERE name = ?', (name,)).fetchone()
+        return self._target_from_row(row) if row else None
+
+    def targets(self, state=None):
+        if state:
+            cur = self.conn.execute('SELECT * FROM targets WHERE state = ? ORDER BY id', (state.lower(),))
+        else:
+            cur = self.conn.execute('SELECT * FROM targets ORDER BY id')
+        for row in cur:
+            yield self._target_from_row(row)
+
+    def delete_targets(self, names):
+        with self.transaction():
+            cur = self.conn.executemany('DELETE FROM targets WHERE name = ?', [(n,) for n in names])
+        return cur.rowcount
+
+    # ----- fetches -----
+
+    def record_fetch(self, url, college=None, status=None, error='', size=None):
+        with self.transaction():
+            self.conn.execute(
+                'INSERT INTO fetches(url, college, status, error, bytes, fetched_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (url, college, status, error or None, size, datetime.now().isoformat()))
+
+    def fetches(self, url=None, college=None):
+        """Fetch history, newest first, for one URL or one college."""
+        if url is not None:
+            cur = self.conn.execute('SELECT * FROM fetches WHERE url = ? ORDER BY id DESC', (url,))
+        elif college is not None:
+            cur = self.conn.execute('SELECT * FROM fetches WHERE college = ? ORDER BY id DESC', (college,))
+        else:
+            cur = self.conn.execute('SELECT * FROM fetches ORDER BY id DESC')
+        return [dict(row) for row in cur]
+
+    # ----- colleges -----
+
+    def _upsert_college(self, college, now):
+        values, extra = _split(college, COLLEGE_FIELDS + ('resources',))
+        extra.pop('resources', None)
+        row = self.conn.execute(
+            'INSERT INTO colleges(name, location, latitude, longitude, website, scraped_at, state, extra, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET location = excluded.location, latitude = excluded.latitude, '
+            'longitude = excluded.longitude, website = excluded.website, scraped_at = excluded.scraped_at, '
+            'state = excluded.state, extra = excluded.extra, updated_at = excluded.updated_at '
+            'RETURNING id',
+            values[:len(COLLEGE_FIELDS)] + [state_of(college), json.dumps(extra), now]).fetchone()
+        college_id = row['id']
+        self.conn.execute('DELETE FROM resources WHERE college_id = ?', (college_id,))
+        rows = []
+        for position, resource in enumerate(college.get('resources') or []):
+            r_values, r_extra = _split(resource, RESOURCE_FIELDS)
+            rows.append([college_id, position] + r_values + [json.dumps(r_extra)])
+        self.conn.executemany(
+            'INSERT INTO resources(college_id, position, service_name, description, contact_email, '
+            'contact_phone, contact_website, department, office_hours, location, freshman_notes, extra) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            rows)
+        return college_id
+
+    def upsert_colleges(self, colleges):
+        """Insert or replace colleges (and their resources) by name, in one transaction."""
+        now = datetime.now().isoformat()
+        count = 0
+        with self.transaction():
+            for college in colleges:
+                self._upsert_college(college, now)
+                count += 1
+        return count
+
+    def upsert_college(self, college):
+        self.upsert_colleges([college])
+
+    def _college_from_row(self, row):
+        college = _merge(row, COLLEGE_FIELDS, row['extra'])
+        resources = []
+        for r in self.conn.execute('SELECT * FROM resources WHERE college_id = ? ORDER BY position', (row['id'],)):
+            resource = {f: r[f] for f in RESOURCE_FIELDS if r[f] is not None}
+            resource.update(json.loads(r['extra']))
+            resources.append(resource)
+        college['resources'] = resources
+        return college
+
+    def get_college(self, name):
+        row = self.conn.execute('SELECT * FROM colleges WHERE name = ?', (name,)).fetchone()
+        return self._college_from_row(row) if row else None
+
+    def colleges(self, state=None):
+        if state:
+            cur = self.conn.execute('SELECT * FROM colleges WHERE state = ? ORDER BY id', (state.lower(),))
+        else:
+            cur = self.conn.execute('SELECT * FROM colleges ORDER BY id')
+        for row in cur.fetchall():
+            yield self._college_from_row(row)
+
+    def delete_college(self, name):
+        with self.transaction():
+            cur = self.conn.execute('DELETE FROM colleges WHERE name = ?', (name,))
+        return cur.rowcount > 0
+
+    def count(self, table, state=None):
+        if table not in ('targets', 'colleges', 'resources', 'fetches'):
+            raise ValueError(f'unknown table: {table}')
+        if state and table in ('targets', 'colleges'):
+            return self.conn.execute(f'SELECT COUNT(*) FROM {table} WHERE state = ?', (state.lower(),)).fetchone()[0]
+        return self.conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+    # ----- JSON import/export -----
+
+    def import_targets_json(self, path=TARGETS_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self.transaction():
+            self.set_meta('targets_description', data.get('description'))
+            self.set_meta('targets_states', data.get('states', []))
+        return self.upsert_targets(data.get('colleges', []))
+
+    def export_targets_json(self, path=TARGETS_FILE):
+        data = {
+            'description': self.get_meta('targets_description', ''),
+            'states': self.get_meta('targets_states', []),
+            'colleges': list(self.targets()),
+        }
+        _atomic_write_json(path, data)
+        return len(data['colleges'])
+
+    def import_colleges_json(self, path=COLLEGES_FILE):
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.upsert_colleges(json.load(f))
+
+    def export_colleges_json(self, path=COLLEGES_FILE):
+        data = list(self.colleges())
+        _atomic_write_json(path, data)
+        return len(data)
+
+
+class StagingFetcher:
+    """Delegates to a fetcher and logs every fetch into the store's fetches table.
+
+    Fetches are logged against college, which the scraper sets to the
+    college it is working on.
+    """
+
+    def __init__(self, fetcher, store, college=None):
+        self.fetcher = fetcher
+        self.store = store
+        self.college = college
+
+    def __getattr__(self, name):
+        return getattr(self.fetcher, name)
+
+    def fetch(self, url, timeout=None):
+        page = self.fetcher.fetch(url, timeout)
+        if page is not None:
+            self.store.record_fetch(url, self.college, status=getattr(page, 'status_code', None),
+                                    size=len(page.content))
+        else:
+            self.store.record_fetch(url, self.college, error=getattr(self.fetcher, 'last_error', ''))
+        return page
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SQLite staging store for scraped data.')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'Database path (default: {DEFAULT_DB})')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('import', 'export'):
+        p = sub.add_parser(name, help=f'{name} JSON files')
+        p.add_argument('--targets', default=TARGETS_FILE, help='Targets JSON file')
+        p.add_argument('--colleges', default=COLLEGES_FILE, help='Scraped colleges JSON file')
+        p.add_argument('--only', choices=['targets', 'colleges'], help='Only this file')
+    show = sub.add_parser('show', help='Print one college (or target) as JSON')
+    show.add_argument('name')
+    sub.add_parser('stats', help='Row counts per table')
+    args = parser.parse_args(argv)
+
+    with StagingStore(args.db) as store:
+        if args.command == 'import':
+            if args.only != 'colleges' and os.path.exists(args.targets):
+                print(f"[OK] {store.import_targets_json(args.targets)} targets from {args.targets}")
+            if args.only != 'targets' and os.path.exists(args.colleges):
+                print(f"[OK] {store.import_colleges_json(args.colleges)} colleges from {args.colleges}")
+        elif args.command == 'export':
+            if args.only != 'colleges':
+                print(f"[OK] {store.export_targets_json(args.targets)} targets to {args.targets}")
+            if args.only != 'targets':
+                print(f"[OK] {store.export_colleges_json(args.colleges)} colleges to {args.colleges}")
+        elif args.command == 'show':
+            record = store.get_college(args.name) or store.get_target(args.name)
+            if record is None:
+                print(f"[FAIL] Not found: {args.name}")
+                return 1
+            print(json.dumps(record, indent=2, ensure_ascii=False))
+        elif args.command == 'stats':
+            for table in ('targets', 'colleges', 'resources', 'fetches'):
+                print(f"{table:<10} {store.count(table)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
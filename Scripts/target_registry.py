@@ -0,0 +1,255 @@
+"""
+Indexed registry of scrape targets (college_targets.json).
+
+Targets are indexed by name and by state, so upserts, deletes and
+per-state lookups don't scan the whole list. Per-URL fetch results are
+kept in a sidecar file (college_targets.status.json) together with an
+index of failing URLs, so "which targets are failing" is a lookup, not a
+pass over every target. save() rewrites both files atomically and only
+when something changed.
+
+Names are also kept in a NameMatcher, so resolve() maps a spelling such as
+"Ohio State Univ." (plus, optionally, its website) to the target it names,
+and upsert(..., match=True) updates that target instead of adding a
+near-duplicate.
+
+Usage:
+    from target_registry import TargetRegistry
+
+    registry = TargetRegistry()
+    registry.upsert_many(updates, match=True)
+    registry.resolve('The Ohio State University')
+    registry.record_url(url, ok=False, error='HTTP 404')
+    registry.failing_targets()
+    registry.save()
+"""
+
+import json
+import os
+from datetime import datetime
+
+from name_matcher import NameMatcher
+
+TARGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'college_targets.json')
+STATUS_VERSION = 1
+
+
+def status_path(targets_path):
+    root, _ = os.path.splitext(targets_path)
+    return root + '.status.json'
+
+
+def _state_key(state):
+    return (state or '').strip().lower()
+
+
+def _atomic_write_json(path, data):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class TargetRegistry:
+    def __init__(self, path=TARGETS_FILE):
+        self.path = path
+        self.status_file = status_path(path)
+        self.description = ''
+        self.states = []
+        self._targets = {}      # name -> target dict (insertion order = file order)
+        self._by_state = {}     # state -> {name: None}, ordered like _targets
+        self._url_owners = {}   # url -> set of target names listing it
+        self.url_status = {}    # url -> {ok, status, error, last_fetch, last_success, failures}
+        self._failing = set()   # urls whose most recent fetch failed
+        self._matcher = NameMatcher()  # fuzzy name/domain -> target name
+        self.dirty = False
+        self._status_dirty = False
+
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.description = data.get('description', '')
+            self.states = list(data.get('states', []))
+            for target in data.get('colleges', []):
+                self._insert(target)
+        if os.path.exists(self.status_file):
+            with open(self.status_file, 'r', encoding='utf-8') as f:
+                status = json.load(f)
+            if status.get('version') == STATUS_VERSION:
+                self.url_status = status.get('urls', {})
+                self._failing = {u for u, s in self.url_status.items() if not s.get('ok')}
+        self._state_set = set(self.states)
+
+    # ----- lookups -----
+
+    def __len__(self):
+        return len(self._targets)
+
+    def __iter__(self):
+        return iter(list(self._targets.values()))
+
+    def __contains__(self, name):
+        return name in self._targets
+
+    def get(self, name):
+        return self._targets.get(name)
+
+    def resolve(self, name, website=None):
+        """Name of the target that name (and website) refer to, or None."""
+        if name in self._targets:
+            return name
+        match = self._matcher.match(name, website)
+        return match[0] if match else None
+
+    def by_state(self, state):
+        return [self._targets[n] for n in self._by_state.get(_state_key(state), {})]
+
+    def targets(self):
+        """All targets in file order (the list the scraper walks)."""
+        return list(self._targets.values())
+
+    # ----- index maintenance -----
+
+    def _insert(self, target):
+        name = target['name']
+        self._targets[name] = target
+        self._by_state.setdefault(_state_key(target.get('state')), {})[name] = None
+        self._matcher.add(name, name, target.get('website'))
+        for url in target.get('mental_health_urls', []):
+            self._url_owners.setdefault(url, set()).add(name)
+
+    def _unindex(self, target):
+        name = target['name']
+        bucket = self._by_state.get(_state_key(target.get('state')), {})
+        bucket.pop(name, None)
+        self._matcher.remove(name)
+        for url in target.get('mental_health_urls', []):
+            owners = self._url_owners.get(url)
+            if owners:
+                owners.discard(name)
+                if not owners:
+                    del self._url_owners[url]
+
+    # ----- writes -----
+
+    def _canonical(self, target, match):
+        """target, renamed to the existing target it fuzzy-matches when match is set."""
+        if not match or target['name'] in self._targets:
+            return target
+        name = self.resolve(target['name'], target.get('website'))
+        return dict(target, name=name) if name else target
+
+    def upsert(self, target, match=False):
+        """Insert or replace target by name. Returns True if it was new.
+
+        With match, a target whose name fuzzy-matches an existing one
+        replaces it under the existing name.
+        """
+        target = self._canonical(target, match)
+        existing = self._targets.get(target['name'])
+        if existing == target:
+            return False
+        if existing is not None:
+            self._unindex(existing)
+        self._insert(dict(target))
+        self.dirty = True
+        return existing is None
+
+    def upsert_many(self, targets, match=False):
+        """Upsert each target; returns (added, updated) counts."""
+        added = updated = 0
+        for target in targets:
+            target = self._canonical(target, match)
+            before = target['name'] in self._targets
+            changed = self._targets.get(target['name']) != target
+            self.upsert(target)
+            if not before:
+                added += 1
+            elif changed:
+                updated += 1
+        return added, updated
+
+    def delete(self, name):
+        target = self._targets.pop(name, None)
+        if target is None:
+            return False
+        self._unindex(target)
+        self.dirty = True
+        return True
+
+    def delete_many(self, names):
+        return sum(1 for name in names if self.delete(name))
+
+    def add_states(self, states):
+        """Append states not yet listed; returns the ones added."""
+        added = [s for s in states if s not in self._state_set]
+        for state in added:
+            self.states.append(state)
+            self._state_set.add(state)
+        if added:
+            self.dirty = True
+        return added
+
+    # ----- URL status -----
+
+    def record_url(self, url, ok, status=None, error='', at=None):
+        """Remember the outcome of fetching url (at: ISO time of the fetch, default now)."""
+        now = at or datetime.now().isoformat()
+        entry = self.url_status.setdefault(url, {'failures': 0, 'last_success': None})
+        entry.update({'ok': bool(ok), 'status': status, 'error': error or '', 'last_fetch': now})
+        if ok:
+            entry['failures'] = 0
+            entry['last_success'] = now
+            self._failing.discard(url)
+        else:
+            entry['failures'] = entry.get('failures', 0) + 1
+            self._failing.add(url)
+        self._status_dirty = True
+        return entry
+
+    def tracks(self, url):
+        """True if some target lists url among its mental_health_urls."""
+        return url in self._url_owners
+
+    def status_of(self, url):
+        return self.url_status.get(url)
+
+    def failing_urls(self, min_failures=1):
+        return sorted(u for u in self._failing
+                      if self.url_status[u].get('failures', 0) >= min_failures)
+
+    def failing_targets(self, min_failures=1, all_urls=False):
+        """Targets with a failing URL (or, with all_urls, with every URL failing)."""
+        failing = set(self.failing_urls(min_failures))
+        names = {n for u in failing for n in self._url_owners.get(u, ())}
+        result = []
+        for name in sorted(names):
+            target = self._targets[name]
+            if all_urls and not all(u in failing for u in target.get('mental_health_urls', [])):
+                continue
+            result.append(target)
+        return result
+
+    # ----- persistence -----
+
+    def to_json(self):
+        return {
+            'description': self.description,
+            'states': self.states,
+            'colleges': self.targets(),
+        }
+
+    def save(self, force=False):
+        """Atomically write whichever files changed. Returns True if anything was written."""
+        wrote = False
+        if self.dirty or force:
+            _atomic_write_json(self.path, self.to_json())
+            self.dirty = False
+            wrote = True
+        if self._status_dirty or (force and self.url_status):
+            # Forget URLs no target lists any more
+            urls = {u: s for u, s in self.url_status.items() if u in self._url_owners}
+            _atomic_write_json(self.status_file, {'version': STATUS_VERSION, 'urls': urls})
+            self._status_dirty = False
+            wrote = True
+        return wrote
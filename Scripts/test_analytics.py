@@ -0,0 +1,126 @@
+"""
+Tests for analytics.py.
+
+Run with: pytest test_analytics.py -v
+"""
+
+import json
+
+import pytest
+
+from analytics import Dataset, main, snake_case, state_of
+
+
+def resource(name, description="A" * 60, **fields):
+    return {"service_name": name, "description": description, **fields}
+
+
+@pytest.fixture
+def colleges():
+    return [
+        {"name": "Ohio State University", "location": "Columbus, Ohio", "latitude": 40.0, "longitude": -83.0,
+         "website": "https://osu.edu",
+         "resources": [resource("Counseling", contact_phone="614-292-5766"),
+                       resource("Crisis Line", description="short")]},
+        {"name": "Kent State University", "location": "Kent, Ohio", "latitude": 41.1, "longitude": -81.3,
+         "website": "", "resources": []},
+        {"name": "Penn State University", "location": "University Park, Pennsylvania",
+         "latitude": None, "longitude": None, "website": "https://psu.edu",
+         "resources": [resource("CAPS", contact_email="caps@psu.edu", contact_website="https://psu.edu/caps")]},
+    ]
+
+
+# ===== Helpers =====
+
+class TestHelpers:
+    @pytest.mark.parametrize("key, expected", [
+        ("serviceName", "service_name"),
+        ("contactEmail", "contact_email"),
+        ("service_name", "service_name"),
+        ("id", "id"),
+    ])
+    def test_snake_case(self, key, expected):
+        assert snake_case(key) == expected
+
+    @pytest.mark.parametrize("location, expected", [
+        ("Columbus, Ohio", "Ohio"),
+        ("New York, NY, New York", "New York"),
+        ("Ohio", "Unknown"),
+        ("", "Unknown"),
+        (None, "Unknown"),
+    ])
+    def test_state_of(self, location, expected):
+        assert state_of(location) == expected
+
+
+# ===== Summary =====
+
+class TestSummary:
+    def test_totals_and_per_state(self, colleges):
+        summary = Dataset(colleges).summary()
+        assert summary["colleges"] == 3
+        assert summary["unique_names"] == 3
+        assert summary["resources"] == 3
+        assert summary["per_state"] == {"Ohio": {"colleges": 2, "resources": 2},
+                                        "Pennsylvania": {"colleges": 1, "resources": 1}}
+        assert summary["colleges_without_resources"] == ["Kent State University"]
+
+    def test_completeness(self, colleges):
+        summary = Dataset(colleges).summary()
+        assert summary["college_completeness"]["website"] == pytest.approx(2 / 3, abs=1e-4)
+        assert summary["college_completeness"]["latitude"] == pytest.approx(2 / 3, abs=1e-4)
+        assert summary["resource_completeness"]["contact_phone"] == pytest.approx(1 / 3, abs=1e-4)
+        assert summary["resource_completeness"]["service_name"] == 1.0
+
+    def test_distributions_and_issues(self, colleges):
+        summary = Dataset(colleges).summary()
+        rpc = summary["resources_per_college"]
+        assert (rpc["min"], rpc["max"], rpc["median"]) == (0, 2, 1)
+        assert rpc["histogram"] == {"0": 1, "1": 1, "2-3": 1, "4-7": 0, "8+": 0}
+        assert sum(summary["scores"]["histogram"].values()) == 3
+        assert summary["issues"] == {"no_contact": 1, "short_description": 1}
+
+    def test_state_filter(self, colleges):
+        dataset = Dataset(colleges)
+        ohio = dataset.summary("ohio")
+        assert (ohio["colleges"], ohio["resources"]) == (2, 2)
+        assert list(ohio["per_state"]) == ["Ohio"]
+        assert ohio["issues"] == {"no_contact": 1, "short_description": 1}
+        assert [name for name, _, _ in dataset.colleges("Ohio")] == ["Kent State University",
+                                                                    "Ohio State University"]
+
+    def test_empty_selection(self, colleges):
+        summary = Dataset(colleges).summary("Texas")
+        assert summary["colleges"] == summary["resources"] == 0
+        assert summary["scores"]["mean"] is None
+        assert summary["resource_completeness"]["description"] == 0.0
+
+    def test_api_records_use_camel_case(self, colleges):
+        api = [{"id": 1, "name": "Ohio State University", "location": "Columbus, Ohio",
+                "resources": [{"serviceName": "Counseling", "description": "A" * 60,
+                               "contactPhone": "614-292-5766"}]}]
+        summary = Dataset(api).summary()
+        assert summary["resource_completeness"]["contact_phone"] == 1.0
+        assert summary["issues"]["no_contact"] == 0
+        assert Dataset(api).scores[0] == Dataset(colleges[:1]).scores[0]
+
+
+# ===== CLI =====
+
+class TestCli:
+    def test_json_output(self, colleges, tmp_path, capsys):
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps(colleges), encoding="utf-8")
+        assert main(["--file", str(path), "--state", "Ohio", "--list", "--json"]) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report["colleges"] == 2
+        assert [c["name"] for c in report["college_list"]] == ["Kent State University", "Ohio State University"]
+
+    def test_text_report_and_missing_file(self, colleges, tmp_path, capsys):
+        path = tmp_path / "data.json"
+        path.write_text(json.dumps(colleges), encoding="utf-8")
+        assert main(["--file", str(path)]) == 0
+        out = capsys.readouterr().out
+        assert "Colleges: 3 (3 unique names)" in out
+        assert "No contact info:    1" in out
+        assert main(["--file", str(tmp_path / "missing.json")]) == 1
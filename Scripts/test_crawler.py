@@ -0,0 +1,126 @@
+"""
+Tests for crawler.py frontier, canonicalization and link scoring.
+
+Run with: pytest test_crawler.py -v
+"""
+
+from _html_compat import BeautifulSoup
+from crawler import (
+    CrawlFrontier, canonicalize_url, extract_links, is_same_site, score_link,
+)
+from simple_scraper import CollegeScraper
+
+
+# ===== canonicalize_url =====
+
+class TestCanonicalizeUrl:
+    def test_lowercases_host_and_drops_fragment(self):
+        assert canonicalize_url("HTTPS://WWW.OSU.EDU/Counseling/#top") == "https://www.osu.edu/Counseling"
+
+    def test_drops_default_port_and_tracking_params(self):
+        url = "https://osu.edu:443/caps?utm_source=x&b=2&a=1"
+        assert canonicalize_url(url) == "https://osu.edu/caps?a=1&b=2"
+
+    def test_resolves_relative_against_base(self):
+        assert canonicalize_url("../caps/", "https://osu.edu/student/life/") == "https://osu.edu/student/caps"
+
+    def test_rejects_non_http(self):
+        assert canonicalize_url("mailto:caps@osu.edu") is None
+        assert canonicalize_url("") is None
+
+
+# ===== score_link / is_same_site =====
+
+class TestScoreLink:
+    def test_counseling_anchor_beats_generic(self):
+        good = score_link("https://osu.edu/student-life/counseling", "Counseling Services")
+        generic = score_link("https://osu.edu/about", "About Us")
+        assert good > generic
+        assert generic <= 0
+
+    def test_non_mental_keywords_penalized(self):
+        assert score_link("https://osu.edu/dental-clinic", "Dental Clinic") < 0
+
+    def test_subdomain_is_same_site(self):
+        assert is_same_site("https://counselingcenter.nd.edu/", {"nd.edu"})
+        assert not is_same_site("https://example.com/nd.edu", {"nd.edu"})
+
+
+# ===== CrawlFrontier =====
+
+class TestCrawlFrontier:
+    def test_seeds_pop_before_website(self):
+        college = {
+            "website": "https://www.osu.edu",
+            "mental_health_urls": ["https://ccs.osu.edu/"],
+        }
+        frontier = CrawlFrontier.for_college(college)
+        assert frontier.pop() == ("https://ccs.osu.edu/", 0)
+        assert frontier.pop() == ("https://www.osu.edu/", 0)
+
+    def test_visited_set_dedupes_canonical_forms(self):
+        frontier = CrawlFrontier({"osu.edu"})
+        assert frontier.add("https://osu.edu/caps", 1, 10)
+        assert not frontier.add("https://OSU.edu/caps/#x", 1, 10)
+        assert len(frontier) == 1
+
+    def test_rejects_off_site_weak_and_deep_links(self):
+        frontier = CrawlFrontier({"osu.edu"}, max_depth=1)
+        assert not frontier.add("https://other.edu/counseling", 1, 10)
+        assert not frontier.add("https://osu.edu/about", 1, 0)
+        assert not frontier.add("https://osu.edu/counseling", 2, 10)
+
+    def test_page_budget(self):
+        frontier = CrawlFrontier({"osu.edu"}, max_pages=2)
+        for i in range(5):
+            frontier.add(f"https://osu.edu/counseling/{i}", 1, 10)
+        assert frontier.pop() is not None
+        assert frontier.pop() is not None
+        assert frontier.pop() is None
+
+
+def test_extract_links_skips_documents_and_mailto():
+    soup = BeautifulSoup(
+        '<a href="/caps">CAPS</a><a href="/handbook.pdf">Handbook</a>'
+        '<a href="mailto:caps@osu.edu">Email</a>',
+        'html.parser',
+    )
+    assert extract_links(soup, "https://osu.edu/") == [("https://osu.edu/caps", "CAPS")]
+
+
+class _FakeResponse:
+    def __init__(self, url, html):
+        self.url = url
+        self.content = html.encode("utf-8")
+
+
+class _FakeFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    def fetch(self, url, timeout=15):
+        self.fetched.append(url)
+        html = self.pages.get(url)
+        return _FakeResponse(url, html) if html is not None else None
+
+
+def test_crawl_college_finds_linked_counseling_page():
+    pages = {
+        "https://www.example.edu/": (
+            '<html><body><a href="/athletics">Athletics</a>'
+            '<a href="/student-life/counseling">Counseling Center</a></body></html>'
+        ),
+        "https://www.example.edu/student-life/counseling": (
+            "<html><body><h1>Counseling Center</h1>"
+            "<p>Our mental health and counseling services provide therapy for anxiety and depression.</p>"
+            "<p>Contact: counseling@example.edu</p></body></html>"
+        ),
+    }
+    scraper = CollegeScraper(crawl=True, max_depth=1, max_pages=3)
+    scraper.fetcher = _FakeFetcher(pages)
+
+    resources = scraper.crawl_college({"website": "https://www.example.edu", "mental_health_urls": []})
+
+    assert "https://www.example.edu/athletics" not in scraper.fetcher.fetched
+    assert any(r["contact_email"] == "counseling@example.edu" for r in resources)
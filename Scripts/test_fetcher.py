@@ -0,0 +1,256 @@
+"""
+Tests for fetcher.py scheduling, robots.py cache and host_health.py breaker.
+
+Run with: pytest test_fetcher.py -v
+"""
+
+import requests
+
+from fetcher import Fetcher
+from host_health import DEFAULT_TIMEOUT, MIN_TIMEOUT, HostHealth
+from robots import RobotsCache
+
+
+class FakeResponse:
+    def __init__(self, url, status_code=200, text="", headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode("utf-8")
+        self.headers = headers if headers is not None else {"Content-Type": "text/html; charset=utf-8"}
+        self.encoding = "utf-8"
+        self.chunks_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            self.chunks_read += 1
+            yield self.content[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, robots=None, status=None):
+        self.headers = {"User-Agent": "Mozilla/5.0 (compatible; MentalHealthScraper/1.0)"}
+        self.robots = robots or {}
+        self.status = status or {}
+        self.requests = []
+
+    def get(self, url, timeout=None, **kwargs):
+        self.requests.append(url)
+        if url.endswith("/robots.txt"):
+            host = url[: -len("/robots.txt")]
+            if host in self.status:
+                return FakeResponse(url, self.status[host])
+            return FakeResponse(url, 200, self.robots.get(host, ""))
+        return FakeResponse(url, 200, "<html></html>")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+ROBOTS = """
+User-agent: *
+Disallow: /private
+Crawl-delay: 5
+"""
+
+
+def make_fetcher(session, clock=None, rate=1):
+    clock = clock or FakeClock()
+    return Fetcher(session, rate_limit_seconds=rate, clock=clock, sleep=clock.sleep), clock
+
+
+# ===== RobotsCache =====
+
+class TestRobotsCache:
+    def test_fetches_robots_once_per_host(self):
+        session = FakeSession({"https://a.edu": ROBOTS})
+        cache = RobotsCache(session, "MentalHealthScraper")
+        assert cache.allowed("https://a.edu/counseling")
+        assert not cache.allowed("https://a.edu/private/x")
+        assert cache.crawl_delay("https://a.edu/") == 5
+        assert session.requests == ["https://a.edu/robots.txt"]
+
+    def test_ttl_expiry_refetches(self):
+        session = FakeSession({"https://a.edu": ROBOTS})
+        clock = FakeClock()
+        cache = RobotsCache(session, "MentalHealthScraper", ttl=60, clock=clock)
+        cache.allowed("https://a.edu/")
+        clock.now = 61
+        cache.allowed("https://a.edu/")
+        assert session.requests.count("https://a.edu/robots.txt") == 2
+
+    def test_missing_robots_allows_and_forbidden_disallows(self):
+        session = FakeSession(status={"https://a.edu": 404, "https://b.edu": 403})
+        cache = RobotsCache(session, "MentalHealthScraper")
+        assert cache.allowed("https://a.edu/anything")
+        assert not cache.allowed("https://b.edu/anything")
+
+
+# ===== Fetcher =====
+
+class TestFetcher:
+    def test_disallowed_url_skipped_without_request(self):
+        session = FakeSession({"https://a.edu": ROBOTS})
+        fetcher, _ = make_fetcher(session)
+        assert fetcher.fetch("https://a.edu/private/page") is None
+        assert "https://a.edu/private/page" not in session.requests
+        assert fetcher.skipped_by_robots == 1
+
+    def test_crawl_delay_only_throttles_its_own_host(self):
+        session = FakeSession({"https://slow.edu": ROBOTS})
+        fetcher, clock = make_fetcher(session, rate=1)
+
+        fetcher.fetch("https://slow.edu/a")
+        fetcher.fetch("https://fast.edu/a")
+        # Each host's robots.txt request took its first 1s slot
+        assert clock.slept == [1, 1]
+
+        fetcher.fetch("https://slow.edu/b")
+        assert clock.slept == [1, 1, 4]  # 5s Crawl-delay after slow.edu/a at t=1
+
+        fetcher.fetch("https://fast.edu/b")
+        # fast.edu's 1s slot has already passed while waiting on slow.edu
+        assert clock.slept == [1, 1, 4]
+
+    def test_rules_for_the_product_token_apply(self):
+        robots = "User-agent: MentalHealthScraper\nDisallow: /\n\nUser-agent: *\nAllow: /\n"
+        session = FakeSession({"https://a.edu": robots})
+        fetcher, _ = make_fetcher(session)
+        assert fetcher.robots.user_agent == "MentalHealthScraper"
+        assert fetcher.fetch("https://a.edu/caps") is None
+        assert fetcher.skipped_by_robots == 1
+
+    def test_respect_robots_can_be_disabled(self):
+        session = FakeSession({"https://a.edu": ROBOTS})
+        fetcher = Fetcher(session, rate_limit_seconds=0, respect_robots=False)
+        assert fetcher.fetch("https://a.edu/private/page") is not None
+        assert "https://a.edu/robots.txt" not in session.requests
+
+
+# ===== Adaptive timeouts / circuit breaker =====
+
+class FlakySession(FakeSession):
+    """Raises ConnectionError for every page on down.edu."""
+
+    def get(self, url, timeout=None, **kwargs):
+        self.requests.append(url)
+        if url.endswith("/robots.txt"):
+            return FakeResponse(url, 404)
+        if "down.edu" in url:
+            raise requests.ConnectionError("refused")
+        return FakeResponse(url, 200, "<html></html>")
+
+
+class TestHostHealth:
+    def test_failure_reason_is_reported(self):
+        fetcher, _ = make_fetcher(FlakySession(), rate=0)
+        assert fetcher.fetch("https://down.edu/a") is None
+        assert fetcher.last_error.startswith("connection error")
+        assert fetcher.errors == {"connection error": 1}
+
+    def test_circuit_opens_after_repeated_failures(self):
+        session = FlakySession()
+        fetcher, clock = make_fetcher(session, rate=0)
+        for i in range(3):
+            fetcher.fetch(f"https://down.edu/{i}")
+        attempts = len([u for u in session.requests if "down.edu/" in u and "robots" not in u])
+
+        assert fetcher.fetch("https://down.edu/later") is None
+        assert fetcher.last_error.startswith("circuit open")
+        assert len([u for u in session.requests if "down.edu/" in u and "robots" not in u]) == attempts
+        # Other hosts are unaffected
+        assert fetcher.fetch("https://up.edu/a") is not None
+
+    def test_circuit_half_opens_after_cooldown(self):
+        session = FlakySession()
+        fetcher, clock = make_fetcher(session, rate=0)
+        for i in range(3):
+            fetcher.fetch(f"https://down.edu/{i}")
+        clock.now += 301
+        fetcher.fetch("https://down.edu/trial")
+        assert "https://down.edu/trial" in session.requests
+
+    def test_dead_host_robots_txt_not_refetched_while_circuit_is_open(self):
+        class DeadSession(FakeSession):
+            def get(self, url, timeout=None, **kwargs):
+                self.requests.append(url)
+                raise requests.ConnectionError("refused")
+
+        session = DeadSession()
+        clock = FakeClock()
+        fetcher = Fetcher(session, rate_limit_seconds=0, clock=clock, sleep=clock.sleep,
+                          health=HostHealth(cooldown=3600, clock=clock))
+        for i in range(3):
+            fetcher.fetch(f"https://down.edu/{i}")
+        sent = len(session.requests)
+        clock.now += 11 * 60  # robots.txt error TTL has expired, the breaker has not cooled down
+        assert fetcher.fetch("https://down.edu/later") is None
+        assert len(session.requests) == sent
+        assert fetcher.last_error.startswith("circuit open")
+
+    def test_adaptive_timeout_shrinks_for_fast_host(self):
+        health = HostHealth()
+        assert health.timeout("https://a.edu")[1] == DEFAULT_TIMEOUT
+        for _ in range(10):
+            health.record_success("https://a.edu", 0.2)
+        assert health.timeout("https://a.edu")[1] == MIN_TIMEOUT
+
+
+# ===== Streaming body limits =====
+
+class BodySession(FakeSession):
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+    def get(self, url, timeout=None, **kwargs):
+        self.requests.append(url)
+        if url.endswith("/robots.txt"):
+            return FakeResponse(url, 404)
+        return self.response
+
+
+class TestStreaming:
+    def test_html_body_returned_as_page(self):
+        resp = FakeResponse("https://a.edu/caps", 200, "<html>CAPS</html>")
+        fetcher, _ = make_fetcher(BodySession(resp), rate=0)
+        page = fetcher.fetch("https://a.edu/caps")
+        assert page.content == b"<html>CAPS</html>"
+        assert page.url == "https://a.edu/caps"
+        assert fetcher.bytes_downloaded == len(page.content)
+        assert resp.closed
+
+    def test_pdf_rejected_before_reading_body(self):
+        resp = FakeResponse("https://a.edu/h.pdf", 200, "%PDF" * 100, {"Content-Type": "application/pdf"})
+        fetcher, _ = make_fetcher(BodySession(resp), rate=0)
+        assert fetcher.fetch("https://a.edu/h.pdf") is None
+        assert fetcher.last_error == "content-type: application/pdf"
+        assert resp.chunks_read == 0
+
+    def test_oversized_content_length_rejected(self):
+        resp = FakeResponse("https://a.edu/big", 200, "x", {"Content-Type": "text/html", "Content-Length": "50000000"})
+        fetcher, _ = make_fetcher(BodySession(resp), rate=0)
+        assert fetcher.fetch("https://a.edu/big") is None
+        assert fetcher.last_error.startswith("too large")
+
+    def test_stream_aborts_once_cap_exceeded(self):
+        resp = FakeResponse("https://a.edu/big", 200, "x" * 10000, {"Content-Type": "text/html"})
+        session = BodySession(resp)
+        fetcher = Fetcher(session, rate_limit_seconds=0, max_bytes=100)
+        assert fetcher.fetch("https://a.edu/big") is None
+        assert fetcher.last_error.startswith("too large")
+        assert resp.chunks_read == 1
@@ -9,7 +9,9 @@ import os
 import tempfile
 
 import pytest
-from importer import build_resource_payload, build_college_payload, load_data_file
+from importer import (
+    APIClient, build_resource_payload, build_college_payload, load_data_file, resolve_college_names,
+)
 
 
 # ===== build_resource_payload =====
@@ -182,3 +184,96 @@ class TestLoadDataFile:
                 load_data_file(path)
         finally:
             os.unlink(path)
+
+
+# ===== APIClient paging =====
+
+class FakePageResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakePagedSession:
+    """Serves /colleges/page from a list of names."""
+
+    def __init__(self, names):
+        self.names = names
+        self.calls = []
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append((url, params))
+        page, size = params["page"], params["pageSize"]
+        items = [{"name": n} for n in self.names[(page - 1) * size: page * size]]
+        return FakePageResponse({"items": items, "page": page, "pageSize": size, "total": len(self.names)})
+
+
+class TestAPIClientPaging:
+    def make_client(self, names):
+        client = APIClient(base_url="http://api.test/api")
+        client.session = FakePagedSession(names)
+        return client
+
+    def test_iter_colleges_walks_every_page(self):
+        names = [f"College {i}" for i in range(5)]
+        client = self.make_client(names)
+        assert [c["name"] for c in client.iter_colleges(page_size=2)] == names
+        assert [p["page"] for _, p in client.session.calls] == [1, 2, 3]
+
+    def test_exact_multiple_stops_without_empty_page(self):
+        client = self.make_client(["A", "B", "C", "D"])
+        assert len(list(client.iter_colleges(page_size=2))) == 4
+        assert len(client.session.calls) == 2
+
+    def test_fields_and_location_are_sent(self):
+        client = self.make_client(["A"])
+        list(client.iter_colleges(fields=["id", "name"], location="Ohio"))
+        url, params = client.session.calls[0]
+        assert url == "http://api.test/api/colleges/page"
+        assert params["fields"] == "id,name"
+        assert params["location"] == "Ohio"
+
+
+# ===== resolve_college_names =====
+
+class TestResolveCollegeNames:
+    def test_payload_takes_the_existing_server_name(self):
+        payloads = [{"name": "The Ohio State University", "website": "https://www.osu.edu"},
+                    {"name": "Kent State University", "website": "https://www.kent.edu"}]
+        existing = [{"id": 7, "name": "Ohio State University", "website": "https://osu.edu"}]
+        renames = resolve_college_names(payloads, existing)
+        assert renames == [("The Ohio State University", "Ohio State University", 1.0)]
+        assert [p["name"] for p in payloads] == ["Ohio State University", "Kent State University"]
+
+    def test_near_duplicates_within_one_import_collapse(self):
+        payloads = [{"name": "Case Western Reserve University", "website": "https://case.edu"},
+                    {"name": "Case Western Reserve Univ.", "website": "https://www.case.edu/caps"}]
+        assert len(resolve_college_names(payloads)) == 1
+        assert payloads[1]["name"] == "Case Western Reserve University"
+
+    def test_same_name_on_another_domain_is_left_alone(self):
+        payloads = [{"name": "Miami University", "website": "https://www.miami.edu"}]
+        existing = [{"id": 1, "name": "Miami University", "website": "https://miamioh.edu"}]
+        assert resolve_college_names(payloads, existing) == []
+
+    def test_branch_campuses_keep_their_names(self):
+        payloads = [{"name": "Kent State University at Stark", "website": "https://www.kent.edu/stark"},
+                    {"name": "Ohio State University Lima", "website": None},
+                    {"name": "Ohio State University Newark", "website": "https://newark.osu.edu"}]
+        existing = [{"id": 1, "name": "Kent State University", "website": "https://www.kent.edu"},
+                    {"id": 2, "name": "Ohio State University", "website": "https://www.osu.edu"}]
+        assert resolve_college_names(payloads, existing) == []
+        assert [p["name"] for p in payloads] == ["Kent State University at Stark", "Ohio State University Lima",
+                                                 "Ohio State University Newark"]
+
+    def test_without_rename_matches_are_only_reported(self):
+        payloads = [{"name": "The Ohio State University", "website": "https://www.osu.edu"}]
+        existing = [{"id": 7, "name": "Ohio State University", "website": "https://osu.edu"}]
+        matches = resolve_college_names(payloads, existing, rename=False)
+        assert matches == [("The Ohio State University", "Ohio State University", 1.0)]
+        assert payloads[0]["name"] == "The Ohio State University"
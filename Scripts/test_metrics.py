@@ -0,0 +1,186 @@
+"""
+Tests for metrics.py and the metrics recorded by the scraper, importer and publisher.
+
+Run with: pytest test_metrics.py -v
+"""
+
+import urllib.error
+import urllib.request
+
+import pytest
+import requests
+
+import publish_to_api
+from fetcher import Fetcher, Page
+from importer import APIClient
+from metrics import Registry, RunMetrics
+from simple_scraper import CollegeScraper
+from test_fetcher import FakeResponse, FakeSession
+
+CAPS_PAGE = b"""<html><body><h2>Counseling and Psychological Services</h2>
+<p>Free confidential counseling, therapy and crisis support for students dealing with anxiety,
+depression and stress. Call 614-292-5766 or email caps@example.edu to make an appointment.</p></body></html>"""
+
+
+# ===== Registry =====
+
+class TestRegistry:
+    def test_text_format(self):
+        registry = Registry()
+        pages = registry.counter("pages_total", "Pages seen.")
+        errors = registry.counter("errors_total", "Errors by reason.", ("reason",))
+        latency = registry.histogram("latency_seconds", "Latency.", ("status",), buckets=(0.5, 1))
+        pages.inc(3)
+        errors.inc(reason='say "hi"\n')
+        latency.observe(0.25, status=200)
+        latency.observe(2, status=200)
+
+        assert registry.render() == (
+            "# HELP pages_total Pages seen.\n"
+            "# TYPE pages_total counter\n"
+            "pages_total 3\n"
+            "# HELP errors_total Errors by reason.\n"
+            "# TYPE errors_total counter\n"
+            'errors_total{reason="say \\"hi\\"\\n"} 1\n'
+            "# HELP latency_seconds Latency.\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{status="200",le="0.5"} 1\n'
+            'latency_seconds_bucket{status="200",le="1"} 1\n'
+            'latency_seconds_bucket{status="200",le="+Inf"} 2\n'
+            'latency_seconds_sum{status="200"} 2.25\n'
+            'latency_seconds_count{status="200"} 2\n'
+        )
+
+    def test_unused_unlabelled_metrics_render_zero(self):
+        registry = Registry()
+        registry.counter("bytes_total", "Bytes.")
+        registry.counter("errors_total", "Errors.", ("reason",))
+        assert registry.render().splitlines()[2] == "bytes_total 0"
+        assert "errors_total{" not in registry.render()
+
+    def test_misuse_is_rejected(self):
+        registry = Registry()
+        errors = registry.counter("errors_total", "Errors.", ("reason",))
+        assert registry.counter("errors_total", "Errors.", ("reason",)) is errors
+        with pytest.raises(ValueError):
+            registry.gauge("errors_total", "Errors.", ("reason",))
+        with pytest.raises(ValueError):
+            errors.inc(host="x")
+        with pytest.raises(ValueError):
+            errors.inc(-1, reason="x")
+
+    def test_textfile_is_replaced_whole(self, tmp_path):
+        registry = Registry()
+        registry.gauge("up", "Up.").set(1)
+        path = tmp_path / "mhdb.prom"
+        registry.write_textfile(path)
+        assert path.read_text(encoding="utf-8").endswith("up 1\n")
+        assert [p.name for p in tmp_path.iterdir()] == ["mhdb.prom"]
+
+    def test_http_server(self):
+        metrics = RunMetrics(port=0)
+        try:
+            metrics.pages_parsed.inc()
+            host, port = metrics.server.server_address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as resp:
+                assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                assert "mhdb_pages_parsed_total 1" in resp.read().decode("utf-8")
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+        finally:
+            metrics.close()
+        assert metrics.server is None
+
+
+# ===== Instrumentation =====
+
+class StatusSession(FakeSession):
+    def get(self, url, timeout=None, **kwargs):
+        if url.endswith("/missing"):
+            return FakeResponse(url, 404)
+        if url.endswith("/down"):
+            raise requests.ConnectionError("refused")
+        return super().get(url, timeout, **kwargs)
+
+
+class ServingFetcher:
+    last_error = ""
+
+    def fetch(self, url, timeout=None):
+        return Page(url, 200, {}, CAPS_PAGE)
+
+
+class TestInstrumentation:
+    def test_fetch_latency_by_status_and_bytes(self):
+        metrics = RunMetrics()
+        fetcher = Fetcher(StatusSession(), rate_limit_seconds=0, respect_robots=False, metrics=metrics)
+        for path in ("/a", "/b", "/missing", "/down"):
+            fetcher.fetch("https://osu.edu" + path)
+
+        assert metrics.fetch_seconds.count(status=200) == 2
+        assert metrics.fetch_seconds.count(status=404) == 1
+        assert metrics.fetch_seconds.count(status="connection error") == 1
+        assert metrics.fetch_failures.value(reason="HTTP 404") == 1
+        assert metrics.fetch_bytes.value() == 2 * len("<html></html>")
+
+    def test_scraper_counts_pages_and_resources(self, capsys):
+        metrics = RunMetrics()
+        scraper = CollegeScraper(fetcher=ServingFetcher(), metrics=metrics)
+        college = {"name": "Ohio State University", "location": "Columbus, Ohio", "latitude": 40.0,
+                   "longitude": -83.0, "website": "https://osu.edu",
+                   "mental_health_urls": ["https://osu.edu/caps", "https://osu.edu/caps2"]}
+        scraper.scrape_all([college, dict(college, name="Manual", source="manual")])
+
+        assert metrics.pages_parsed.value() == 2
+        assert metrics.resources_extracted.value() == 2
+        assert metrics.resources_filtered.value(reason="duplicate") == 1
+        assert metrics.colleges_scraped.value(outcome="success") == 1
+        assert metrics.colleges_scraped.value(outcome="skipped") == 1
+
+    def test_scraper_shares_its_metrics_with_the_fetcher_it_builds(self):
+        scraper = CollegeScraper()
+        assert scraper.fetcher.metrics is scraper.metrics
+
+    def test_import_batch_latency_by_outcome(self):
+        class Response:
+            def __init__(self, status):
+                self.status_code = status
+
+            def raise_for_status(self):
+                if self.status_code >= 400:
+                    raise requests.HTTPError(response=self)
+
+            def json(self):
+                return {"message": "ok"}
+
+        statuses = [200, 500]
+        metrics = RunMetrics()
+        client = APIClient(base_url="http://api.test/api", metrics=metrics)
+        client.session.post = lambda url, json: Response(statuses.pop(0))
+        client.bulk_import([{"name": "A"}, {"name": "B"}])
+        with pytest.raises(requests.HTTPError):
+            client.bulk_import([{"name": "C"}])
+
+        assert metrics.import_batch_seconds.count(outcome="ok") == 1
+        assert metrics.import_batch_seconds.count(outcome="500") == 1
+        assert metrics.import_colleges.value() == 2
+
+    def test_publish_retries_and_textfile(self, tmp_path, capsys):
+        class Session:
+            attempts = 0
+
+            def post(self, url, data=None, json=None, headers=None, timeout=None):
+                self.attempts += 1
+                return type("Response", (), {"status_code": 503 if self.attempts < 3 else 200, "text": "busy"})()
+
+        prom = tmp_path / "mhdb_publish.prom"
+        metrics = RunMetrics(job="publish", textfile=prom)
+        summary = publish_to_api.publish([{"name": "A", "resources": []}], "http://api.test/bulk", {},
+                                         tmp_path / "state.json", session=Session(), sleep=lambda s: None,
+                                         metrics=metrics)
+        metrics.close(ok=not summary["failed_batches"])
+
+        text = prom.read_text(encoding="utf-8")
+        assert "mhdb_publish_retries_total 2" in text
+        assert 'mhdb_last_run_success{job="publish"} 1' in text
+        assert 'mhdb_run_duration_seconds{job="publish"}' in text
@@ -0,0 +1,128 @@
+"""
+Tests for name_matcher.py.
+
+Run with: pytest test_name_matcher.py -v
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from name_matcher import NameMatcher, domain_of, jaccard, normalize_name, trigrams
+
+
+# ===== Normalizing =====
+
+class TestNormalize:
+    @pytest.mark.parametrize("raw, expected", [
+        ("The Ohio State University", "ohio state university"),
+        ("Case Western Reserve Univ.", "case western reserve university"),
+        ("St. Louis University", "st louis university"),  # Saint or State: left alone
+        ("Texas A&M University", "texas a and m university"),
+        ("Université de Montréal", "universite de montreal"),
+        ("University of Wisconsin-Madison", "university of wisconsin madison"),
+    ])
+    def test_normalize_name(self, raw, expected):
+        assert normalize_name(raw) == expected
+
+    @pytest.mark.parametrize("url, expected", [
+        ("https://www.osu.edu", "osu.edu"),
+        ("https://counseling.osu.edu/caps/", "osu.edu"),
+        ("ccs.osu.edu", "osu.edu"),
+        ("https://www.ox.ac.uk/students", "ox.ac.uk"),
+        ("", ""),
+        ("not a url", ""),
+    ])
+    def test_domain_of(self, url, expected):
+        assert domain_of(url) == expected
+
+
+# ===== Matching =====
+
+@pytest.fixture
+def matcher():
+    m = NameMatcher()
+    m.add(1, "Ohio State University", "https://www.osu.edu")
+    m.add(2, "Ohio University", "https://www.ohio.edu")
+    m.add(3, "Penn State University", "https://www.psu.edu")
+    m.add(4, "University of Illinois Urbana-Champaign", "https://illinois.edu")
+    m.add(5, "Miami University", "https://miamioh.edu")
+    return m
+
+
+class TestMatch:
+    def test_normalized_names_match_exactly(self, matcher):
+        assert matcher.match("The Ohio State University") == (1, 1.0)
+        assert matcher.match("OHIO STATE UNIV.") == (1, 1.0)
+
+    def test_close_spelling_matches_on_name_alone(self, matcher):
+        key, score = matcher.match("University of Illinois at Urbana-Champaign")
+        assert key == 4 and 0.8 <= score < 1.0
+
+    def test_different_colleges_do_not_match(self, matcher):
+        assert matcher.match("Ohio Northern University") is None
+        assert matcher.match("University of Miami") is None
+
+    def test_shared_domain_lowers_the_bar(self, matcher):
+        assert matcher.match("Pennsylvania State University") is None
+        assert matcher.match("Pennsylvania State University", "https://studentaffairs.psu.edu/caps")[0] == 3
+
+    def test_conflicting_domain_vetoes_even_identical_names(self, matcher):
+        assert matcher.match("Miami University", "https://www.miami.edu") is None
+        assert matcher.match("Miami University", "https://miamioh.edu/health") == (5, 1.0)
+
+    @pytest.mark.parametrize("name, website", [
+        ("Ohio State University Lima", None),
+        ("Ohio State University Newark", "https://newark.osu.edu"),
+        ("Ohio State University at Mansfield", "https://mansfield.osu.edu"),
+        ("Penn State Erie, The Behrend College", "https://behrend.psu.edu"),
+        ("Miami University Hamilton", "https://miamioh.edu/regionals"),
+    ])
+    def test_branch_campuses_do_not_fold_into_the_flagship(self, matcher, name, website):
+        assert matcher.match(name, website) is None
+
+    def test_flagship_does_not_fold_into_a_branch_campus(self):
+        m = NameMatcher()
+        m.add("stark", "Kent State University at Stark", "https://www.kent.edu/stark")
+        assert m.match("Kent State University", "https://www.kent.edu") is None
+        assert m.match("Kent State Univeristy at Stark", "https://www.kent.edu")[0] == "stark"
+
+    def test_saint_and_state_are_not_guessed(self):
+        m = NameMatcher()
+        m.add(1, "Saint Cloud State University")
+        assert m.match("St. Cloud State University") is None
+
+    def test_ambiguous_names_resolve_to_nothing(self):
+        m = NameMatcher()
+        m.add("mo", "Columbia College", "https://www.ccis.edu")
+        m.add("sc", "Columbia College", "https://www.columbiasc.edu")
+        assert m.match("Columbia College") is None
+        assert m.match("Columbia College", "ccis.edu") == ("mo", 1.0)
+
+    def test_remove_and_re_add(self, matcher):
+        assert matcher.remove(1)
+        assert matcher.match("Ohio State University") is None
+        matcher.add(2, "Ohio State University")
+        assert matcher.match("The Ohio State University") == (2, 1.0)
+        assert matcher.match("Ohio University") is None
+        assert len(matcher) == 4
+
+
+class TestCandidates:
+    def test_prefix_filtering_finds_every_candidate(self):
+        here = os.path.dirname(os.path.abspath(__file__))
+        with open(os.path.join(here, "college_targets.json"), encoding="utf-8") as f:
+            names = [c["name"] for c in json.load(f)["colleges"]]
+        rng = random.Random(5)
+        names += ["".join(rng.sample(n, len(n))) for n in names]  # scrambled noise
+        m = NameMatcher()
+        for i, name in enumerate(names):
+            m.add(i, name)
+        for query in ["Univ of Michigan", "Indiana University", "Kent State Univeristy", "SUNY Albany"]:
+            grams = trigrams(normalize_name(query))
+            for floor in (0.3, 0.5, 0.8):
+                expected = {i for i, name in enumerate(names)
+                            if jaccard(grams, trigrams(normalize_name(name))) >= floor}
+                assert {key for key, _ in m.candidates(query, floor)} == expected, (query, floor)
@@ -0,0 +1,72 @@
+"""
+Tests for page_archive.py record/replay.
+
+Run with: pytest test_page_archive.py -v
+"""
+
+import os
+
+from fetcher import Page
+from page_archive import PageArchive, RecordingFetcher, ReplayFetcher
+
+
+class StubFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+        self.last_error = ""
+        self.calls = 0
+
+    def fetch(self, url, timeout=None):
+        self.calls += 1
+        body = self.pages.get(url)
+        if body is None:
+            self.last_error = "HTTP 404"
+            return None
+        self.last_error = ""
+        return Page(url, 200, {"Content-Type": "text/html"}, body, "utf-8")
+
+
+def test_record_then_replay_roundtrip(tmp_path):
+    live = StubFetcher({
+        "https://a.edu/caps": b"<h1>CAPS</h1>",
+        "https://b.edu/caps": b"<h1>Counseling</h1>",
+    })
+    archive = PageArchive(str(tmp_path))
+    recorder = RecordingFetcher(live, archive)
+    recorder.fetch("https://a.edu/caps")
+    recorder.fetch("https://b.edu/caps")
+    recorder.fetch("https://a.edu/missing")
+    archive.close()
+
+    replay = ReplayFetcher(PageArchive(str(tmp_path)))
+    page = replay.fetch("https://A.edu/caps/#top")  # canonicalized lookup
+    assert page.content == b"<h1>CAPS</h1>"
+    assert page.headers["Content-Type"] == "text/html"
+
+    assert replay.fetch("https://a.edu/missing") is None
+    assert replay.last_error == "HTTP 404"
+
+    assert replay.fetch("https://never.edu/") is None
+    assert replay.last_error == "not in archive"
+
+
+def test_identical_bodies_stored_once(tmp_path):
+    body = b"<html>" + b"same page " * 200 + b"</html>"
+    live = StubFetcher({"https://a.edu/x": body, "https://a.edu/y": body})
+    archive = PageArchive(str(tmp_path))
+    recorder = RecordingFetcher(live, archive)
+    recorder.fetch("https://a.edu/x")
+    recorder.fetch("https://a.edu/y")
+    archive.close()
+
+    assert len(archive.blobs) == 1
+    assert len(archive) == 2
+    # gzip keeps the repetitive page well under its raw size
+    assert os.path.getsize(tmp_path / "pages.dat") < len(body)
+
+
+def test_recording_fetcher_exposes_live_fetcher_state(tmp_path):
+    live = StubFetcher({})
+    recorder = RecordingFetcher(live, PageArchive(str(tmp_path)))
+    recorder.fetch("https://a.edu/")
+    assert recorder.last_error == "HTTP 404"
@@ -0,0 +1,286 @@
+"""
+Tests for pipeline.py and the mhdb.py command line.
+
+Run with: pytest test_pipeline.py -v
+"""
+
+import json
+import threading
+
+import pytest
+
+import mhdb
+from fetcher import Page
+from pipeline import STREAM_STAGES, Pipeline, StageFailed, buffered, compose, stream_timings
+from simple_scraper import CollegeScraper
+
+
+def college(name, *resources, location="Columbus, Ohio"):
+    return {
+        "name": name,
+        "location": location,
+        "latitude": 40.0,
+        "longitude": -83.0,
+        "website": "https://www.example.edu",
+        "resources": list(resources),
+    }
+
+
+GOOD = {
+    "service_name": "Counseling and Psychological Services",
+    "description": "Free confidential counseling for enrolled students.",
+    "contact_phone": "614-292-5766",
+}
+DENTAL = {"service_name": "Dental Clinic", "description": "Teeth cleaning and whitening for students."}
+
+
+@pytest.fixture
+def colleges():
+    return [college("Ohio State University", GOOD, DENTAL), college("Dental College", DENTAL)]
+
+
+# ===== Pipeline =====
+
+class TestPipeline:
+    def test_stages_pass_colleges_in_memory(self, colleges, tmp_path, capsys):
+        output = tmp_path / "ui_payload.json"
+        pipeline = Pipeline(output=output, use_brotli=False)
+        result, timings = pipeline.run(["clean", "validate", "build-ui"], colleges)
+
+        assert [c["name"] for c in result] == ["Ohio State University"]
+        assert [c["service_name"] for c in result[0]["resources"]] == [GOOD["service_name"]]
+        assert [t["stage"] for t in timings] == ["clean", "validate", "build-ui"]
+        assert [(t["colleges_in"], t["colleges_out"]) for t in timings] == [(2, 1), (1, 1), (1, 1)]
+        assert all(t["ok"] and t["seconds"] >= 0 for t in timings)
+        assert [e["name"] for e in json.loads(output.read_text(encoding="utf-8"))] == ["Ohio State University"]
+        assert pipeline.ui is not None
+
+    def test_strict_validation_stops_the_run(self, tmp_path, capsys):
+        bad = [college("Ohio State University", {"service_name": "CAPS", "description": "short"})]
+        output = tmp_path / "ui_payload.json"
+        _, timings = Pipeline(output=output, strict=True).run(["validate", "build-ui"], bad)
+        assert [t["stage"] for t in timings] == ["validate"]
+        assert not timings[0]["ok"] and "1 college(s) with issues" in timings[0]["error"]
+        assert not output.exists()
+
+    def test_exiting_stage_fails_without_ending_the_process(self, colleges, capsys):
+        pipeline = Pipeline()
+
+        def importer_exits(data):
+            raise SystemExit(1)
+        pipeline.stages["import"] = importer_exits
+        _, timings = pipeline.run(["clean", "import"], colleges)
+        assert timings[-1]["error"] == "exited with status 1"
+        assert timings[-1]["colleges_out"] is None
+
+    def test_unexpected_errors_fail_the_stage_and_stop_the_run(self, colleges, capsys):
+        pipeline = Pipeline()
+
+        def api_down(data):
+            raise ConnectionError("connection refused")
+        pipeline.stages["import"] = api_down
+        _, timings = pipeline.run(["clean", "import", "publish"], colleges)
+        assert [t["stage"] for t in timings] == ["clean", "import"]
+        assert timings[-1]["error"] == "ConnectionError: connection refused"
+        assert "[FAIL] import: ConnectionError" in capsys.readouterr().out
+
+    def test_build_ui_leaves_shards_and_indexes_to_catch_up(self, colleges, tmp_path, capsys):
+        from prepare_ui_payload import main as prepare
+        from search_index import SearchIndex, index_path
+
+        source = tmp_path / "scraped.json"
+        source.write_text(json.dumps(colleges), encoding="utf-8")
+        output = tmp_path / "ui_payload.json"
+        shards = tmp_path / "ui_shards"
+        args = ["--input", str(source), "--output", str(output), "--no-brotli", "--incremental",
+                "--shards", str(shards), "--search-index"]
+        assert prepare(args) == 0
+
+        colleges[0]["resources"][0]["service_name"] = "Walk-in Wellness Center"
+        Pipeline(output=output, use_brotli=False).run(["build-ui"], colleges)
+        source.write_text(json.dumps(colleges), encoding="utf-8")
+        assert prepare(args) == 0
+
+        shard = json.loads(next((shards / "shards").glob("*.json")).read_text(encoding="utf-8"))
+        assert shard[0]["cards"][0]["title"] == "Walk-in Wellness Center"
+        assert SearchIndex.load(index_path(output)).search("wellness")
+
+    def test_publish_without_url_fails(self, colleges, capsys):
+        with pytest.raises(StageFailed):
+            Pipeline().publish(colleges)
+
+
+# ===== mhdb =====
+
+class TestMhdb:
+    def test_subcommand_runs_the_tool_with_its_own_options(self, colleges, tmp_path, capsys):
+        data = tmp_path / "data.json"
+        data.write_text(json.dumps(colleges), encoding="utf-8")
+        output = tmp_path / "ui_payload.json"
+        assert mhdb.main(["build-ui", "--input", str(data), "--output", str(output), "--no-brotli"]) == 0
+        assert len(json.loads(output.read_text(encoding="utf-8"))) == 2
+
+    def test_exit_status_is_returned(self, tmp_path, capsys):
+        data = tmp_path / "data.json"
+        data.write_text(json.dumps([college("Ohio State University")]), encoding="utf-8")
+        assert mhdb.main(["validate", str(data)]) == 1
+        assert "VALIDATION FAILED" in capsys.readouterr().out
+
+    def test_pipeline_from_input_file(self, colleges, tmp_path, capsys):
+        data = tmp_path / "data.json"
+        data.write_text(json.dumps(colleges), encoding="utf-8")
+        output = tmp_path / "ui_payload.json"
+        timings = tmp_path / "timings.json"
+        assert mhdb.main(["pipeline", "--input", str(data), "--stages", "clean", "validate", "build-ui",
+                          "--output", str(output), "--no-brotli", "--timings", str(timings)]) == 0
+        assert "PIPELINE TIMINGS" in capsys.readouterr().out
+        assert [t["stage"] for t in json.loads(timings.read_text())] == ["clean", "validate", "build-ui"]
+        assert json.loads(data.read_text(encoding="utf-8")) == colleges  # input file untouched
+
+    @pytest.mark.parametrize("argv", [
+        ["pipeline", "--stages", "clean"],                          # no scrape and no --input
+        ["pipeline", "--input", "x.json", "--stages", "bogus"],
+        ["pipeline", "--input", "x.json", "--stages", "publish"],  # no --publish-url
+        ["pipeline", "--input", "x.json", "--unknown"],
+        ["pipeline", "--stream", "--stages", "clean"],
+        ["pipeline", "--stream", "--crawl"],
+        ["pipeline", "--input", "x.json", "--batch-size", "10"],  # no --stream
+    ])
+    def test_pipeline_argument_errors(self, argv, capsys):
+        with pytest.raises(SystemExit):
+            mhdb.main(argv)
+
+
+# ===== Streaming =====
+
+CAPS_PAGE = b"""<html><body><h2>Counseling and Psychological Services</h2>
+<p>Free confidential counseling, therapy and crisis support for students dealing with anxiety,
+depression and stress. Call 614-292-5766 or email caps@example.edu to make an appointment.</p></body></html>"""
+
+
+def target(i):
+    return dict(college(f"College {i:03d}"), mental_health_urls=[f"https://c{i}.example.edu/caps"])
+
+
+class ServingFetcher:
+    def __init__(self, log):
+        self.log = log
+        self.last_error = ""
+
+    def fetch(self, url, timeout=None):
+        self.log.append(("fetch", url))
+        return Page(url, 200, {}, CAPS_PAGE)
+
+
+class FakeClient:
+    def __init__(self, log=None, existing=(), fail_on_batch=None):
+        self.log = log if log is not None else []
+        self.existing = list(existing)
+        self.fail_on_batch = fail_on_batch
+        self.batches = []
+
+    def health_check(self):
+        return True
+
+    def iter_colleges(self, fields=None):
+        return iter(self.existing)
+
+    def bulk_import(self, payloads):
+        self.batches.append([p["name"] for p in payloads])
+        self.log.append(("upload", len(payloads)))
+        if len(self.batches) == self.fail_on_batch:
+            raise RuntimeError("HTTP 500")
+        return {"message": f"{len(payloads)} imported"}
+
+
+class TestStreaming:
+    def test_first_batch_leaves_before_the_last_college_is_fetched(self, capsys):
+        log = []
+        scraper = CollegeScraper(fetcher=ServingFetcher(log))
+        client = FakeClient(log)
+        meters = compose([target(i) for i in range(20)], STREAM_STAGES, scraper, client.bulk_import,
+                         batch_size=4, prefetch=0)
+        results = list(meters[-1])
+
+        assert [len(names) for names, _ in results] == [4] * 5
+        first_upload = log.index(("upload", 4))
+        # A college is complete once the next one's first page shows up: one page of lookahead
+        assert sum(1 for entry in log[:first_upload] if entry[0] == "fetch") == 4 + 1
+        timings = stream_timings(meters)
+        assert [t["stage"] for t in timings] == list(STREAM_STAGES)
+        assert [t["colleges_out"] for t in timings] == [20] * 8 + [5]
+
+    def test_prefetch_runs_ahead_by_a_bounded_amount(self, capsys):
+        log = []
+        uploaded = threading.Event()
+        fetched_at_first_upload = []
+
+        class SlowClient(FakeClient):
+            def bulk_import(self, payloads):
+                if not uploaded.is_set():
+                    fetched_at_first_upload.append(sum(1 for e in list(log) if e[0] == "fetch"))
+                    uploaded.set()
+                return super().bulk_import(payloads)
+
+        scraper = CollegeScraper(fetcher=ServingFetcher(log))
+        client = SlowClient(log)
+        meters = compose([target(i) for i in range(30)], STREAM_STAGES, scraper, client.bulk_import,
+                         batch_size=5, prefetch=5)
+        assert sum(len(names) for names, _ in meters[-1]) == 30
+        # One batch in hand, at most `prefetch` queued, one in flight in the producer
+        assert fetched_at_first_upload[0] <= 5 + 5 + 2
+        assert "(buffer)" in [m.name for m in meters]
+
+    def test_stream_import_from_records(self, capsys):
+        records = [dict(college("The Ohio State University", GOOD), website="https://osu.edu"),
+                   dict(college("Kent State University", GOOD), website="https://kent.edu"),
+                   dict(college("Kent State University", GOOD), website="https://kent.edu"),
+                   college("No Contact", dict(GOOD, contact_phone=""))]
+        client = FakeClient(existing=[{"id": 7, "name": "Ohio State University", "website": "https://osu.edu"}])
+        timings = Pipeline(match_names=True).stream_import(iter(records), batch_size=2, client=client,
+                                                           scraper=CollegeScraper(fetcher=object()))
+
+        assert client.batches == [["Ohio State University", "Kent State University"]]
+        assert [t["stage"] for t in timings] == ["dedupe", "filter", "validate", "payload", "(buffer)",
+                                                  "batch-upload"]
+        assert all(t["ok"] for t in timings)
+        out = capsys.readouterr().out
+        assert "[MATCH] The Ohio State University -> Ohio State University" in out
+        assert "[SKIP] No Contact" in out
+
+    def test_stream_import_only_lists_matches_by_default(self, capsys):
+        records = [dict(college("The Ohio State University", GOOD), website="https://osu.edu")]
+        client = FakeClient(existing=[{"id": 7, "name": "Ohio State University", "website": "https://osu.edu"}])
+        Pipeline().stream_import(iter(records), client=client, scraper=CollegeScraper(fetcher=object()))
+
+        assert client.batches == [["The Ohio State University"]]
+        assert "[MATCH?] The Ohio State University looks like Ohio State University" in capsys.readouterr().out
+
+    def test_failed_upload_stops_the_stream(self, capsys):
+        log = []
+        client = FakeClient(log, fail_on_batch=2)
+        timings = Pipeline(match_names=False).stream_import(
+            batch_size=3, client=client, scraper=_scraper_with_targets(log, 50))
+
+        assert len(client.batches) == 2
+        assert timings[-1]["stage"] == "batch-upload"
+        assert not timings[-1]["ok"] and "batch 2 (3 colleges): HTTP 500" in timings[-1]["error"]
+        assert sum(1 for e in log if e[0] == "fetch") < 50
+        assert not any(t.name == "pipeline-prefetch" for t in threading.enumerate())
+
+    def test_buffered_reraises_producer_errors(self):
+        def broken():
+            yield 1
+            raise ValueError("boom")
+
+        got = []
+        with pytest.raises(ValueError, match="boom"):
+            for item in buffered(broken(), 2):
+                got.append(item)
+        assert got == [1]
+
+
+def _scraper_with_targets(log, n):
+    scraper = CollegeScraper(fetcher=ServingFetcher(log))
+    scraper.load_targets = lambda: [target(i) for i in range(n)]
+    return scraper
@@ -0,0 +1,235 @@
+"""
+Tests for prepare_ui_payload.py artifacts and manifest.
+
+Run with: pytest test_prepare_ui_payload.py -v
+"""
+
+import copy
+import gzip
+import hashlib
+import json
+
+from prepare_ui_payload import (
+    build_college_entry, build_ui, dirty_shards, load_state, main, manifest_path, save_state, shard_state,
+    tile_key, validate_payload, write_artifacts, write_shard_set,
+)
+
+
+COLLEGE = {
+    "name": "Ohio State University",
+    "location": "Columbus, Ohio",
+    "latitude": 40.0067,
+    "longitude": -83.0305,
+    "website": "https://www.osu.edu",
+    "resources": [{"service_name": "CAPS", "contact_email": "caps@osu.edu"}],
+}
+
+
+def test_artifacts_are_minified_hashed_and_precompressed(tmp_path):
+    ui = [build_college_entry(COLLEGE)]
+    output = tmp_path / "ui_payload.json"
+    manifest = write_artifacts(ui, output, use_brotli=False)
+
+    raw = output.read_bytes()
+    assert b"\n" not in raw
+    assert json.loads(raw) == ui
+    assert gzip.decompress((tmp_path / "ui_payload.json.gz").read_bytes()) == raw
+
+    on_disk = json.loads(manifest_path(output).read_text())
+    assert on_disk["validated"] is True
+    assert on_disk["files"]["identity"]["sha256"] == hashlib.sha256(raw).hexdigest()
+    assert on_disk["files"]["gzip"]["bytes"] == (tmp_path / "ui_payload.json.gz").stat().st_size
+    assert on_disk["etag"] == manifest["etag"]
+    assert "br" not in on_disk["files"]
+
+
+def test_identical_payload_keeps_etag(tmp_path):
+    ui = [build_college_entry(COLLEGE)]
+    first = write_artifacts(ui, tmp_path / "ui_payload.json", use_brotli=False)
+    second = write_artifacts(ui, tmp_path / "ui_payload.json", use_brotli=False)
+    assert first["etag"] == second["etag"]
+    assert first["files"]["gzip"]["sha256"] == second["files"]["gzip"]["sha256"]
+
+
+def test_invalid_cards_flagged_in_manifest(tmp_path):
+    ui = [{"name": "Broken U", "cards": [{"title": "x"}]}]
+    assert validate_payload(ui)
+    manifest = write_artifacts(ui, tmp_path / "ui_payload.json", use_brotli=False)
+    assert manifest["validated"] is False
+    assert "missing description, contact" in manifest["errors"][0]
+
+
+def _college(name, lat, lon, location):
+    return build_college_entry(dict(COLLEGE, name=name, latitude=lat, longitude=lon, location=location))
+
+
+def test_shard_set_pins_and_tiles(tmp_path):
+    ui = [
+        _college("Ohio State University", 40.0067, -83.0305, "Columbus, Ohio"),
+        _college("Ohio University", 39.3240, -82.1013, "Athens, Ohio"),
+        _college("Cornell University", 42.4534, -76.4735, "Ithaca, New York"),
+    ]
+    manifest = write_shard_set(ui, tmp_path, shard_by="tile", use_brotli=False)
+
+    pins = json.loads((tmp_path / "pins.json").read_text())
+    assert [p["name"] for p in pins] == [c["name"] for c in ui]
+    assert "cards" not in pins[0]
+    assert pins[0]["resource_count"] == 1
+
+    key = tile_key(40.0067, -83.0305)
+    assert pins[0]["shard"] == key
+    shard = json.loads((tmp_path / manifest["shards"][key]["files"]["identity"]["path"]).read_text())
+    assert {e["id"] for e in shard} == {p["id"] for p in pins if p["shard"] == key}
+    assert shard[0]["cards"][0]["title"] == "CAPS"
+
+
+def test_shard_set_by_state_removes_stale_shards(tmp_path):
+    ui = [
+        _college("Ohio State University", 40.0067, -83.0305, "Columbus, Ohio"),
+        _college("Cornell University", 42.4534, -76.4735, "Ithaca, New York"),
+    ]
+    write_shard_set(ui, tmp_path, shard_by="tile", use_brotli=False)
+    manifest = write_shard_set(ui, tmp_path, shard_by="state", use_brotli=False)
+
+    assert set(manifest["shards"]) == {"ohio", "new-york"}
+    assert sorted(p.name for p in (tmp_path / "shards").glob("*.json")) == ["new-york.json", "ohio.json"]
+
+
+# ===== Incremental builds =====
+
+def _scraped(name, lat, lon, location, service="CAPS"):
+    return dict(COLLEGE, name=name, latitude=lat, longitude=lon, location=location,
+                resources=[{"service_name": service}])
+
+
+def test_build_ui_reuses_unchanged_and_keeps_ids(tmp_path):
+    data = [
+        _scraped("Ohio State University", 40.0, -83.0, "Columbus, Ohio"),
+        _scraped("Ohio University", 39.3, -82.1, "Athens, Ohio"),
+        _scraped("Cornell University", 42.4, -76.4, "Ithaca, New York"),
+    ]
+    output = tmp_path / "ui_payload.json"
+    ui, ids, fps, report = build_ui(data)
+    assert report["added"] == [c["name"] for c in data]
+    shards = tmp_path / "ui_shards"
+    save_state(output, ui, ids, fps, shard_state(ui, fps, shards, "tile", 2.0))
+
+    edited = copy.deepcopy(data)
+    edited[1]["resources"][0]["service_name"] = "Counseling"
+    del edited[0]
+    edited.append(_scraped("Miami University", 39.5, -84.7, "Oxford, Ohio"))
+
+    state = load_state(output)
+    ui2, ids2, fps2, report2 = build_ui(edited, state, ui)
+    assert report2["changed"] == ["Ohio University"]
+    assert report2["removed"] == ["Ohio State University"]
+    assert report2["added"] == ["Miami University"]
+    assert report2["reused"] == 1
+    # Surviving colleges keep their ids; new ones never reuse a removed id
+    assert ids2 == [1, 2, 3]
+    assert ui2[1] is ui[2]
+
+    dirty = dirty_shards(ui2, fps2, state["shards"], shards, "tile", 2.0)
+    assert dirty == {tile_key(40.0, -83.0), tile_key(39.3, -82.1), tile_key(39.5, -84.7)}
+    assert dirty_shards(ui2, fps2, state["shards"], shards, "state", None) is None
+    assert dirty_shards(ui2, fps2, state["shards"], tmp_path / "elsewhere", "tile", 2.0) is None
+
+
+def test_incremental_main_skips_unchanged_and_splices_changes(tmp_path, capsys):
+    data = [
+        _scraped("Ohio State University", 40.0, -83.0, "Columbus, Ohio"),
+        _scraped("Cornell University", 42.4, -76.4, "Ithaca, New York"),
+    ]
+    source = tmp_path / "scraped.json"
+    source.write_text(json.dumps(data))
+    output = tmp_path / "ui_payload.json"
+    shards = tmp_path / "ui_shards"
+    args = ["--input", str(source), "--output", str(output), "--shards", str(shards), "--no-brotli"]
+
+    assert main(args) == 0
+    ny_shard = shards / "shards" / f"{tile_key(42.4, -76.4)}.json"
+    ny_mtime = ny_shard.stat().st_mtime_ns
+
+    assert main(args + ["--incremental"]) == 0
+    assert "nothing written" in capsys.readouterr().out
+
+    data[0]["resources"][0]["service_name"] = "Counseling and Consultation Service"
+    source.write_text(json.dumps(data))
+    assert main(args + ["--incremental"]) == 0
+
+    payload = json.loads(output.read_text())
+    assert payload[0]["cards"][0]["title"] == "Counseling and Consultation Service"
+    assert ny_shard.stat().st_mtime_ns == ny_mtime
+    manifest = json.loads((shards / "manifest.json").read_text())
+    assert set(manifest["shards"]) == {tile_key(40.0, -83.0), tile_key(42.4, -76.4)}
+
+
+def test_shards_catch_up_with_changes_made_by_runs_without_shards(tmp_path, capsys):
+    data = [
+        _scraped("Ohio State University", 40.0, -83.0, "Columbus, Ohio"),
+        _scraped("Cornell University", 42.4, -76.4, "Ithaca, New York"),
+    ]
+    source = tmp_path / "scraped.json"
+    source.write_text(json.dumps(data))
+    output = tmp_path / "ui_payload.json"
+    shards = tmp_path / "ui_shards"
+    args = ["--input", str(source), "--output", str(output), "--no-brotli", "--incremental"]
+    assert main(args + ["--shards", str(shards), "--search-index"]) == 0
+
+    data[0]["resources"][0]["service_name"] = "Counseling and Consultation Service"
+    source.write_text(json.dumps(data))
+    assert main(args) == 0
+    capsys.readouterr()
+
+    assert main(args + ["--shards", str(shards), "--search-index"]) == 0
+    assert "nothing written" not in capsys.readouterr().out
+    ohio = json.loads((shards / "shards" / f"{tile_key(40.0, -83.0)}.json").read_text())
+    assert ohio[0]["cards"][0]["title"] == "Counseling and Consultation Service"
+
+
+def test_indexes_built_from_an_older_payload_are_rebuilt(tmp_path, capsys):
+    from search_index import SearchIndex, index_path as search_path
+    from spatial_index import index_path as spatial_path
+
+    data = [_scraped("Ohio State University", 40.0, -83.0, "Columbus, Ohio")]
+    source = tmp_path / "scraped.json"
+    source.write_text(json.dumps(data))
+    output = tmp_path / "ui_payload.json"
+    args = ["--input", str(source), "--output", str(output), "--no-brotli", "--incremental"]
+    assert main(args + ["--search-index", "--spatial-index"]) == 0
+
+    data.append(_scraped("Kenyon College", 40.4, -82.4, "Gambier, Ohio", service="Wellness"))
+    source.write_text(json.dumps(data))
+    assert main(args) == 0
+    spatial_mtime = spatial_path(output).stat().st_mtime_ns
+
+    assert main(args + ["--search-index", "--spatial-index"]) == 0
+    assert [hit["college"] for hit in SearchIndex.load(search_path(output)).search("wellness")] == ["Kenyon College"]
+    assert spatial_path(output).stat().st_mtime_ns != spatial_mtime
+    assert len(json.loads(spatial_path(output).read_text())["points"]) == 2
+
+    capsys.readouterr()
+    assert main(args + ["--search-index", "--spatial-index"]) == 0
+    assert "nothing written" in capsys.readouterr().out
+
+
+def test_incremental_writes_requested_indexes_that_are_missing(tmp_path, capsys):
+    from search_index import index_path as search_path
+    from spatial_index import index_path as spatial_path
+
+    source = tmp_path / "scraped.json"
+    source.write_text(json.dumps([_scraped("Ohio State University", 40.0, -83.0, "Columbus, Ohio")]))
+    output = tmp_path / "ui_payload.json"
+    args = ["--input", str(source), "--output", str(output), "--no-brotli", "--incremental"]
+    assert main(args) == 0
+    payload_mtime = output.stat().st_mtime_ns
+
+    assert main(args + ["--search-index", "--spatial-index"]) == 0
+    assert "writing out-of-date shards and indexes only" in capsys.readouterr().out
+    assert search_path(output).exists() and spatial_path(output).exists()
+    assert output.stat().st_mtime_ns == payload_mtime
+
+    search_mtime = search_path(output).stat().st_mtime_ns
+    assert main(args + ["--search-index", "--spatial-index"]) == 0
+    assert "nothing written" in capsys.readouterr().out
+    assert search_path(output).stat().st_mtime_ns == search_mtime
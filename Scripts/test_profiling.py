@@ -0,0 +1,157 @@
+"""
+Tests for profiling.py and the --profile option of the entry points.
+
+Run with: pytest test_profiling.py -v
+"""
+
+import json
+import pstats
+
+import pytest
+
+import prepare_ui_payload
+import simple_scraper
+import validate_data
+from _html_compat import BeautifulSoup
+from profiling import Profiler
+from simple_scraper import CollegeScraper
+
+CAPS_PAGE = """<html><body><h2>Counseling and Psychological Services</h2>
+<p>Free confidential counseling, therapy and crisis support for students dealing with anxiety,
+depression and stress. Call 614-292-5766 or email caps@example.edu to make an appointment.</p></body></html>"""
+
+
+def build_list(n):
+    return [str(i) * 10 for i in range(n)]
+
+
+def run_dir_of(parent):
+    (run_dir,) = parent.iterdir()
+    return run_dir
+
+
+# ===== Profiler =====
+
+class TestProfiler:
+    def test_stage_writes_profile_and_allocations(self, tmp_path, capsys):
+        profiler = Profiler(tmp_path / "run", top=5)
+        with profiler.stage("build"):
+            kept = build_list(20000)
+        assert profiler.close() == tmp_path / "run"
+
+        summary = json.loads((tmp_path / "run" / "profile.json").read_text(encoding="utf-8"))
+        (stage,) = summary["stages"]
+        assert stage["stage"] == "build" and stage["error"] is None
+        assert stage["files"] == ["01-build.prof", "01-build.alloc.txt"]
+        assert stage["peak_kib"] > 0
+        stats = pstats.Stats(str(tmp_path / "run" / "01-build.prof"))
+        assert any(func[2] == "build_list" for func in stats.stats)
+        alloc = (tmp_path / "run" / "01-build.alloc.txt").read_text(encoding="utf-8").splitlines()
+        assert alloc[0].startswith("Top 5 allocation sites for stage build")
+        assert len(alloc) <= 2 + 5
+        assert "test_profiling.py" in alloc[2]
+        assert "[PROFILE]" in capsys.readouterr().out
+        assert kept
+
+    def test_failed_stage_is_recorded(self, tmp_path, capsys):
+        profiler = Profiler(tmp_path)
+        with pytest.raises(ValueError):
+            with profiler.stage("load"):
+                raise ValueError("bad file")
+        profiler.close()
+        assert profiler.stages[0]["error"] == "ValueError: bad file"
+
+    def test_disabled_profiler_writes_nothing(self, tmp_path):
+        profiler = Profiler()
+        with profiler.stage("build"):
+            build_list(10)
+        assert profiler.close() is None
+        assert profiler.stages == []
+
+    def test_sampled_extract_resources(self, tmp_path, capsys):
+        scraper = CollegeScraper(fetcher=object())
+        profiler = Profiler(tmp_path, sample=0.5, seed=1)
+        profiler.wrap_extract(scraper)
+        with profiler.stage("scrape"):
+            results = [scraper.extract_resources(BeautifulSoup(CAPS_PAGE, "html.parser"), f"https://x.edu/{i}")
+                       for i in range(40)]
+        profiler.close()
+
+        assert all(len(r) == 1 for r in results)
+        sampled = json.loads((tmp_path / "profile.json").read_text(encoding="utf-8"))["extract_resources"]
+        assert 5 < sampled["pages"] < 35
+        assert sampled["files"] == ["extract_resources.prof"]
+        assert all(s["url"].startswith("https://x.edu/") for s in sampled["samples"])
+        extract = pstats.Stats(str(tmp_path / "extract_resources.prof")).stats
+        calls = [v[1] for k, v in extract.items() if k[2] == "extract_resources"]
+        assert calls == [sampled["pages"]]
+        # Sampled calls are profiled once, in extract_resources.prof only
+        stage = pstats.Stats(str(tmp_path / "01-scrape.prof")).stats
+        assert [v[1] for k, v in stage.items() if k[2] == "extract_resources"] == [40 - sampled["pages"]]
+
+
+# ===== Entry points =====
+
+class TestEntryPoints:
+    def test_prepare_ui_payload(self, tmp_path, capsys):
+        data = tmp_path / "scraped.json"
+        data.write_text(json.dumps([{
+            "name": "Ohio State University", "location": "Columbus, Ohio", "latitude": 40.0, "longitude": -83.0,
+            "website": "https://osu.edu",
+            "resources": [{"service_name": "CAPS", "description": "Free confidential counseling for students.",
+                           "contact_phone": "614-292-5766"}],
+        }]), encoding="utf-8")
+        profiles = tmp_path / "profiles"
+        assert prepare_ui_payload.main(["--input", str(data), "--output", str(tmp_path / "ui.json"),
+                                        "--no-brotli", "--search-index", "--profile", str(profiles)]) == 0
+        run_dir = run_dir_of(profiles)
+        assert run_dir.name.startswith("prepare_ui_payload-")
+        summary = json.loads((run_dir / "profile.json").read_text(encoding="utf-8"))
+        assert [s["stage"] for s in summary["stages"]] == ["load", "build", "write", "search-index", "save-state"]
+        assert (run_dir / "03-write.prof").exists()
+
+    def test_simple_scraper_writes_the_profile_when_the_scrape_fails(self, tmp_path, monkeypatch, capsys):
+        targets = tmp_path / "college_targets.json"
+        targets.write_text(json.dumps({"states": [], "colleges": []}), encoding="utf-8")
+        monkeypatch.setattr(simple_scraper, "TARGETS_FILE", str(targets))
+
+        def fail(self, targets=None):
+            raise RuntimeError("network down")
+        monkeypatch.setattr(CollegeScraper, "scrape_all", fail)
+        profiles = tmp_path / "profiles"
+        with pytest.raises(RuntimeError):
+            simple_scraper.main(["--ignore-schedule", "--profile", str(profiles)])
+
+        summary = json.loads((run_dir_of(profiles) / "profile.json").read_text(encoding="utf-8"))
+        assert summary["stages"][0]["error"] == "RuntimeError: network down"
+
+    def test_validate_data(self, tmp_path, capsys):
+        data = tmp_path / "colleges.json"
+        data.write_text("[]", encoding="utf-8")
+        profiles = tmp_path / "profiles"
+        validate_data.main([str(data), "--profile", str(profiles)])
+        summary = json.loads((run_dir_of(profiles) / "profile.json").read_text(encoding="utf-8"))
+        assert [s["stage"] for s in summary["stages"]] == ["validate-colleges"]
+
+    def test_validate_data_writes_the_profile_when_validation_fails(self, tmp_path, monkeypatch, capsys):
+        def fail(path, result):
+            raise ValueError("bad record")
+        monkeypatch.setattr(validate_data, "validate_data_file", fail)
+        data = tmp_path / "colleges.json"
+        data.write_text("[]", encoding="utf-8")
+        profiles = tmp_path / "profiles"
+        with pytest.raises(ValueError):
+            validate_data.main([str(data), "--profile", str(profiles)])
+        summary = json.loads((run_dir_of(profiles) / "profile.json").read_text(encoding="utf-8"))
+        assert summary["stages"][0]["error"] == "ValueError: bad record"
+
+    def test_without_profile_nothing_is_written(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        data = tmp_path / "colleges.json"
+        data.write_text("[]", encoding="utf-8")
+        validate_data.main([str(data)])
+        assert not (tmp_path / "profiles").exists()
+
+    def test_sample_fraction_is_checked(self, capsys):
+        with pytest.raises(SystemExit):
+            validate_data.main(["--profile", "--profile-sample", "2"])
@@ -0,0 +1,156 @@
+"""
+Tests for publish_to_api.py delta publishing and batching.
+
+Run with: pytest test_publish_to_api.py -v
+"""
+
+import json
+
+from publish_to_api import load_publish_state, make_batches, plan_delta, publish
+
+URL = "https://app.example.com/api/resources/bulk"
+
+
+def decode(data):
+    return json.loads(data)
+
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.text = ""
+
+
+class FakeSession:
+    """Records POST bodies; fails every attempt at a batch holding a fail_names college."""
+
+    def __init__(self, fail_names=()):
+        self.fail_names = set(fail_names)
+        self.posts = []
+
+    def post(self, url, json=None, data=None, headers=None, timeout=None):
+        body = json if data is None else decode(data)
+        self.posts.append((url, body))
+        if url.endswith("/bulk") and any(c["name"] in self.fail_names for c in body):
+            return FakeResponse(500)
+        return FakeResponse(200)
+
+    def sent_names(self):
+        return [c["name"] for url, body in self.posts if url.endswith("/bulk") for c in body]
+
+
+def college(name, desc="Counseling"):
+    return {
+        "name": name,
+        "location": "Columbus, Ohio",
+        "website": "https://example.edu",
+        "scraped_at": "2026-01-01T00:00:00",
+        "cards": [{"title": "CAPS", "description": desc}],
+    }
+
+
+def run(payload, state_file, session, **kwargs):
+    kwargs.setdefault("delete_url", URL + "/delete")
+    return publish(payload, URL, {}, state_file, retries=2, session=session,
+                   sleep=lambda s: None, **kwargs)
+
+
+# ===== Planning / batching =====
+
+class TestPlanning:
+    def test_scraped_at_alone_is_not_a_change(self):
+        _, _, hashes = plan_delta([college("A")], {})
+        moved = college("A")
+        moved["scraped_at"] = "2026-06-01T00:00:00"
+        changed, removed, _ = plan_delta([moved], hashes)
+        assert changed == [] and removed == []
+
+    def test_batches_respect_size_and_count(self):
+        items = [(f"C{i}", college(f"C{i}", "x" * 100)) for i in range(10)]
+        batches = list(make_batches(items, max_bytes=600, max_count=3))
+        assert all(len(keys) <= 3 for keys, _ in batches)
+        assert all(len(body) <= 600 for _, body in batches)
+        assert [k for keys, _ in batches for k in keys] == [k for k, _ in items]
+        assert json.loads(batches[0][1])[0]["name"] == "C0"
+
+    def test_oversized_entry_goes_alone(self):
+        items = [("A", college("A")), ("Big", college("Big", "x" * 5000)), ("B", college("B"))]
+        batches = [keys for keys, _ in make_batches(items, max_bytes=1000)]
+        assert ["Big"] in batches
+
+
+# ===== Publishing =====
+
+class TestPublish:
+    def test_second_run_sends_only_changes(self, tmp_path):
+        state = tmp_path / "ui_payload.publish.json"
+        payload = [college("A"), college("B"), college("C")]
+        session = FakeSession()
+        run(payload, state, session)
+        assert session.sent_names() == ["A", "B", "C"]
+
+        payload[1] = college("B", "New hours")
+        session = FakeSession()
+        summary = run(payload, state, session)
+        assert session.sent_names() == ["B"]
+        assert summary["unchanged"] == 2
+
+    def test_removed_colleges_are_deleted(self, tmp_path):
+        state = tmp_path / "ui_payload.publish.json"
+        run([college("A"), college("Gone")], state, FakeSession())
+
+        session = FakeSession()
+        summary = run([college("A")], state, session)
+        assert session.posts == [(URL + "/delete", ["Gone"])]
+        assert summary["removed"] == 1
+        assert "Gone" not in load_publish_state(state, URL)
+
+    def test_repeated_name_is_deleted_once_gone_entirely(self, tmp_path):
+        state = tmp_path / "ui_payload.publish.json"
+        run([college("A"), college("Gone"), college("Gone", "Second campus")], state, FakeSession())
+
+        session = FakeSession()
+        summary = run([college("A")], state, session)
+        assert session.posts == [(URL + "/delete", ["Gone"])]
+        assert summary["removed"] == 2
+        assert set(load_publish_state(state, URL)) == {"A"}
+
+    def test_removed_repeat_of_a_remaining_name_is_resent_not_deleted(self, tmp_path):
+        state = tmp_path / "ui_payload.publish.json"
+        run([college("A"), college("A", "Second campus")], state, FakeSession())
+
+        session = FakeSession()
+        summary = run([college("A")], state, session)
+        assert [url for url, _ in session.posts] == [URL]
+        assert session.sent_names() == ["A"]
+        assert summary["removed"] == 1
+        assert set(load_publish_state(state, URL)) == {"A"}
+
+        session = FakeSession()
+        run([college("A")], state, session)
+        assert session.posts == []
+
+    def test_failed_batch_is_retried_next_run_only(self, tmp_path):
+        state = tmp_path / "ui_payload.publish.json"
+        payload = [college("A"), college("B"), college("C")]
+        session = FakeSession(fail_names={"B"})
+        summary = run(payload, state, session, max_count=1)
+        assert summary["failed_batches"] == 1
+        assert summary["sent"] == 2
+        assert set(load_publish_state(state, URL)) == {"A", "C"}
+
+        session = FakeSession()
+        run(payload, state, session, max_count=1)
+        assert session.sent_names() == ["B"]
+
+    def test_state_is_per_target_url(self, tmp_path):
+        state = tmp_path / "ui_payload.publish.json"
+        run([college("A")], state, FakeSession())
+        assert load_publish_state(state, "https://staging.example.com/api/resources/bulk") == {}
+
+    def test_dry_run_sends_nothing(self, tmp_path):
+        state = tmp_path / "ui_payload.publish.json"
+        session = FakeSession()
+        run([college("A")], state, session, dry_run=True)
+        assert session.posts == []
+        assert not state.exists()
@@ -0,0 +1,140 @@
+"""
+Tests for rescrape_schedule.py and its use in CollegeScraper.scrape_all.
+
+Run with: pytest test_rescrape_schedule.py -v
+"""
+
+import json
+
+import simple_scraper
+from fetcher import Page
+from rescrape_schedule import DAY, MAX_INTERVAL, MIN_INTERVAL, RescrapeSchedule
+from simple_scraper import CollegeScraper
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+RES_A = [{"service_name": "Counseling Center", "contact_phone": "555-0100"}]
+RES_B = [{"service_name": "Counseling Center", "contact_phone": "555-0199"}]
+
+
+# ===== Interval adaptation =====
+
+class TestSchedule:
+    def test_unknown_url_is_due(self):
+        assert RescrapeSchedule(path=None).is_due("https://a.edu/caps")
+
+    def test_stable_page_backs_off_exponentially(self):
+        clock = FakeClock()
+        schedule = RescrapeSchedule(path=None, clock=clock)
+        schedule.observe("u", RES_A)
+        intervals = []
+        for _ in range(4):
+            clock.now += schedule.urls["u"]["interval"]
+            assert not schedule.observe("u", RES_A)
+            intervals.append(schedule.urls["u"]["interval"])
+        assert intervals == [2 * DAY, 4 * DAY, 8 * DAY, 16 * DAY]
+        for _ in range(5):
+            schedule.observe("u", RES_A)
+        assert schedule.urls["u"]["interval"] == MAX_INTERVAL
+
+    def test_change_tightens_interval(self):
+        clock = FakeClock()
+        schedule = RescrapeSchedule(path=None, clock=clock)
+        for _ in range(4):
+            schedule.observe("u", RES_A)
+        before = schedule.urls["u"]["interval"]
+        assert schedule.observe("u", RES_B)
+        assert schedule.urls["u"]["interval"] == before / 2
+        assert schedule.urls["u"]["last_changed"] == clock.now
+
+    def test_resource_order_is_not_a_change(self):
+        schedule = RescrapeSchedule(path=None)
+        schedule.observe("u", RES_A + RES_B)
+        assert not schedule.observe("u", RES_B + RES_A)
+
+    def test_failure_retries_after_min_interval(self):
+        clock = FakeClock()
+        schedule = RescrapeSchedule(path=None, clock=clock)
+        for _ in range(5):
+            schedule.observe("u", RES_A)
+        interval = schedule.urls["u"]["interval"]
+        schedule.observe_failure("u")
+        assert schedule.urls["u"]["next_due"] == clock.now + MIN_INTERVAL
+        assert schedule.urls["u"]["interval"] == interval
+
+    def test_save_and_reload(self, tmp_path):
+        path = str(tmp_path / "schedule.json")
+        schedule = RescrapeSchedule(path=path)
+        schedule.observe("u", RES_A)
+        assert schedule.save()
+        assert not RescrapeSchedule(path=path).is_due("u")
+
+
+# ===== scrape_all integration =====
+
+class CountingFetcher:
+    def __init__(self):
+        self.urls = []
+        self.last_error = ""
+
+    def fetch(self, url, timeout=None):
+        self.urls.append(url)
+        return Page(url, 200, {}, b"<html><body><h1>Counseling Center</h1></body></html>")
+
+
+def test_scrape_all_skips_targets_not_due(tmp_path, monkeypatch):
+    monkeypatch.setattr(simple_scraper, "OUTPUT_FILE", str(tmp_path / "missing.json"))
+    targets = [{
+        "name": "Alpha University", "location": "Columbus, Ohio", "latitude": 40.0,
+        "longitude": -83.0, "website": "https://alpha.edu",
+        "mental_health_urls": ["https://alpha.edu/caps"],
+    }]
+    clock = FakeClock()
+    schedule = RescrapeSchedule(path=None, clock=clock)
+
+    fetcher = CountingFetcher()
+    CollegeScraper(fetcher=fetcher, schedule=schedule).scrape_all(targets)
+    assert fetcher.urls == ["https://alpha.edu/caps"]
+
+    # Not due: last saved results are carried over without fetching
+    previous = [{"name": "Alpha University", "resources": RES_A}]
+    output = tmp_path / "scraped.json"
+    output.write_text(json.dumps(previous), encoding="utf-8")
+    monkeypatch.setattr(simple_scraper, "OUTPUT_FILE", str(output))
+    fetcher = CountingFetcher()
+    scraper = CollegeScraper(fetcher=fetcher, schedule=schedule)
+    assert scraper.scrape_all(targets) == previous
+    assert fetcher.urls == []
+    assert scraper.stats["not_due"] == 1
+
+    clock.now += MIN_INTERVAL
+    fetcher = CountingFetcher()
+    CollegeScraper(fetcher=fetcher, schedule=schedule).scrape_all(targets)
+    assert fetcher.urls == ["https://alpha.edu/caps"]
+
+
+def test_not_due_target_without_saved_results_is_scraped(tmp_path, monkeypatch):
+    output = tmp_path / "scraped.json"
+    output.write_text(json.dumps([{"name": "Other University", "resources": RES_A}]), encoding="utf-8")
+    monkeypatch.setattr(simple_scraper, "OUTPUT_FILE", str(output))
+    targets = [{
+        "name": "Alpha University", "location": "Columbus, Ohio", "latitude": 40.0,
+        "longitude": -83.0, "website": "https://alpha.edu",
+        "mental_health_urls": ["https://alpha.edu/caps"],
+    }]
+    schedule = RescrapeSchedule(path=None, clock=FakeClock())
+    schedule.observe("https://alpha.edu/caps", RES_A)
+    assert not schedule.is_due("https://alpha.edu/caps")
+
+    fetcher = CountingFetcher()
+    scraper = CollegeScraper(fetcher=fetcher, schedule=schedule)
+    scraper.scrape_all(targets)
+    assert fetcher.urls == ["https://alpha.edu/caps"]
+    assert scraper.stats["not_due"] == 0
@@ -0,0 +1,142 @@
+"""
+Tests for search_index.py.
+
+Run with: pytest test_search_index.py -v
+"""
+
+import json
+import math
+import random
+
+from prepare_ui_payload import main as prepare_main
+from search_index import SearchIndex, build_index, index_path, main, tokenize, write_index
+
+
+def card(title, description="", office_hours="", freshman_notes=""):
+    return {
+        "title": title,
+        "description": description,
+        "meta": {"location": "", "office_hours": office_hours, "freshman_notes": freshman_notes},
+    }
+
+
+UI = [
+    {"name": "Alpha College", "cards": [
+        card("Counseling Center", "Individual and group therapy.", "Mon-Fri 8am-5pm"),
+        card("Crisis Line", "24/7 crisis support by phone."),
+    ]},
+    {"name": "Beta University", "cards": [
+        card("Wellness Office", "Peer support groups and crisis counseling.",
+             freshman_notes="First-year students get a free intake."),
+    ]},
+]
+
+
+def brute_force(data, query, limit, k1=1.2, b=0.75):
+    """Score every card directly from the serialized postings."""
+    n = len(data["docs"])
+    avgdl = sum(data["lengths"]) / n
+    scores = {}
+    for term in dict.fromkeys(tokenize(query)):
+        flat = data["terms"].get(term, [])
+        df = len(flat) // 2
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for i in range(0, len(flat), 2):
+            doc, tf = flat[i], flat[i + 1]
+            norm = k1 * (1 - b + b * data["lengths"][doc] / avgdl)
+            scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [round(score, 4) for _, score in ranked]
+
+
+# ===== Tokenizing and ranking =====
+
+class TestSearch:
+    def test_tokenize_drops_punctuation_and_stopwords(self):
+        assert tokenize("24/7 Crisis-support for the Students!") == ["24", "7", "crisis", "support", "students"]
+
+    def test_service_name_hit_outranks_description_hit(self):
+        hits = SearchIndex.from_payload(UI).search("crisis")
+        assert [(h["college"], h["title"]) for h in hits] == [
+            ("Alpha College", "Crisis Line"), ("Beta University", "Wellness Office")]
+
+    def test_hits_point_back_at_payload_cards(self):
+        hit = SearchIndex.from_payload(UI).search("free intake")[0]
+        assert UI[hit["college_index"]]["cards"][hit["card"]]["title"] == hit["title"] == "Wellness Office"
+
+    def test_unknown_terms_and_empty_queries(self):
+        index = SearchIndex.from_payload(UI)
+        assert index.search("zebra") == []
+        assert index.search("the and") == []
+        assert index.search("crisis", limit=0) == []
+
+    def test_prefix_expands_last_word_only(self):
+        index = SearchIndex.from_payload(UI)
+        assert index.query_terms("peer coun", prefix=True) == ["peer", "counseling"]
+        assert index.query_terms("peer coun ", prefix=True) == ["peer", "coun"]
+        assert [h["title"] for h in index.search("wellness thera", prefix=True)] == [
+            "Wellness Office", "Counseling Center"]
+
+    def test_early_termination_matches_exhaustive_scoring(self):
+        rng = random.Random(7)
+        words = ["counseling", "crisis", "peer", "support", "therapy", "group", "walk", "hours",
+                 "anxiety", "intake"] + [f"w{i}" for i in range(200)]
+        ui = [{"name": f"C{c}", "cards": [
+            card(" ".join(rng.choices(words[:10], k=2)), " ".join(rng.choices(words, k=rng.randint(3, 40))))
+            for _ in range(20)]} for c in range(100)]
+        data = build_index(ui)
+        for k1, b in [(1.2, 0.75), (2.0, 0.1)]:  # stored order, then re-sorted at query time
+            index = SearchIndex(data, k1=k1, b=b)
+            for query in ["counseling", "crisis support", "peer therapy anxiety w3", "w150 group walk hours"]:
+                for limit in (1, 10, 50):
+                    got = [h["score"] for h in index.search(query, limit)]
+                    assert got == brute_force(data, query, limit, k1, b), (query, limit, k1, b)
+
+    def test_queries_made_of_common_words_match_exhaustive_scoring(self):
+        rng = random.Random(3)
+        common = ["mental", "health", "services", "students"]
+        ui = [{"name": f"C{c}", "cards": [
+            card(" ".join(w for w in common if rng.random() < 0.5),
+                 " ".join([w for w in common if rng.random() < 0.5] + [f"w{rng.randrange(50)}"] * rng.randint(1, 9)))
+            for _ in range(20)]} for c in range(50)]
+        data = build_index(ui)
+        index = SearchIndex(data)
+        for query in ["mental health services students", "health students", "mental w7"]:
+            for limit in (1, 10, 50):
+                got = [h["score"] for h in index.search(query, limit)]
+                assert got == brute_force(data, query, limit), (query, limit)
+
+
+# ===== Files and CLI =====
+
+class TestIndexFile:
+    def test_write_and_load_round_trip(self, tmp_path):
+        path = index_path(tmp_path / "ui_payload.json")
+        assert path.name == "ui_payload.search.json"
+        write_index(build_index(UI), path, use_brotli=False)
+        assert b"\n" not in path.read_bytes()
+        assert (tmp_path / "ui_payload.search.json.gz").exists()
+        assert SearchIndex.load(path).search("crisis")[0]["title"] == "Crisis Line"
+
+    def test_postings_are_stored_best_first(self):
+        data = build_index(UI)
+        # "crisis" is in docs 1 and 2; title hits count double
+        assert data["terms"]["crisis"] == [1, 3, 2, 1]
+        assert (data["k1"], data["b"]) == (1.2, 0.75)
+
+    def test_prepare_ui_payload_writes_index_and_cli_queries_it(self, tmp_path, capsys):
+        scraped = tmp_path / "scraped.json"
+        scraped.write_text(json.dumps([{
+            "name": "Ohio State University",
+            "location": "Columbus, Ohio",
+            "resources": [{"service_name": "Counseling and Consultation Service",
+                           "description": "Walk-in crisis appointments."}],
+        }]), encoding="utf-8")
+        output = tmp_path / "ui_payload.json"
+        assert prepare_main(["--input", str(scraped), "--output", str(output),
+                             "--no-brotli", "--search-index"]) == 0
+        capsys.readouterr()
+
+        assert main(["query", "walk-in", "--index", str(index_path(output)), "--json"]) == 0
+        hits = json.loads(capsys.readouterr().out)
+        assert [(h["college"], h["card"]) for h in hits] == [("Ohio State University", 0)]
@@ -0,0 +1,110 @@
+"""
+Tests for snapshot_diff.py.
+
+Run with: pytest test_snapshot_diff.py -v
+"""
+
+import copy
+import json
+
+import pytest
+
+from snapshot_diff import diff_snapshots, iter_snapshot, main, summarize
+
+
+def college(name, *services, **extra):
+    data = {
+        "name": name,
+        "location": "Columbus, Ohio",
+        "website": f"https://{name.split()[0].lower()}.edu",
+        "resources": [{"service_name": s, "description": f"{s} for students.", "contact_phone": ""}
+                      for s in services],
+        "scraped_at": "2026-03-01T00:00:00",
+    }
+    data.update(extra)
+    return data
+
+
+OLD = [
+    college("Alpha College", "Counseling Center", "Crisis Line"),
+    college("Beta University", "Wellness"),
+    college("Gamma College", "Counseling Center"),
+]
+
+
+def write_json(path, colleges):
+    path.write_text(json.dumps(colleges, indent=2), encoding="utf-8")
+    return str(path)
+
+
+def write_ndjson(path, colleges):
+    path.write_text("".join(json.dumps(c) + "\n" for c in colleges), encoding="utf-8")
+    return str(path)
+
+
+# ===== Reading =====
+
+class TestIterSnapshot:
+    @pytest.mark.parametrize("chunk_size", [7, 64, 1 << 16])
+    def test_json_array_streams_across_chunk_boundaries(self, tmp_path, chunk_size):
+        path = write_json(tmp_path / "a.json", OLD)
+        assert list(iter_snapshot(path, chunk_size)) == OLD
+
+    def test_ndjson_and_empty_array(self, tmp_path):
+        assert list(iter_snapshot(write_ndjson(tmp_path / "a.ndjson", OLD))) == OLD
+        assert list(iter_snapshot(write_json(tmp_path / "e.json", []))) == []
+
+    def test_truncated_array_is_an_error(self, tmp_path):
+        path = tmp_path / "bad.json"
+        path.write_text(json.dumps(OLD)[:-40], encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(iter_snapshot(str(path), 16))
+
+
+# ===== Diffing =====
+
+class TestDiff:
+    def test_added_removed_and_field_level_changes(self, tmp_path):
+        new = copy.deepcopy(OLD)
+        new[0]["location"] = "Dublin, Ohio"
+        new[0]["resources"][0]["contact_phone"] = "614-555-0100"
+        new[0]["resources"][1:] = [{"service_name": "Peer Support", "description": "Peer mentors."}]
+        del new[1]
+        new.append(college("Delta College", "Counseling Center"))
+
+        events = list(diff_snapshots(write_json(tmp_path / "old.json", OLD),
+                                     write_ndjson(tmp_path / "new.ndjson", new)))
+        by_op = {e["op"]: e for e in events}
+        assert [e["op"] for e in events] == ["added", "changed", "removed"]
+        assert by_op["added"]["key"] == "Delta College"
+        assert by_op["removed"]["key"] == "Beta University"
+
+        change = by_op["changed"]
+        assert change["key"] == "Alpha College"
+        assert change["fields"] == {"location": {"old": "Columbus, Ohio", "new": "Dublin, Ohio"}}
+        assert change["resources"]["added"][0]["service_name"] == "Peer Support"
+        assert change["resources"]["removed"] == ["Crisis Line"]
+        assert change["resources"]["changed"] == {
+            "Counseling Center": {"contact_phone": {"old": "", "new": "614-555-0100"}}}
+        assert summarize(events) == {"added": 1, "removed": 1, "changed": 1, "resources_added": 2,
+                                     "resources_removed": 1, "resources_changed": 1}
+
+    def test_rescrape_timestamp_alone_is_not_a_change(self, tmp_path):
+        new = [dict(c, scraped_at="2026-03-02T00:00:00") for c in OLD]
+        old_path, new_path = write_json(tmp_path / "old.json", OLD), write_json(tmp_path / "new.json", new)
+        assert list(diff_snapshots(old_path, new_path)) == []
+        assert len(list(diff_snapshots(old_path, new_path, ignore=()))) == 3
+
+    def test_repeated_names_are_keyed_by_position(self, tmp_path):
+        old = [college("Same College", "A"), college("Same College", "B")]
+        new = [college("Same College", "A"), college("Same College", "C")]
+        events = list(diff_snapshots(write_json(tmp_path / "o.json", old), write_json(tmp_path / "n.json", new)))
+        assert [(e["op"], e["key"]) for e in events] == [("changed", "Same College#1")]
+
+
+def test_cli_writes_ndjson(tmp_path):
+    old_path = write_json(tmp_path / "old.json", OLD)
+    new_path = write_json(tmp_path / "new.json", OLD[:2])
+    out = tmp_path / "diff.ndjson"
+    assert main([old_path, new_path, "--ndjson", "-o", str(out)]) == 0
+    assert [json.loads(line) for line in out.read_text().splitlines()] == [{"op": "removed", "key": "Gamma College"}]
@@ -0,0 +1,93 @@
+"""
+Tests for spatial_index.py.
+
+Run with: pytest test_spatial_index.py -v
+"""
+
+import json
+import random
+
+import pytest
+
+from prepare_ui_payload import main as prepare_main
+from spatial_index import SpatialIndex, haversine_km, index_path, main, payload_points
+
+
+def brute_force(points, lat, lon):
+    return sorted((haversine_km(lat, lon, p[1], p[2]), p[0]) for p in points)
+
+
+@pytest.fixture(scope="module")
+def campuses():
+    rng = random.Random(11)
+    return [[i, rng.uniform(25, 49), rng.uniform(-125, -67), f"C{i}"] for i in range(800)]
+
+
+# ===== Queries =====
+
+class TestQueries:
+    def test_nearest_matches_linear_scan(self, campuses):
+        index = SpatialIndex(campuses)
+        rng = random.Random(3)
+        for _ in range(40):
+            lat, lon = rng.uniform(25, 49), rng.uniform(-125, -67)
+            expected = brute_force(campuses, lat, lon)[:7]
+            got = index.nearest(lat, lon, k=7)
+            assert [cid for cid, _ in got] == [cid for _, cid in expected]
+            assert [km for _, km in got] == pytest.approx([km for km, _ in expected])
+
+    def test_within_matches_linear_scan(self, campuses):
+        index = SpatialIndex(campuses)
+        expected = [cid for km, cid in brute_force(campuses, 40.0, -83.0) if km <= 150]
+        assert [cid for cid, _ in index.within(40.0, -83.0, 150)] == expected
+        assert expected
+
+    def test_max_km_caps_nearest(self, campuses):
+        index = SpatialIndex(campuses)
+        hits = index.nearest(40.0, -83.0, k=50, max_km=100)
+        assert hits and all(km <= 100 for _, km in hits)
+        assert len(hits) == len(index.within(40.0, -83.0, 100))
+
+    def test_distances_hold_across_the_antimeridian(self):
+        index = SpatialIndex([[1, 0.0, 179.9, "East"], [2, 0.0, -179.9, "West"], [3, 0.0, 170.0, "Far"]])
+        (first, km), (second, _) = index.nearest(0.0, 179.95, k=2)
+        assert {first, second} == {1, 2}
+        assert km == pytest.approx(haversine_km(0.0, 179.95, 0.0, 179.9))
+
+    def test_empty_index_and_degenerate_queries(self):
+        assert SpatialIndex([]).nearest(40, -83, k=3) == []
+        assert SpatialIndex([[1, 40, -83, "A"]]).nearest(40, -83, k=0) == []
+        assert SpatialIndex([[1, 40, -83, "A"]]).within(40, -83, -1) == []
+
+
+# ===== Files and CLI =====
+
+class TestIndexFile:
+    def test_payload_points_skip_missing_coordinates(self):
+        ui = [{"name": "A", "latitude": 40.0, "longitude": -83.0},
+              {"name": "B", "latitude": None, "longitude": -83.0},
+              {"name": "C", "latitude": "41.5", "longitude": "-81.7"}]
+        assert payload_points(ui, ids=[10, 11, 12]) == [[10, 40.0, -83.0, "A"], [12, 41.5, -81.7, "C"]]
+
+    def test_saved_tree_order_is_reused_on_load(self, campuses, tmp_path):
+        index = SpatialIndex(campuses)
+        path = tmp_path / "ui_payload.spatial.json"
+        index.write(path, use_brotli=False)
+        loaded = SpatialIndex.load(path)
+        assert loaded.points == index.points
+        assert loaded.nearest(35.0, -90.0, k=5) == index.nearest(35.0, -90.0, k=5)
+
+    def test_prepare_ui_payload_writes_index_with_pin_ids(self, tmp_path, capsys):
+        scraped = tmp_path / "scraped.json"
+        scraped.write_text(json.dumps([
+            {"name": "Ohio State University", "latitude": 40.0067, "longitude": -83.0305, "resources": []},
+            {"name": "University of Cincinnati", "latitude": 39.1329, "longitude": -84.5150, "resources": []},
+        ]), encoding="utf-8")
+        output = tmp_path / "ui_payload.json"
+        assert prepare_main(["--input", str(scraped), "--output", str(output),
+                             "--no-brotli", "--spatial-index"]) == 0
+        capsys.readouterr()
+
+        assert SpatialIndex.load(index_path(output)).nearest(39.10, -84.51)[0][0] == 1
+        assert main(["near", "39.96", "-83.00", "--k", "1", "--index", str(index_path(output))]) == 0
+        assert "Ohio State University" in capsys.readouterr().out
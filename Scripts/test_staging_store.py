@@ -0,0 +1,186 @@
+"""
+Tests for staging_store.py.
+
+Run with: pytest test_staging_store.py -v
+"""
+
+import json
+
+import pytest
+
+import add_manual
+import clean_seed_data
+import list_schools
+from fetcher import Page
+from simple_scraper import CollegeScraper
+from staging_store import StagingFetcher, StagingStore, state_of
+
+
+def college(name, location="Columbus, Ohio", resources=1, **extra):
+    data = {
+        "name": name,
+        "location": location,
+        "latitude": 40.0,
+        "longitude": -83.0,
+        "website": "https://example.edu",
+        "resources": [
+            {"service_name": f"Service {i}", "description": "Counseling for students", "contact_phone": "555-0100"}
+            for i in range(resources)
+        ],
+        "scraped_at": "2026-01-01T00:00:00",
+    }
+    data.update(extra)
+    return data
+
+
+@pytest.fixture
+def store():
+    with StagingStore(":memory:") as s:
+        yield s
+
+
+# ===== Colleges =====
+
+class TestColleges:
+    def test_upsert_replaces_resources(self, store):
+        store.upsert_college(college("Ohio State", resources=3))
+        store.upsert_college(college("Ohio State", resources=1))
+        assert len(store.get_college("Ohio State")["resources"]) == 1
+        assert store.count("colleges") == 1
+        assert store.count("resources") == 1
+
+    def test_state_index_from_location(self, store):
+        store.upsert_colleges([college("A"), college("B", "Ann Arbor, Michigan"), college("C")])
+        assert [c["name"] for c in store.colleges(state="Ohio")] == ["A", "C"]
+        assert store.count("colleges", state="michigan") == 1
+
+    def test_delete_cascades_to_resources(self, store):
+        store.upsert_college(college("A", resources=2))
+        assert store.delete_college("A")
+        assert store.get_college("A") is None
+        assert store.count("resources") == 0
+
+    def test_failed_batch_rolls_back(self, store):
+        store.upsert_college(college("Kept"))
+        with pytest.raises(ZeroDivisionError):
+            with store.transaction():
+                store.upsert_college(college("Dropped"))
+                1 / 0
+        assert store.get_college("Dropped") is None
+        assert store.get_college("Kept") is not None
+
+
+# ===== JSON round-trip =====
+
+class TestJson:
+    def test_colleges_round_trip(self, store, tmp_path):
+        data = [college("A", state="ohio", resources=2), college("B", custom={"x": 1})]
+        data[0]["resources"][0]["unexpected"] = "kept"
+        src = tmp_path / "in.json"
+        src.write_text(json.dumps(data), encoding="utf-8")
+
+        assert store.import_colleges_json(str(src)) == 2
+        out = tmp_path / "out.json"
+        store.export_colleges_json(str(out))
+        assert json.loads(out.read_text(encoding="utf-8")) == data
+
+    def test_targets_round_trip(self, store, tmp_path):
+        targets = {
+            "description": "Targets",
+            "states": ["ohio"],
+            "colleges": [{
+                "name": "Ohio State", "state": "ohio", "location": "Columbus, Ohio",
+                "latitude": 40.0, "longitude": -83.0, "website": "https://osu.edu",
+                "mental_health_urls": ["https://ccs.osu.edu/"], "source": "scraped",
+            }],
+        }
+        src = tmp_path / "targets.json"
+        src.write_text(json.dumps(targets), encoding="utf-8")
+        store.import_targets_json(str(src))
+        out = tmp_path / "targets_out.json"
+        store.export_targets_json(str(out))
+        assert json.loads(out.read_text(encoding="utf-8")) == targets
+
+
+# ===== Fetch log =====
+
+class StubFetcher:
+    def __init__(self):
+        self.last_error = ""
+
+    def fetch(self, url, timeout=None):
+        if "missing" in url:
+            self.last_error = "HTTP 404"
+            return None
+        return Page(url, 200, {}, b"<html></html>")
+
+
+def test_staging_fetcher_logs_every_fetch(store):
+    fetcher = StagingFetcher(StubFetcher(), store)
+    fetcher.fetch("https://a.edu/caps")
+    fetcher.fetch("https://a.edu/missing")
+    assert store.fetches(url="https://a.edu/caps")[0]["bytes"] == 13
+    assert store.fetches(url="https://a.edu/missing")[0]["error"] == "HTTP 404"
+    assert fetcher.last_error == "HTTP 404"
+
+
+def test_scraper_logs_fetches_against_the_college(store, capsys):
+    scraper = CollegeScraper(fetcher=StagingFetcher(StubFetcher(), store))
+    target = {"location": "Columbus, Ohio", "latitude": 40.0, "longitude": -83.0}
+    scraper.scrape_all([
+        dict(target, name="A University", website="https://a.edu", mental_health_urls=["https://a.edu/caps"]),
+        dict(target, name="B University", website="https://b.edu", mental_health_urls=["https://b.edu/missing"]),
+    ])
+    assert [f["url"] for f in store.fetches(college="A University")] == ["https://a.edu/caps"]
+    assert [f["error"] for f in store.fetches(college="B University")] == ["HTTP 404"]
+
+
+# ===== Scripts =====
+
+class TestScripts:
+    @pytest.fixture
+    def db(self, tmp_path):
+        path = str(tmp_path / "staging.db")
+        with StagingStore(path) as s:
+            s.upsert_colleges([
+                college("Ohio State University", website="https://osu.edu"),
+                college("Univ. of Cincinnati", location="Cincinnati, Ohio", website="https://www.uc.edu"),
+            ])
+            s.upsert_targets([
+                {"name": "Ohio State University", "state": "ohio", "website": "https://osu.edu"},
+                {"name": "Kenyon College", "state": "ohio", "website": "https://kenyon.edu"},
+            ])
+        return path
+
+    def test_add_manual_replaces_the_entry_in_the_store(self, db, capsys):
+        with StagingStore(db) as s:
+            s.upsert_college(college("University of Cincinnati Blue Ash College", website="https://www.uc.edu/blueash"))
+        assert add_manual.main(["--db", db]) == 0
+        with StagingStore(db) as s:
+            assert [c["name"] for c in s.colleges()] == [
+                "Ohio State University", "University of Cincinnati Blue Ash College", "University of Cincinnati"]
+            assert len(s.get_college("University of Cincinnati")["resources"]) == 3
+
+    def test_clean_seed_data_rewrites_only_changed_colleges(self, db, capsys):
+        with StagingStore(db) as s:
+            osu = s.get_college("Ohio State University")
+            osu["resources"].append({"service_name": "Dental Clinic", "description": "Dental care for students"})
+            s.upsert_college(osu)
+            untouched = s.conn.execute("SELECT updated_at FROM colleges WHERE name LIKE 'Univ.%'").fetchone()[0]
+        assert clean_seed_data.main(["--db", db]) == 0
+        with StagingStore(db) as s:
+            assert [r["service_name"] for r in s.get_college("Ohio State University")["resources"]] == ["Service 0"]
+            assert s.conn.execute("SELECT updated_at FROM colleges WHERE name LIKE 'Univ.%'").fetchone()[0] == untouched
+        assert "Resources: 3 -> 2" in capsys.readouterr().out
+
+    def test_list_schools_reads_the_store(self, db, capsys):
+        assert list_schools.main(["--db", db]) == 0
+        out = capsys.readouterr().out
+        assert "SCRAPED (2)" in out
+        assert out.split("FAILED TO SCRAPE:")[1].strip("=\n ") == "Kenyon College (ohio)"
+
+
+def test_state_of_prefers_explicit_state():
+    assert state_of({"state": "New York", "location": "Buffalo, NY"}) == "new york"
+    assert state_of({"location": "Muncie, Indiana"}) == "indiana"
+    assert state_of({"location": ""}) is None
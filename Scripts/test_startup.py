@@ -0,0 +1,73 @@
+"""
+Tests for lazy loading of heavy dependencies and bench_startup.py.
+
+Run with: pytest test_startup.py -v
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from bench_startup import HEAVY_MODULES, main
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def loaded_after(code):
+    """HEAVY_MODULES present in sys.modules after running code in a fresh interpreter."""
+    probe = f"{code}\nimport sys\nprint(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=HERE, check=True,
+                         capture_output=True, text=True).stdout
+    return out.split()
+
+
+# ===== Lazy imports =====
+
+class TestLazyImports:
+    @pytest.mark.parametrize("module", ["simple_scraper", "importer", "publish_to_api", "distributed_scrape"])
+    def test_import_loads_no_heavy_dependency(self, module):
+        assert loaded_after(f"import {module}") == []
+
+    def test_scraper_builds_no_session_until_it_fetches(self):
+        code = ("from simple_scraper import CollegeScraper\n"
+                "scraper = CollegeScraper()\n"
+                "assert scraper.extract_email('mail caps@osu.edu now') == 'caps@osu.edu'")
+        assert loaded_after(code) == []
+
+    def test_session_and_fetcher_are_built_on_first_use(self):
+        code = ("from simple_scraper import CollegeScraper\n"
+                "scraper = CollegeScraper()\n"
+                "assert scraper.fetcher.session is scraper.session\n"
+                "assert 'MentalHealthScraper' in scraper.session.headers['User-Agent']")
+        assert "requests" in loaded_after(code)
+
+    def test_injected_fetcher_is_kept(self):
+        from simple_scraper import CollegeScraper
+
+        fetcher = object()
+        assert CollegeScraper(fetcher=fetcher).fetcher is fetcher
+
+
+# ===== Benchmark =====
+
+class TestBench:
+    def test_json_report(self, tmp_path, capsys):
+        path = tmp_path / "startup.json"
+        assert main(["--runs", "1", "--json", str(path), "validate_data", "analytics"]) == 0
+        report = json.loads(path.read_text(encoding="utf-8"))
+        assert [r["module"] for r in report["results"]] == ["validate_data", "analytics"]
+        assert report["results"][0]["help_ms"] is None
+        assert report["results"][1]["help_ms"] is not None
+        assert all(r["heavy_imports"] == [] for r in report["results"])
+        assert "validate_data" in capsys.readouterr().out
+
+    def test_max_ms_fails_slow_entry_points(self, capsys):
+        assert main(["--runs", "1", "--max-ms", "0", "simple_scraper"]) == 1
+        assert "[FAIL]" in capsys.readouterr().out
+
+    def test_unknown_entry_point(self):
+        with pytest.raises(SystemExit):
+            main(["no_such_module"])
@@ -0,0 +1,160 @@
+"""
+Tests for target_registry.py.
+
+Run with: pytest test_target_registry.py -v
+"""
+
+import json
+
+import pytest
+
+import simple_scraper
+from fetcher import Page
+from page_archive import PageArchive
+from target_registry import TargetRegistry, status_path
+
+
+def target(name, state="ohio", urls=None, **extra):
+    data = {
+        "name": name,
+        "state": state,
+        "location": f"Somewhere, {state.title()}",
+        "latitude": 40.0,
+        "longitude": -83.0,
+        "website": "https://example.edu",
+        "mental_health_urls": urls if urls is not None else [f"https://{name.lower().replace(' ', '')}.edu/caps"],
+        "source": "scraped",
+    }
+    data.update(extra)
+    return data
+
+
+@pytest.fixture
+def targets_file(tmp_path):
+    path = tmp_path / "college_targets.json"
+    path.write_text(json.dumps({
+        "description": "Test targets",
+        "states": ["ohio", "michigan"],
+        "colleges": [target("Alpha"), target("Beta", "michigan"), target("Gamma")],
+    }), encoding="utf-8")
+    return str(path)
+
+
+# ===== Upsert / delete =====
+
+class TestUpsert:
+    def test_upsert_replaces_in_place_and_appends_new(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        added, updated = registry.upsert_many([target("Beta", "michigan", source="pending"), target("Delta")])
+        assert (added, updated) == (1, 1)
+        assert [t["name"] for t in registry] == ["Alpha", "Beta", "Gamma", "Delta"]
+        assert registry.get("Beta")["source"] == "pending"
+
+    def test_unchanged_upsert_is_not_dirty(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        assert registry.upsert_many([target("Alpha")]) == (0, 0)
+        assert not registry.save()
+
+    def test_state_index_follows_moves_and_deletes(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        registry.upsert(target("Gamma", "indiana"))
+        registry.delete("Alpha")
+        assert registry.by_state("ohio") == []
+        assert [t["name"] for t in registry.by_state("Indiana")] == ["Gamma"]
+
+    def test_add_states_skips_known(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        assert registry.add_states(["ohio", "iowa"]) == ["iowa"]
+        assert registry.states == ["ohio", "michigan", "iowa"]
+
+    def test_save_round_trips(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        registry.upsert(target("Delta"))
+        registry.delete_many(["Beta"])
+        registry.save()
+        data = json.loads(open(targets_file, encoding="utf-8").read())
+        assert data["description"] == "Test targets"
+        assert [c["name"] for c in data["colleges"]] == ["Alpha", "Gamma", "Delta"]
+
+
+# ===== URL status =====
+
+class TestUrlStatus:
+    def test_failing_targets_tracks_latest_result(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        registry.record_url("https://alpha.edu/caps", ok=False, status=404, error="HTTP 404")
+        registry.record_url("https://gamma.edu/caps", ok=False, error="timeout")
+        registry.record_url("https://gamma.edu/caps", ok=True, status=200)
+        assert [t["name"] for t in registry.failing_targets()] == ["Alpha"]
+        assert registry.status_of("https://gamma.edu/caps")["last_success"] is not None
+
+    def test_min_failures_and_all_urls(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        registry.upsert(target("Two", urls=["https://two.edu/a", "https://two.edu/b"]))
+        registry.record_url("https://two.edu/a", ok=False)
+        registry.record_url("https://two.edu/a", ok=False)
+        assert [t["name"] for t in registry.failing_targets(min_failures=2)] == ["Two"]
+        assert registry.failing_targets(all_urls=True) == []
+
+    def test_status_persists_in_sidecar(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        registry.record_url("https://beta.edu/caps", ok=False, error="connection error")
+        registry.save()
+
+        assert json.loads(open(targets_file, encoding="utf-8").read())["colleges"][1]["name"] == "Beta"
+        reloaded = TargetRegistry(targets_file)
+        assert [t["name"] for t in reloaded.failing_targets()] == ["Beta"]
+        assert status_path(targets_file).endswith("college_targets.status.json")
+
+
+# ===== Fuzzy names =====
+
+class TestResolve:
+    def test_resolve_folds_spelling_variants(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        registry.upsert(target("Ohio State University", website="https://www.osu.edu"))
+        assert registry.resolve("The Ohio State University") == "Ohio State University"
+        assert registry.resolve("Ohio State Univ.", "https://ccs.osu.edu") == "Ohio State University"
+        assert registry.resolve("Ohio Northern University") is None
+
+    def test_upsert_with_match_updates_existing_target(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        registry.upsert(target("Ohio State University"))
+        added, updated = registry.upsert_many([target("The Ohio State University", source="pending")], match=True)
+        assert (added, updated) == (0, 1)
+        assert registry.get("Ohio State University")["source"] == "pending"
+        assert "The Ohio State University" not in registry
+
+    def test_deleted_targets_stop_matching(self, targets_file):
+        registry = TargetRegistry(targets_file)
+        registry.delete("Alpha")
+        assert registry.resolve("alpha") is None
+        assert registry.upsert(target("ALPHA"), match=True)
+
+
+# ===== simple_scraper --failing-only =====
+
+CAPS_PAGE = b"""<html><body><h2>Counseling and Psychological Services</h2>
+<p>Free confidential counseling, therapy and crisis support for students dealing with anxiety,
+depression and stress. Call 614-292-5766 or email caps@example.edu to make an appointment.</p></body></html>"""
+
+
+def test_failing_only_run_keeps_untouched_colleges(targets_file, tmp_path, monkeypatch, capsys):
+    registry = TargetRegistry(targets_file)
+    registry.record_url("https://beta.edu/caps", ok=False, error="timeout")
+    registry.save()
+    archive = PageArchive(str(tmp_path / "archive"))
+    archive.record("https://beta.edu/caps", Page("https://beta.edu/caps", 200, {}, CAPS_PAGE))
+    archive.close()
+    output = tmp_path / "scraped.json"
+    previous = [{"name": name, "resources": [{"service_name": "Old"}]} for name in ("Alpha", "Beta", "Gamma")]
+    output.write_text(json.dumps(previous), encoding="utf-8")
+    monkeypatch.setattr(simple_scraper, "TARGETS_FILE", targets_file)
+    monkeypatch.setattr(simple_scraper, "OUTPUT_FILE", str(output))
+
+    simple_scraper.main(["--failing-only", "--replay", str(tmp_path / "archive")])
+
+    saved = json.loads(output.read_text(encoding="utf-8"))
+    assert [c["name"] for c in saved] == ["Alpha", "Beta", "Gamma"]
+    assert saved[0] == previous[0] and saved[2] == previous[2]
+    assert saved[1]["resources"][0]["service_name"] != "Old"
@@ -0,0 +1,248 @@
+"""
+Tests for work_queue.py leases and the distributed_scrape.py worker loop.
+
+Run with: pytest test_work_queue.py -v
+"""
+
+import json
+import multiprocessing
+
+from distributed_scrape import (LeaseKeeper, ObservationLog, apply_observations, collect_observations,
+                                collect_results, enqueue_targets, main, run_worker)
+from fetcher import Page
+from rescrape_schedule import RescrapeSchedule
+from simple_scraper import CollegeScraper
+from target_registry import TargetRegistry
+from work_queue import WorkQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def targets(*names):
+    return [{"name": n, "mental_health_urls": [f"https://{n.lower()}.edu/caps"]} for n in names]
+
+
+# ===== Leases =====
+
+class TestWorkQueue:
+    def test_claims_are_exclusive_and_ordered(self, tmp_path):
+        queue = WorkQueue(str(tmp_path / "q.db"))
+        queue.enqueue(targets("A", "B"))
+        first = queue.claim("w1")
+        second = queue.claim("w2")
+        assert (first.key, second.key) == ("A", "B")
+        assert queue.claim("w3") is None
+
+    def test_enqueue_is_idempotent_unless_reset(self, tmp_path):
+        queue = WorkQueue(str(tmp_path / "q.db"))
+        assert queue.enqueue(targets("A", "B")) == 2
+        assert queue.enqueue(targets("A", "B", "C")) == 1
+        job = queue.claim("w1")
+        queue.complete(job, "w1", {"ok": True})
+        assert queue.enqueue(targets("A"), reset=True) == 1
+        assert queue.counts()["queued"] == 3
+
+    def test_expired_lease_is_requeued(self, tmp_path):
+        clock = FakeClock()
+        queue = WorkQueue(str(tmp_path / "q.db"), clock=clock)
+        queue.enqueue(targets("A"))
+        crashed = queue.claim("w1", lease_seconds=60)
+        assert queue.claim("w2", lease_seconds=60) is None
+
+        clock.now += 61
+        retry = queue.claim("w2", lease_seconds=60)
+        assert retry.key == "A" and retry.attempts == 2
+        # The crashed worker can no longer report a result
+        assert not queue.complete(crashed, "w1", {"stale": True})
+        assert queue.complete(retry, "w2", {"fresh": True})
+        assert queue.results() == [("A", {"fresh": True})]
+
+    def test_queue_file_uses_rollback_journal(self, tmp_path):
+        queue = WorkQueue(str(tmp_path / "q.db"))
+        assert queue.conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+    def test_job_fails_after_max_attempts(self, tmp_path):
+        queue = WorkQueue(str(tmp_path / "q.db"))
+        queue.enqueue(targets("A"))
+        for _ in range(2):
+            job = queue.claim("w1", max_attempts=2)
+            queue.fail(job, "w1", "boom", max_attempts=2)
+        assert queue.claim("w1", max_attempts=2) is None
+        assert queue.failures() == [{"key": "A", "error": "boom", "attempts": 2}]
+
+
+def _claim_all(path, worker, out):
+    queue = WorkQueue(path)
+    while True:
+        job = queue.claim(worker)
+        if job is None:
+            break
+        queue.complete(job, worker, {"by": worker})
+        out.put(job.key)
+
+
+def test_concurrent_workers_never_share_a_job(tmp_path):
+    path = str(tmp_path / "q.db")
+    names = [f"C{i}" for i in range(60)]
+    WorkQueue(path).enqueue(targets(*names))
+    out = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_claim_all, args=(path, f"w{i}", out)) for i in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    claimed = [out.get(timeout=5) for _ in names]
+    assert sorted(claimed) == sorted(names)
+
+
+# ===== Worker loop =====
+
+class StubScraper:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+
+    def scrape_college(self, college):
+        if college["name"] in self.fail:
+            raise RuntimeError("parser crashed")
+        return [{"service_name": "Counseling"}] if college["name"] != "Empty" else []
+
+    def college_record(self, college, resources):
+        return {"name": college["name"], "resources": resources}
+
+
+def test_worker_drains_queue_and_collect_skips_empty(tmp_path):
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    items = targets("A", "Empty", "Broken") + [{"name": "Manual", "source": "manual"}]
+    assert enqueue_targets(queue, items) == 3
+
+    done = run_worker(queue, StubScraper(fail={"Broken"}), "w1", max_attempts=1)
+    assert done == 2
+    assert queue.counts() == {"queued": 0, "leased": 0, "done": 2, "failed": 1}
+    assert [r["name"] for r in collect_results(queue)] == ["A"]
+
+
+def test_collect_merges_into_existing_output(tmp_path, capsys):
+    path = str(tmp_path / "q.db")
+    with WorkQueue(path) as queue:
+        enqueue_targets(queue, targets("A"))
+        run_worker(queue, StubScraper(), "w1")
+    output = tmp_path / "scraped.json"
+    output.write_text(json.dumps([{"name": "Kept", "resources": [{"service_name": "Old"}]},
+                                  {"name": "A", "resources": []}]), encoding="utf-8")
+    targets_file = tmp_path / "college_targets.json"
+    targets_file.write_text(json.dumps({"colleges": []}), encoding="utf-8")
+
+    assert main(["--queue", path, "collect", "--output", str(output), "--targets", str(targets_file)]) == 0
+    assert json.loads(output.read_text(encoding="utf-8")) == [
+        {"name": "Kept", "resources": [{"service_name": "Old"}]},
+        {"name": "A", "resources": [{"service_name": "Counseling"}]},
+    ]
+
+
+def test_enqueue_due_only_uses_the_workers_mode(tmp_path, monkeypatch, capsys):
+    import distributed_scrape
+
+    items = [dict(t, website=f"https://{t['name'].lower()}.edu") for t in targets("A", "B")]
+    targets_file = tmp_path / "college_targets.json"
+    targets_file.write_text(json.dumps({"colleges": items}), encoding="utf-8")
+    schedule = RescrapeSchedule(str(tmp_path / "schedule.json"))
+    schedule.observe("https://a.edu", [])  # what a --crawl worker records
+    monkeypatch.setattr(distributed_scrape, "RescrapeSchedule", lambda: schedule)
+    path = str(tmp_path / "q.db")
+
+    assert main(["--queue", path, "enqueue", "--targets", str(targets_file), "--due-only", "--crawl"]) == 0
+    with WorkQueue(path) as queue:
+        assert queue.counts()["queued"] == 1
+        assert queue.claim("w1").key == "B"
+
+
+class PageFetcher:
+    last_error = ""
+
+    def fetch(self, url, timeout=None):
+        if "missing" in url:
+            self.last_error = "HTTP 404"
+            return None
+        return Page(url, 200, {}, b"<html><body><h1>Counseling Center</h1></body></html>")
+
+
+def test_worker_observations_reach_schedule_and_registry_once(tmp_path, capsys):
+    items = [dict(t, location="Columbus, Ohio", latitude=40.0, longitude=-83.0, website="https://x.edu")
+             for t in targets("A", "Missing")]
+    targets_file = tmp_path / "college_targets.json"
+    targets_file.write_text(json.dumps({"colleges": items}), encoding="utf-8")
+    queue = WorkQueue(str(tmp_path / "q.db"))
+    enqueue_targets(queue, items)
+    log = ObservationLog()
+    scraper = CollegeScraper(fetcher=PageFetcher(), registry=log, schedule=log)
+    assert run_worker(queue, scraper, "w1", log=log) == 2
+
+    schedule = RescrapeSchedule(path=None)
+    registry = TargetRegistry(str(targets_file))
+    observations = collect_observations(queue)
+    assert apply_observations(observations, schedule, registry) == 3
+    assert [t["name"] for t in schedule.split_due(items)[0]] == ["Missing"]
+    assert registry.status_of("https://a.edu/caps")["ok"]
+    assert [t["name"] for t in registry.failing_targets()] == ["Missing"]
+
+    # A second collect over the same results changes nothing
+    assert apply_observations(observations, schedule, registry) == 0
+    assert registry.status_of("https://missing.edu/caps")["failures"] == 1
+
+
+# ===== Heartbeats =====
+
+class SlowFetcher:
+    """Each page takes 40 s; another worker tries to take the job after every page."""
+
+    last_error = ""
+
+    def __init__(self, queue, clock, seconds=40):
+        self.queue = queue
+        self.clock = clock
+        self.seconds = seconds
+        self.stolen = []
+
+    def fetch(self, url, timeout=None):
+        self.clock.now += self.seconds
+        job = self.queue.claim("w2", lease_seconds=60)
+        if job is not None:
+            self.stolen.append(job.key)
+        return Page(url, 200, {}, b"<html><body><h1>Counseling Center</h1></body></html>")
+
+
+def long_target(name, pages):
+    return {"name": name, "location": "Columbus, Ohio", "latitude": 40.0, "longitude": -83.0,
+            "website": f"https://{name.lower()}.edu",
+            "mental_health_urls": [f"https://{name.lower()}.edu/p{i}" for i in range(pages)]}
+
+
+def test_lease_is_renewed_between_pages(tmp_path, capsys):
+    clock = FakeClock()
+    queue = WorkQueue(str(tmp_path / "q.db"), clock=clock)
+    queue.enqueue([long_target("A", 5)])
+    fetcher = SlowFetcher(queue, clock)
+    keeper = LeaseKeeper(fetcher, queue, "w1", lease_seconds=60)
+    scraper = CollegeScraper(fetcher=keeper)
+
+    assert run_worker(queue, scraper, "w1", lease_seconds=60, keeper=keeper) == 1
+    assert fetcher.stolen == []
+    assert queue.counts()["done"] == 1
+
+
+def test_lost_lease_abandons_the_target(tmp_path, capsys):
+    clock = FakeClock()
+    queue = WorkQueue(str(tmp_path / "q.db"), clock=clock)
+    queue.enqueue([long_target("A", 3)])
+    fetcher = SlowFetcher(queue, clock, seconds=90)
+    keeper = LeaseKeeper(fetcher, queue, "w1", lease_seconds=60)
+
+    assert run_worker(queue, CollegeScraper(fetcher=keeper), "w1", lease_seconds=60, keeper=keeper) == 0
+    assert fetcher.stolen == ["A"]
+    assert "lease lost" in capsys.readouterr().out
@@ -1,7 +1,6 @@
-import json
+from target_registry import TargetRegistry
 
-with open('/mnt/c/Users/raygo/source/repos/Mental_Health_Database/Scripts/college_targets.json') as f:
-    data = json.load(f)
+registry = TargetRegistry()
 
 # Fix URLs for failed schools and add missing Big Ten
 updates = [
@@ -301,24 +300,12 @@ updates = [
 ]
 
 # Update existing or add new
-for update in updates:
-    found = False
-    for i, college in enumerate(data['colleges']):
-        if college['name'] == update['name']:
-            data['colleges'][i] = update
-            found = True
-            break
-    if not found:
-        data['colleges'].append(update)
+added, updated = registry.upsert_many(updates, match=True)
 
 # Add new states if needed
-new_states = ['wisconsin', 'minnesota', 'iowa', 'nebraska', 'maryland', 'new jersey']
-for s in new_states:
-    if s not in data['states']:
-        data['states'].append(s)
+registry.add_states(['wisconsin', 'minnesota', 'iowa', 'nebraska', 'maryland', 'new jersey'])
 
-with open('/mnt/c/Users/raygo/source/repos/Mental_Health_Database/Scripts/college_targets.json', 'w') as f:
-    json.dump(data, f, indent=2)
+registry.save()
 
-print(f"Updated! Total colleges: {len(data['colleges'])}")
-print(f"States: {data['states']}")
+print(f"Updated! {added} added, {updated} changed. Total colleges: {len(registry)}")
+print(f"States: {registry.states}")
@@ -3,12 +3,15 @@ Data Validation Utility for College Mental Health Resources
 Validates scraped data before import to ensure quality.
 """
 
+import argparse
 import json
 import re
 import os
 import sys
 from datetime import datetime
 
+from profiling import add_profile_arguments, profiler_from_args
+
 SCRAPED_FILE = os.path.join(os.path.dirname(__file__), 'scraped_colleges_data.json')
 MANUAL_FILE = os.path.join(os.path.dirname(__file__), 'manual_ohio_schools.json')
 
@@ -274,33 +277,38 @@ def print_report(result, verbose=False):
     return result.stats['colleges_with_issues'] == 0
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate scraped college data files.")
+    parser.add_argument("files", nargs="*", default=[SCRAPED_FILE, MANUAL_FILE],
+                        help="Data files to validate (default: scraped and manual data)")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args, "validate_data")
+
     print("="*60)
     print("College Mental Health Data Validator")
     print("="*60)
 
     result = ValidationResult()
 
-    # Validate scraped data
-    if os.path.exists(SCRAPED_FILE):
-        print(f"\n-- Validating: {SCRAPED_FILE}")
-        validate_data_file(SCRAPED_FILE, result)
-    else:
-        result.add_warning(f"Scraped file not found: {SCRAPED_FILE}")
-
-    # Validate manual data
-    if os.path.exists(MANUAL_FILE):
-        print(f"-- Validating: {MANUAL_FILE}")
-        validate_data_file(MANUAL_FILE, result)
-    else:
-        result.add_warning(f"Manual file not found: {MANUAL_FILE}")
-
-    # Print report
-    passed = print_report(result)
+    print()
+    try:
+        for path in args.files:
+            if os.path.exists(path):
+                print(f"-- Validating: {path}")
+                with profiler.stage(f"validate-{os.path.splitext(os.path.basename(path))[0]}"):
+                    validate_data_file(path, result)
+            else:
+                result.add_warning(f"File not found: {path}")
+
+        # Print report
+        passed = print_report(result)
+    finally:
+        profiler.close()
 
     # Exit code
-    sys.exit(0 if passed else 1)
+    return 0 if passed else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
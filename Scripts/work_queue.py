@@ -0,0 +1,194 @@
+"""
+SQLite-backed work queue with leases.
+
+A coordinator enqueues jobs keyed by a unique name. Workers claim one
+job at a time under a time-limited lease and then complete it, fail it,
+or let the lease expire (e.g. a crashed worker). Expired leases are put
+back on the queue on the next claim. Each job runs at most max_attempts
+times before it is marked failed.
+
+Claims run in a BEGIN IMMEDIATE transaction, so any number of worker
+processes can share one queue file. The file uses SQLite's rollback
+journal (journal_mode DELETE), not WAL: WAL keeps its index in shared
+memory, which processes on different machines cannot share. Workers on
+other machines therefore need the file on a network filesystem whose
+POSIX byte-range locks actually work (NFSv4 with locking enabled, for
+example). SQLite cannot detect broken network locks, and claims are only
+exclusive while those locks hold. When in doubt, run every worker on the
+machine that holds the file.
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+DEFAULT_LEASE_SECONDS = 15 * 60
+DEFAULT_MAX_ATTEMPTS = 3
+
+QUEUED, LEASED, DONE, FAILED = 'queued', 'leased', 'done', 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, id);
+"""
+
+# Expired leases go back on the queue, or to failed once out of attempts
+EXPIRE_SQL = (
+    "UPDATE jobs SET state = CASE WHEN attempts >= :max THEN 'failed' ELSE 'queued' END, "
+    "error = CASE WHEN attempts >= :max THEN 'lease expired' ELSE error END, "
+    "lease_owner = NULL, lease_expires = NULL, updated_at = :iso "
+    "WHERE state = 'leased' AND lease_expires < :now"
+)
+
+
+class Job:
+    def __init__(self, id, key, payload, attempts, lease_expires):
+        self.id = id
+        self.key = key
+        self.payload = payload
+        self.attempts = attempts
+        self.lease_expires = lease_expires
+
+
+class WorkQueue:
+    def __init__(self, path, clock=time.time, timeout=30.0):
+        self.path = path
+        self.clock = clock
+        # isolation_level=None: transactions are explicit (BEGIN IMMEDIATE below)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            # Also turns off WAL in a queue file created by an older version
+            self.conn.execute('PRAGMA journal_mode = DELETE')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, sql, params):
+        """Run one statement in an IMMEDIATE transaction; returns its cursor."""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            cur = self.conn.execute(sql, params)
+            self.conn.execute('COMMIT')
+            return cur
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _now_iso():
+        return datetime.now().isoformat()
+
+    def enqueue(self, items, key=lambda item: item['name'], reset=False):
+        """Add items as jobs. Existing keys are kept unless reset is set (then re-queued).
+
+        Returns the number of jobs inserted or reset.
+        """
+        now = self._now_iso()
+        if reset:
+            sql = ('INSERT INTO jobs(key, payload, updated_at) VALUES (?, ?, ?) '
+                   "ON CONFLICT(key) DO UPDATE SET payload = excluded.payload, state = 'queued', "
+                   'attempts = 0, lease_owner = NULL, lease_expires = NULL, result = NULL, error = NULL, '
+                   'updated_at = excluded.updated_at')
+        else:
+            sql = 'INSERT OR IGNORE INTO jobs(key, payload, updated_at) VALUES (?, ?, ?)'
+        rows = [(key(item), json.dumps(item, ensure_ascii=False), now) for item in items]
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany(sql, rows)
+            inserted = self.conn.total_changes - before
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return inserted
+
+    def requeue_expired(self, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Release jobs whose lease ran out. Returns how many."""
+        cur = self._write(EXPIRE_SQL, {'max': max_attempts, 'iso': self._now_iso(), 'now': self.clock()})
+        return cur.rowcount
+
+    def claim(self, worker, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Lease the oldest queued job to worker, or return None if there is none."""
+        now = self.clock()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            self.conn.execute(EXPIRE_SQL, {'max': max_attempts, 'iso': self._now_iso(), 'now': now})
+            row = self.conn.execute(
+                "SELECT id, key, payload, attempts FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.conn.execute('COMMIT')
+                return None
+            expires = now + lease_seconds
+            self.conn.execute(
+                "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                'lease_expires = ?, updated_at = ? WHERE id = ?',
+                (worker, expires, self._now_iso(), row['id']))
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return Job(row['id'], row['key'], json.loads(row['payload']), row['attempts'] + 1, expires)
+
+    def heartbeat(self, job, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extend a lease still held by worker. Returns False if it was lost."""
+        expires = self.clock() + lease_seconds
+        cur = self._write(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (expires, job.id, worker))
+        if cur.rowcount:
+            job.lease_expires = expires
+        return cur.rowcount == 1
+
+    def complete(self, job, worker, result):
+        """Store result and mark job done. False if worker no longer holds the lease."""
+        cur = self._write(
+            "UPDATE jobs SET state = 'done', result = ?, error = NULL, lease_owner = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (json.dumps(result, ensure_ascii=False), self._now_iso(), job.id, worker))
+        return cur.rowcount == 1
+
+    def fail(self, job, worker, error, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Release job after an error: re-queued, or failed once out of attempts."""
+        cur = self._write(
+            "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (max_attempts, error, self._now_iso(), job.id, worker))
+        return cur.rowcount == 1
+
+    def counts(self):
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        for row in self.conn.execute('SELECT state, COUNT(*) AS n FROM jobs GROUP BY state'):
+            counts[row['state']] = row['n']
+        return counts
+
+    def results(self):
+        """(key, result) for every finished job, in enqueue order."""
+        cur = self.conn.execute("SELECT key, result FROM jobs WHERE state = 'done' ORDER BY id")
+        return [(row['key'], json.loads(row['result'])) for row in cur]
+
+    def failures(self):
+        cur = self.conn.execute("SELECT key, error, attempts FROM jobs WHERE state = 'failed' ORDER BY id")
+        return [dict(row) for row in cur]
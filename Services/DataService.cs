@@ -8,11 +8,14 @@ namespace MentalHealthDatabase.Services
         Task<List<College>> GetAllCollegesWithResourcesAsync();
         Task<College> GetCollegeWithResourcesByIdAsync(int collegeId);
         Task<List<MentalHealthResource>> GetResourcesByCollegeIdAsync(int collegeId);
+        Task<PagedResult<College>> GetCollegesPageAsync(int page, int pageSize, bool includeResources, string? location = null);
+        Task<CollegeCounts> GetCountsAsync(string? location = null);
         Task AddCollegeAsync(College college);
         Task AddResourceAsync(MentalHealthResource resource);
         Task UpdateCollegeAsync(College college);
         Task DeleteCollegeAsync(int collegeId);
         Task BulkImportAsync(List<College> colleges);
+        Task<int> DeleteCollegesByNameAsync(IEnumerable<string> names);
         Task SaveChangesAsync();
     }
 
@@ -49,6 +52,39 @@ namespace MentalHealthDatabase.Services
                 .ToListAsync();
         }
 
+        private IQueryable<College> CollegesAt(string? location)
+        {
+            var query = _context.Colleges.AsNoTracking();
+            if (!string.IsNullOrEmpty(location))
+                query = query.Where(c => c.Location.Contains(location));
+            return query;
+        }
+
+        public async Task<PagedResult<College>> GetCollegesPageAsync(int page, int pageSize, bool includeResources, string? location = null)
+        {
+            var query = CollegesAt(location);
+            var total = await query.CountAsync();
+            if (includeResources)
+                query = query.Include(c => c.Resources);
+
+            var items = await query
+                .OrderBy(c => c.Id)
+                .Skip((page - 1) * pageSize)
+                .Take(pageSize)
+                .ToListAsync();
+            return new PagedResult<College> { Items = items, Page = page, PageSize = pageSize, Total = total };
+        }
+
+        public async Task<CollegeCounts> GetCountsAsync(string? location = null)
+        {
+            var colleges = CollegesAt(location);
+            return new CollegeCounts
+            {
+                Colleges = await colleges.CountAsync(),
+                Resources = await colleges.SelectMany(c => c.Resources).CountAsync()
+            };
+        }
+
         public async Task AddCollegeAsync(College college)
         {
             _context.Colleges.Add(college);
@@ -78,42 +114,75 @@ namespace MentalHealthDatabase.Services
             }
         }
 
+        // Colleges per round-trip in BulkImportAsync: one lookup query and one SaveChanges each
+        public const int BulkBatchSize = 500;
+
         public async Task BulkImportAsync(List<College> colleges)
         {
+            // Name is unique, so a repeated name in one import keeps its last occurrence
+            var incomingByName = new Dictionary<string, College>();
             foreach (var incoming in colleges)
+                incomingByName[incoming.Name] = incoming;
+            var batches = incomingByName.Values.Chunk(BulkBatchSize);
+
+            await using var transaction = await _context.Database.BeginTransactionAsync();
+            foreach (var batch in batches)
             {
-                // Upsert: find existing by name, replace if found
-                var existing = await _context.Colleges
+                // Upsert: one indexed lookup for the whole batch instead of one per college
+                var names = batch.Select(c => c.Name).ToList();
+                var existingByName = await _context.Colleges
                     .Include(c => c.Resources)
-                    .FirstOrDefaultAsync(c => c.Name == incoming.Name);
+                    .Where(c => names.Contains(c.Name))
+                    .ToDictionaryAsync(c => c.Name);
 
-                if (existing != null)
+                foreach (var incoming in batch)
                 {
-                    // Update college fields
-                    existing.Location = incoming.Location;
-                    existing.Latitude = incoming.Latitude;
-                    existing.Longitude = incoming.Longitude;
-                    existing.Website = incoming.Website;
-                    existing.UpdatedAt = DateTime.UtcNow;
-
-                    // Replace resources: remove old, add new
-                    _context.MentalHealthResources.RemoveRange(existing.Resources);
-                    foreach (var resource in incoming.Resources)
+                    if (existingByName.TryGetValue(incoming.Name, out var existing))
                     {
-                        resource.CollegeId = existing.Id;
-                        existing.Resources.Add(resource);
+                        // Update college fields
+                        existing.Location = incoming.Location;
+                        existing.Latitude = incoming.Latitude;
+                        existing.Longitude = incoming.Longitude;
+                        existing.Website = incoming.Website;
+                        existing.UpdatedAt = DateTime.UtcNow;
+
+                        // Replace resources: remove old, add new
+                        _context.MentalHealthResources.RemoveRange(existing.Resources);
+                        foreach (var resource in incoming.Resources)
+                        {
+                            resource.CollegeId = existing.Id;
+                            existing.Resources.Add(resource);
+                        }
+                    }
+                    else
+                    {
+                        // Insert new college with resources
+                        incoming.CreatedAt = DateTime.UtcNow;
+                        incoming.UpdatedAt = DateTime.UtcNow;
+                        _context.Colleges.Add(incoming);
                     }
                 }
-                else
-                {
-                    // Insert new college with resources
-                    incoming.CreatedAt = DateTime.UtcNow;
-                    incoming.UpdatedAt = DateTime.UtcNow;
-                    _context.Colleges.Add(incoming);
-                }
+
+                await _context.SaveChangesAsync();
+                // Keep the change tracker from growing with every batch
+                _context.ChangeTracker.Clear();
             }
+            await transaction.CommitAsync();
+        }
 
+        public async Task<int> DeleteCollegesByNameAsync(IEnumerable<string> names)
+        {
+            var wanted = names.Distinct().ToList();
+            if (wanted.Count == 0)
+                return 0;
+
+            // Resources go with their college via the cascade delete
+            var colleges = await _context.Colleges
+                .Where(c => wanted.Contains(c.Name))
+                .ToListAsync();
+            _context.Colleges.RemoveRange(colleges);
             await _context.SaveChangesAsync();
+            return colleges.Count;
         }
 
         public async Task SaveChangesAsync()
@@ -15,6 +15,12 @@ class MentalHealthApp {
         this.isPanelCondensed = true;
         this.panelToggleBtn = null;
         this.resizeTimer = null;
+        // Sharded map data (see Scripts/prepare_ui_payload.py --shards)
+        this.useShards = false;
+        this.loadedShards = new Set();
+        this.pendingShards = new Map();
+        this.failedShards = new Set();
+        this.shardListenerAttached = false;
         this.init();
     }
 
@@ -141,6 +147,11 @@ class MentalHealthApp {
     async loadColleges() {
         this.showLoading(true);
         try {
+            // Pins first: markers appear before any resource details are downloaded
+            if (await this.loadPins()) {
+                return;
+            }
+
             const response = await fetch('/api/colleges');
             if (!response.ok) {
                 const errorData = await response.json().catch(() => ({}));
@@ -167,11 +178,176 @@ class MentalHealthApp {
         }
     }
 
-    renderColleges() {
-        Object.values(this.markers).forEach(marker => {
-            this.map.removeLayer(marker);
+    async loadPins() {
+        let response;
+        try {
+            response = await fetch('/api/resources/ui/pins');
+        } catch (error) {
+            return false;
+        }
+        if (!response.ok) {
+            return false;
+        }
+
+        const pins = await response.json();
+        this.useShards = true;
+        this.loadedShards.clear();
+        this.pendingShards.clear();
+        this.failedShards.clear();
+        this.colleges = pins.map(pin => ({
+            id: pin.id,
+            name: pin.name || '',
+            location: pin.location || '',
+            latitude: pin.latitude,
+            longitude: pin.longitude,
+            website: pin.website,
+            shard: pin.shard,
+            resourceCount: pin.resource_count || 0,
+            resources: null
+        }));
+        console.log(`✔ Loaded ${this.colleges.length} campus pins`);
+
+        if (this.colleges.length === 0) {
+            this.showInfo('No colleges found in the database. Please add some colleges first.');
+        }
+
+        this.filteredColleges = [...this.colleges];
+        this.renderColleges();
+        this.updateStats();
+        this.setMapStatus('Pins loaded');
+        this.showLoading(false);
+
+        if (!this.shardListenerAttached) {
+            this.map.on('moveend', () => this.loadVisibleShards());
+            this.shardListenerAttached = true;
+        }
+        this.loadVisibleShards();
+        return true;
+    }
+
+    loadVisibleShards() {
+        if (!this.useShards || !this.map) return;
+        const bounds = this.map.getBounds();
+        const keys = new Set();
+        this.filteredColleges.forEach(college => {
+            if (!college.resources && bounds.contains([college.latitude, college.longitude])) {
+                keys.add(college.shard);
+            }
         });
-        this.markers = {};
+        if (keys.size > 0) {
+            this.loadShards([...keys]);
+        }
+    }
+
+    async loadShards(keys) {
+        const missing = keys.filter(key => key && !this.loadedShards.has(key));
+        if (missing.length === 0) return;
+
+        const requests = missing.map(key => {
+            if (!this.pendingShards.has(key)) {
+                const request = fetch(`/api/resources/ui/shards/${encodeURIComponent(key)}`)
+                    .then(response => {
+                        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                        return response.json();
+                    })
+                    .then(entries => {
+                        this.mergeShard(entries);
+                        this.loadedShards.add(key);
+                        this.failedShards.delete(key);
+                    })
+                    .catch(error => {
+                        console.error(`✖ Failed to load shard ${key}:`, error);
+                        this.failedShards.add(key);
+                    })
+                    .finally(() => this.pendingShards.delete(key));
+                this.pendingShards.set(key, request);
+            }
+            return this.pendingShards.get(key);
+        });
+
+        await Promise.all(requests);
+        this.refreshDetails();
+    }
+
+    mergeShard(entries) {
+        const byId = new Map(this.colleges.map(college => [college.id, college]));
+        entries.forEach(entry => {
+            const college = byId.get(entry.id);
+            if (college) {
+                college.resources = (entry.cards || []).map(card => this.cardToResource(card));
+            }
+        });
+    }
+
+    cardToResource(card) {
+        const contact = card.contact || {};
+        const meta = card.meta || {};
+        return {
+            serviceName: card.title,
+            department: card.subtitle,
+            description: card.description,
+            contactEmail: contact.email,
+            contactPhone: contact.phone,
+            contactWebsite: contact.website,
+            officeHours: meta.office_hours,
+            location: meta.location,
+            freshmanNotes: meta.freshman_notes
+        };
+    }
+
+    async ensureCollegeDetails(college) {
+        if (this.useShards && !college.resources) {
+            await this.loadShards([college.shard]);
+        }
+    }
+
+    // Fill in details that were waiting on a shard, in place, so open panels stay open
+    refreshDetails() {
+        const byId = new Map(this.colleges.map(college => [String(college.id), college]));
+        document.querySelectorAll('[data-details-pending="true"]').forEach(container => {
+            const college = byId.get(container.dataset.detailsFor);
+            if (college && (college.resources || this.failedShards.has(college.shard))) {
+                this.populateCollegeDetails(container, college);
+            }
+        });
+        byId.forEach(college => {
+            if (college.resources) this.updateCollegeSummary(college);
+        });
+        this.updateStats();
+        Object.entries(this.markers).forEach(([id, marker]) => {
+            if (marker.isPopupOpen()) {
+                const college = this.colleges.find(c => String(c.id) === id);
+                if (college) marker.setPopupContent(this.createPopupContent(college));
+            }
+        });
+    }
+
+    // Resource counts and highlight on the sidebar item and card for college
+    updateCollegeSummary(college) {
+        const count = this.countResources(college);
+        const label = `${count} resource${count !== 1 ? 's' : ''}`;
+        document.querySelectorAll(`[data-college-id="${CSS.escape(String(college.id))}"]`).forEach(element => {
+            const itemCount = element.querySelector('.college-item-resources');
+            if (itemCount) itemCount.textContent = `🔥 ${label}`;
+            const cardCount = element.querySelector('.resource-card-count');
+            if (cardCount) cardCount.textContent = `${label} available`;
+            const highlight = element.querySelector('.resource-card-highlight');
+            if (highlight && college.resources.length > 0) highlight.textContent = college.resources[0].serviceName;
+        });
+    }
+
+    countResources(college) {
+        if (college.resources) return college.resources.length;
+        return college.resourceCount || 0;
+    }
+
+    renderColleges({ fit = true, redrawMarkers = true } = {}) {
+        if (redrawMarkers) {
+            Object.values(this.markers).forEach(marker => {
+                this.map.removeLayer(marker);
+            });
+            this.markers = {};
+        }
 
         const collegeList = document.getElementById('college-list');
         if (collegeList) {
@@ -186,11 +362,13 @@ class MentalHealthApp {
         }
 
         this.filteredColleges.forEach(college => {
-            this.addCollegeMarker(college);
+            if (redrawMarkers) {
+                this.addCollegeMarker(college);
+            }
             this.addCollegeToSidebar(college);
         });
 
-        if (this.filteredColleges.length > 0) {
+        if (fit && this.filteredColleges.length > 0) {
             const bounds = L.latLngBounds(
                 this.filteredColleges.map(c => [c.latitude, c.longitude])
             );
@@ -235,7 +413,7 @@ class MentalHealthApp {
             card.className = 'resource-card';
             card.dataset.collegeId = college.id;
 
-            const resourceCount = college.resources ? college.resources.length : 0;
+            const resourceCount = this.countResources(college);
             const highlightResource = college.resources && college.resources.length > 0
                 ? college.resources[0].serviceName
                 : 'Resources pending';
@@ -266,7 +444,7 @@ class MentalHealthApp {
             toggleButton.setAttribute('aria-expanded', 'false');
             toggleButton.addEventListener('click', (event) => {
                 event.stopPropagation();
-                this.toggleDetails(detailBlock, toggleButton);
+                this.toggleDetails(detailBlock, toggleButton, college);
             });
 
             card.appendChild(detailBlock);
@@ -289,7 +467,7 @@ class MentalHealthApp {
     renderMapMetadata() {
         const totalCampuses = this.filteredColleges.length;
         const totalResources = this.filteredColleges.reduce((sum, college) => {
-            return sum + (college.resources ? college.resources.length : 0);
+            return sum + this.countResources(college);
         }, 0);
 
         const stateCounts = {};
@@ -321,8 +499,9 @@ class MentalHealthApp {
             : 'Midwest region';
 
         const featuredCampus = this.filteredColleges[0];
+        const featuredCount = featuredCampus ? this.countResources(featuredCampus) : 0;
         const featuredCampusText = featuredCampus
-            ? `${featuredCampus.name} • ${featuredCampus.location || 'Midwest region'} • ${featuredCampus.resources ? featuredCampus.resources.length : 0} resource${featuredCampus.resources && featuredCampus.resources.length === 1 ? '' : 's'}`
+            ? `${featuredCampus.name} • ${featuredCampus.location || 'Midwest region'} • ${featuredCount} resource${featuredCount === 1 ? '' : 's'}`
             : 'Campus highlights coming soon';
 
         const featuredService = featuredCampus && featuredCampus.resources && featuredCampus.resources[0]
@@ -381,6 +560,7 @@ class MentalHealthApp {
 
         marker.on('click', () => {
             this.highlightCollege(college.id);
+            this.ensureCollegeDetails(college);
         });
 
         this.markers[college.id] = marker;
@@ -394,7 +574,7 @@ class MentalHealthApp {
         listItem.className = 'college-item';
         listItem.dataset.collegeId = college.id;
 
-        const resourceCount = college.resources ? college.resources.length : 0;
+        const resourceCount = this.countResources(college);
 
         listItem.innerHTML = `
             <div class="college-head">
@@ -415,7 +595,7 @@ class MentalHealthApp {
         toggleBtn.className = 'toggle-details';
         toggleBtn.textContent = 'View details';
         toggleBtn.setAttribute('aria-expanded', 'false');
-        toggleBtn.addEventListener('click', () => this.toggleDetails(details, toggleBtn));
+        toggleBtn.addEventListener('click', () => this.toggleDetails(details, toggleBtn, college));
 
         listItem.appendChild(details);
         listItem.appendChild(toggleBtn);
@@ -430,13 +610,28 @@ class MentalHealthApp {
     }
 
     populateCollegeDetails(container, college) {
+        // Sharded data: resources arrive with the college's shard, see refreshDetails()
+        const pending = this.useShards && !college.resources;
+        container.dataset.detailsFor = college.id;
+        container.dataset.detailsPending = pending;
         container.innerHTML = '';
         container.appendChild(this.createMapSnapshot(college));
+        const count = this.countResources(college);
         const summary = document.createElement('div');
         summary.className = 'detail-summary';
-        summary.textContent = `Located in ${college.location || 'the Midwest'}, ${college.resources ? college.resources.length : 0} highlighted resource${(college.resources && college.resources.length === 1) ? '' : 's'}.`;
+        summary.textContent = `Located in ${college.location || 'the Midwest'}, ${count} highlighted resource${count === 1 ? '' : 's'}.`;
         container.appendChild(summary);
 
+        if (pending) {
+            const loading = document.createElement('p');
+            loading.className = 'detail-empty detail-loading';
+            loading.textContent = this.failedShards.has(college.shard)
+                ? 'Resources could not be loaded. Try again later.'
+                : 'Loading resources…';
+            container.appendChild(loading);
+            return;
+        }
+
         if (!college.resources || college.resources.length === 0) {
             const empty = document.createElement('p');
             empty.textContent = 'No resources recorded yet.';
@@ -488,11 +683,14 @@ class MentalHealthApp {
             .join(' ');
     }
 
-    toggleDetails(container, button) {
+    toggleDetails(container, button, college) {
         const expanded = container.classList.toggle('expanded');
         button.textContent = expanded ? 'Hide details' : 'View details';
         button.dataset.expanded = expanded;
         button.setAttribute('aria-expanded', expanded);
+        if (expanded && college) {
+            this.ensureCollegeDetails(college);
+        }
     }
 
     buildDetailRow(resource) {
@@ -536,7 +734,7 @@ class MentalHealthApp {
             </div>
             <div>
                 <span>Resources in view</span>
-                <strong>${college.resources ? college.resources.length : 0}</strong>
+                <strong>${this.countResources(college)}</strong>
             </div>
             <div>
                 <span>Map status</span>
@@ -693,6 +891,7 @@ class MentalHealthApp {
     }
 
     zoomToCollege(college) {
+        this.ensureCollegeDetails(college);
         this.map.setView([college.latitude, college.longitude], 13);
         const marker = this.markers[college.id];
         if (marker) {
@@ -720,7 +919,7 @@ class MentalHealthApp {
     updateStats() {
         const totalColleges = this.filteredColleges.length;
         const totalResources = this.filteredColleges.reduce((sum, college) => {
-            return sum + (college.resources ? college.resources.length : 0);
+            return sum + this.countResources(college);
         }, 0);
 
         const states = new Set(
@@ -830,4 +1029,4 @@ class MentalHealthApp {
 }
 
 const app = new MentalHealthApp();
-window.app = app;
+window.app = app;